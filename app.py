@@ -3,15 +3,17 @@ SalivAI - Clinical Risk Assessment Tool
 Simple, professional medical interface
 """
 
+import glob
+import os
+import tempfile
+import time
+
 import streamlit as st
-import pandas as pd
-import numpy as np
 import plotly.graph_objects as go
-import plotly.express as px
-from datetime import datetime
 
-# Import our literature-based predictor
-from salivary_gland_malignancy_predictor import LiteratureBasedMalignancyPredictor
+# Versioned coefficient sets of the literature-based predictor
+from coefficient_registry import CoefficientRegistry
+from scoring_core import RISK_CATEGORIES, encode_records
 
 # Configure Streamlit page
 st.set_page_config(
@@ -175,8 +177,64 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 @st.cache_resource
+def load_registry():
+    # Set SALIVAI_AUDIT_LOG to a file path to record every assessment
+    audit_logger = None
+    if os.environ.get('SALIVAI_AUDIT_LOG'):
+        from audit_log import AuditLogger
+        audit_logger = AuditLogger(os.environ['SALIVAI_AUDIT_LOG'], source='streamlit')
+    
+    # Set SALIVAI_PROFILE=1 to time the scoring stages (shown at the bottom of the page)
+    profiler = None
+    if os.environ.get('SALIVAI_PROFILE'):
+        from stage_profiler import StageProfiler
+        profiler = StageProfiler()
+    
+    # SALIVAI_COEFFICIENT_SETS overrides the registry directory
+    directory = os.environ.get('SALIVAI_COEFFICIENT_SETS')
+    if directory:
+        return CoefficientRegistry(directory, audit_logger=audit_logger, profiler=profiler)
+    return CoefficientRegistry(audit_logger=audit_logger, profiler=profiler)
+
 def load_model():
-    return LiteratureBasedMalignancyPredictor()
+    """Predictor of the active coefficient set (follows hot-swaps without a restart)"""
+    return load_registry().active()
+
+@st.cache_data(max_entries=20_000)
+def assessment_details(_predictor, model_version, age, gender, location, size, margins, echo,
+                       vascularity):
+    """Interval and explanation for one patient, memoized on the model version and inputs across sessions"""
+    ages, codes = encode_records([{
+        'age': age, 'gender': gender, 'location': location, 'size': size,
+        'margins': margins, 'echo': echo, 'vascularity': vascularity
+    }])
+    interval = _predictor.predict_proba_interval_from_codes(ages, codes, method='delta')
+    explanation = _predictor.explain_from_codes(ages, codes)
+    return {
+        'probability_lower': float(interval.lower[0]),
+        'probability_upper': float(interval.upper[0]),
+        'intercept': explanation.intercept,
+        'contributions': tuple(explanation.contributions[0].tolist())
+    }
+
+def assess_patient(predictor, age, gender, location, size, margins, echo, vascularity):
+    """
+    Risk assessment for one patient
+    
+    The probability is scored on every call (about 1 ms), so every assessment
+    reaches the audit log; only the interval and explanation are memoized.
+    """
+    ages, codes = encode_records([{
+        'age': age, 'gender': gender, 'location': location, 'size': size,
+        'margins': margins, 'echo': echo, 'vascularity': vascularity
+    }])
+    result = predictor.predict_risk_category_from_codes(ages, codes)
+    return {
+        'probability': float(result.probabilities[0]),
+        **RISK_CATEGORIES[result.codes[0]],
+        **assessment_details(predictor, predictor.model_version, age, gender, location, size,
+                             margins, echo, vascularity)
+    }
 
 def create_simple_gauge(probability):
     """Create a clean, simple gauge chart"""
@@ -222,6 +280,11 @@ def create_simple_gauge(probability):
     
     return fig
 
+@st.cache_resource(max_entries=2_000)
+def gauge_figure(probability):
+    """Gauge chart, built once per distinct probability"""
+    return create_simple_gauge(probability)
+
 def create_simple_bar_chart(importance_dict):
     """Create a simple horizontal bar chart"""
     
@@ -255,18 +318,180 @@ def create_simple_bar_chart(importance_dict):
     
     return fig
 
-def main():
-    predictor = load_model()
+@st.cache_resource(max_entries=8)
+def importance_figure(_predictor, model_version):
+    """Feature importance chart, built once per coefficient set"""
+    return create_simple_bar_chart(_predictor.get_feature_importance())
+
+# Waterfall labels of the model features (FEATURE_NAMES order)
+FEATURE_LABELS = [
+    'Age (vs. 50)', 'Submandibular', 'Minor gland', 'Size 2-4cm', 'Size >4cm',
+    'Male', 'Irregular margins', 'Hypoechoic', 'Increased vascularity'
+]
+
+def create_waterfall_chart(intercept, contributions):
+    """Create a waterfall of the log-odds from the reference patient to this patient"""
+    
+    # Features at their reference level contribute nothing and are left out
+    steps = [(label, value) for label, value in zip(FEATURE_LABELS, contributions) if value != 0]
+    total = intercept + sum(contributions)
+    
+    fig = go.Figure(go.Waterfall(
+        orientation='v',
+        measure=['absolute'] + ['relative'] * len(steps) + ['total'],
+        x=['Reference patient'] + [label for label, _ in steps] + ['This patient'],
+        y=[intercept] + [value for _, value in steps] + [total],
+        text=[f'{intercept:.2f}'] + [f'{value:+.2f}' for _, value in steps] + [f'{total:.2f}'],
+        textposition='outside',
+        increasing={'marker': {'color': '#dc3545'}},
+        decreasing={'marker': {'color': '#28a745'}},
+        totals={'marker': {'color': '#0066cc'}},
+        connector={'line': {'color': '#adb5bd'}}
+    ))
     
-    # Header
-    st.markdown("""
-    <div class="main-header">
-        <h1 class="app-title">🏥 SalivAI</h1>
-        <p class="app-subtitle">Salivary Gland Malignancy Risk Assessment</p>
-        <p class="app-tagline">Evidence-based clinical decision support tool</p>
-    </div>
-    """, unsafe_allow_html=True)
+    fig.update_layout(
+        title="Why This Estimate: Log-Odds Contributions",
+        height=320,
+        margin=dict(l=20, r=20, t=50, b=20),
+        paper_bgcolor="rgba(0,0,0,0)",
+        font={'family': 'Arial'},
+        yaxis={'title': 'Log-odds of malignancy'},
+        showlegend=False
+    )
+    
+    return fig
+
+@st.cache_resource(max_entries=2_000)
+def waterfall_figure(intercept, contributions):
+    """Waterfall chart, built once per distinct set of contributions"""
+    return create_waterfall_chart(intercept, contributions)
+
+def create_distribution_chart(distribution):
+    """Create a bar chart of patients per risk category"""
+    
+    colors = {'Low Risk': '#28a745', 'Intermediate Risk': '#ffc107', 'High Risk': '#dc3545'}
+    categories = [risk['risk_category'] for risk in RISK_CATEGORIES]
+    counts = [distribution.get(category, 0) for category in categories]
+    
+    fig = go.Figure(go.Bar(
+        x=categories,
+        y=counts,
+        marker_color=[colors[category] for category in categories],
+        text=[f'{count:,}' for count in counts],
+        textposition='outside'
+    ))
     
+    fig.update_layout(
+        title="Risk Distribution",
+        height=300,
+        margin=dict(l=20, r=20, t=40, b=20),
+        paper_bgcolor="rgba(0,0,0,0)",
+        font={'family': 'Arial'},
+        yaxis={'title': 'Patients'}
+    )
+    
+    return fig
+
+# Results files of batch uploads, and how long one may go unused before it is deleted
+RESULTS_PREFIX = 'salivai-cohort-'
+RESULTS_MAX_AGE = 6 * 60 * 60
+
+def sweep_stale_results(max_age=RESULTS_MAX_AGE):
+    """
+    Delete results files no session has touched for max_age seconds
+    
+    Streamlit has no reliable session-end hook, so files of closed sessions
+    are removed here instead; open sessions touch theirs on every rerun.
+    """
+    cutoff = time.time() - max_age
+    for path in glob.glob(os.path.join(tempfile.gettempdir(), RESULTS_PREFIX + '*')):
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+def discard_batch():
+    """Forget this session's scored upload and delete its results file"""
+    batch = st.session_state.pop('batch', None)
+    if batch is not None and os.path.exists(batch['path']):
+        os.remove(batch['path'])
+
+def score_upload(uploaded_file):
+    """
+    Score an uploaded cohort chunk by chunk into a temporary results file
+    
+    The upload is streamed straight from the uploaded buffer; only one chunk
+    and the running summary are held in memory at a time.
+    
+    Rows (CSV and Parquet alike) are checked against the input schema first
+    (mode='coerce': misspelled categories are repaired and ages clipped to the
+    form's 18-90 range); the problems found are shown above the results.
+    
+    Returns:
+    dict: file_id, name, path, rows, seconds, report and validation message
+        (None when every row was valid), or None if the file could not be
+        scored (the error is shown in the page)
+    """
+    from batch_scoring import score_csv
+    from report_accumulator import ReportAccumulator
+    
+    is_parquet = uploaded_file.name.lower().endswith('.parquet')
+    suffix = '.parquet' if is_parquet else '.csv'
+    sweep_stale_results()
+    handle, output_path = tempfile.mkstemp(prefix=RESULTS_PREFIX, suffix=suffix)
+    os.close(handle)
+    
+    predictor = load_model()
+    accumulator = ReportAccumulator()
+    progress_bar = st.progress(0.0, text="Scoring cohort...")
+    uploaded_file.seek(0)
+    try:
+        if is_parquet:
+            import pyarrow.parquet as pq
+            from arrow_io import score_parquet
+            
+            total_rows = max(pq.ParquetFile(uploaded_file).metadata.num_rows, 1)
+            def show_progress(n_rows, n_chunks):
+                progress_bar.progress(min(n_rows / total_rows, 1.0), text=f"Scored {n_rows:,} patients")
+            
+            stats = score_parquet(uploaded_file, output_path, predictor=predictor,
+                                  accumulator=accumulator, progress=show_progress,
+                                  validate='coerce')
+        else:
+            # CSV row counts are unknown up front; the read position tracks progress
+            total_bytes = max(uploaded_file.size, 1)
+            def show_progress(n_rows, n_chunks):
+                progress_bar.progress(min(uploaded_file.tell() / total_bytes, 1.0),
+                                      text=f"Scored {n_rows:,} patients")
+            
+            stats = score_csv(uploaded_file, output_path, predictor=predictor,
+                              accumulator=accumulator, progress=show_progress, validate='coerce')
+    except (ImportError, KeyError, ValueError) as error:
+        os.remove(output_path)
+        progress_bar.empty()
+        reason = f"missing column {error}" if isinstance(error, KeyError) else error
+        st.error(f"Could not score {uploaded_file.name}: {reason}")
+        return None
+    
+    progress_bar.empty()
+    return {
+        'file_id': uploaded_file.file_id,
+        'name': uploaded_file.name,
+        'path': output_path,
+        'rows': stats['rows'],
+        'seconds': stats['seconds'],
+        'report': accumulator.report(predictor),
+        'validation': None if stats.get('validation') is None or stats['validation'].is_valid
+                      else stats['validation'].message()
+    }
+
+# Streamlit >= 1.37 reruns only the fragment when a widget inside it changes
+fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda func: func)
+
+@fragment
+def assessment_section():
+    """Patient inputs and results; the only part of the page that reruns on input changes"""
     # Patient Information Input
     st.markdown("### 📋 Patient Information")
     
@@ -292,15 +517,10 @@ def main():
         vascularity = st.selectbox("Vascularity", ["normal", "increased"])
         st.markdown("")  # Empty space for alignment
     
-    # Calculate Risk
-    patient_data = {
-        'age': age, 'gender': gender, 'location': location, 'size': size,
-        'margins': margins, 'echo': echo, 'vascularity': vascularity
-    }
-    
-    input_df = pd.DataFrame([patient_data])
-    probability = predictor.predict_proba(input_df)[0]
-    risk_result = predictor.predict_risk_category(input_df)[0]
+    # Calculate Risk (scored and audited on every run; interval and explanation memoized)
+    predictor = load_model()
+    risk_result = assess_patient(predictor, age, gender, location, size, margins, echo, vascularity)
+    probability = risk_result['probability']
     
     # Results Section
     st.markdown("### 🎯 Risk Assessment Results")
@@ -309,9 +529,16 @@ def main():
     
     with col1:
         # Risk gauge
-        gauge_fig = create_simple_gauge(probability)
-        st.plotly_chart(gauge_fig, use_container_width=True)
-        
+        st.plotly_chart(gauge_figure(probability), use_container_width=True)
+        st.caption(
+            f"Coefficient-only uncertainty: {risk_result['probability_lower']:.1%} – "
+            f"{risk_result['probability_upper']:.1%}. Propagates the published odds-ratio "
+            "confidence intervals only (delta method); the intercept has no published interval "
+            "and is held fixed, so this is not a full 95% confidence interval and is narrowest "
+            "near the reference patient."
+        )
+    
+    with col2:
         # Risk category display
         risk_category = risk_result['risk_category']
         if "Low" in risk_category:
@@ -332,22 +559,137 @@ def main():
         </div>
         """, unsafe_allow_html=True)
     
+    # Per-patient explanation: how each finding moves the log-odds
+    st.plotly_chart(waterfall_figure(risk_result['intercept'], risk_result['contributions']),
+                    use_container_width=True)
+    st.caption(
+        "The reference patient is a 50-year-old woman with a ≤2cm parotid tumor, regular margins, "
+        "iso-hyperechoic echo pattern and normal vascularity. Red steps raise the risk, green steps lower it."
+    )
+
+@fragment
+def batch_section():
+    """Cohort upload, scoring summary and results download"""
+    st.markdown("### 📦 Batch Cohort Scoring")
+    st.markdown(
+        "Upload a CSV or Parquet file with the columns **age, gender, location, size, margins, "
+        "echo** and **vascularity** (as in `literature_batch_analysis_results.csv`). "
+        "Every row is scored and returned with its probability, risk category and recommendation."
+    )
+    
+    uploaded_file = st.file_uploader("Patient cohort", type=['csv', 'parquet'])
+    if uploaded_file is None:
+        discard_batch()
+        return
+    
+    # Score each upload once; reruns reuse the results file on disk (and touch
+    # it, so sweep_stale_results keeps it while the session is open)
+    batch = st.session_state.get('batch')
+    if batch is not None and batch['file_id'] == uploaded_file.file_id and os.path.exists(batch['path']):
+        os.utime(batch['path'])
+    else:
+        discard_batch()
+        batch = score_upload(uploaded_file)
+        if batch is None:
+            return
+        st.session_state['batch'] = batch
+    
+    report = batch['report']
+    predictions = report['predictions']
+    st.success(f"Scored {batch['rows']:,} patients in {batch['seconds']:.1f}s")
+    if batch['validation']:
+        st.warning(f"Input problems: {batch['validation']}. Unrecognized values were scored as "
+                   "the reference category and ages outside 18-90 were clipped.")
+    
+    col1, col2 = st.columns([1, 1], gap="large")
+    
+    with col1:
+        st.plotly_chart(create_distribution_chart(report['risk_distribution']), use_container_width=True)
+    
     with col2:
-        # Feature importance
-        importance = predictor.get_feature_importance()
-        importance_fig = create_simple_bar_chart(importance)
-        st.plotly_chart(importance_fig, use_container_width=True)
-        
-        # Model performance metrics
-        st.markdown("#### 📊 Model Performance")
+        st.markdown("#### 📊 Cohort Summary")
         
         metric_col1, metric_col2 = st.columns(2)
         with metric_col1:
-            st.metric("AUC-ROC", "0.89", help="Area Under the Curve - Receiver Operating Characteristic")
-            st.metric("Sensitivity", "85%", help="True positive rate")
+            st.metric("Patients", f"{batch['rows']:,}")
+            st.metric("Mean Risk", f"{predictions['mean_probability']:.1%}")
         with metric_col2:
-            st.metric("Specificity", "91%", help="True negative rate")
-            st.metric("Studies", "25+", help="Number of literature sources")
+            st.metric("High Risk", f"{report['risk_distribution'].get('High Risk', 0):,}")
+            st.metric("Max Risk", f"{predictions['max_probability']:.1%}")
+        
+        stem, suffix = os.path.splitext(batch['name'])
+        with open(batch['path'], 'rb') as results:
+            st.download_button(
+                "⬇️ Download results",
+                data=results,
+                file_name=f"{stem}_scored{suffix}",
+                mime='text/csv' if suffix.lower() == '.csv' else 'application/octet-stream'
+            )
+
+def profiling_section(profiler):
+    """Per-stage scoring timings since the server started (SALIVAI_PROFILE=1)"""
+    with st.expander("⏱️ Scoring Performance"):
+        snapshot = profiler.snapshot()
+        if not snapshot:
+            st.caption("No scoring calls recorded yet (cached assessments are not rescored).")
+            return
+        st.dataframe(
+            [
+                {
+                    'Stage': stage,
+                    'Calls': stats['calls'],
+                    'Rows': stats['rows'],
+                    'Total (ms)': stats['seconds'] * 1000,
+                    'ns / row': stats['seconds'] / stats['rows'] * 1e9 if stats['rows'] else 0.0
+                }
+                for stage, stats in snapshot.items()
+            ],
+            hide_index=True,
+            use_container_width=True
+        )
+        st.download_button("⬇️ Prometheus metrics", data=profiler.to_prometheus(),
+                           file_name='salivai_metrics.prom', mime='text/plain')
+
+def main():
+    # Header
+    st.markdown("""
+    <div class="main-header">
+        <h1 class="app-title">🏥 SalivAI</h1>
+        <p class="app-subtitle">Salivary Gland Malignancy Risk Assessment</p>
+        <p class="app-tagline">Evidence-based clinical decision support tool</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    single_tab, batch_tab = st.tabs(["🩺 Single Patient", "📦 Batch Cohort"])
+    
+    with single_tab:
+        assessment_section()
+        
+        # Static model overview (not part of the fragment, so never rebuilt on input changes)
+        st.markdown("### 📊 Model Overview")
+        
+        col1, col2 = st.columns([1, 1], gap="large")
+        
+        with col1:
+            # Feature importance
+            predictor = load_model()
+            st.plotly_chart(importance_figure(predictor, predictor.model_version),
+                            use_container_width=True)
+        
+        with col2:
+            # Model performance metrics
+            st.markdown("#### 📊 Model Performance")
+            
+            metric_col1, metric_col2 = st.columns(2)
+            with metric_col1:
+                st.metric("AUC-ROC", "0.89", help="Area Under the Curve - Receiver Operating Characteristic")
+                st.metric("Sensitivity", "85%", help="True positive rate")
+            with metric_col2:
+                st.metric("Specificity", "91%", help="True negative rate")
+                st.metric("Studies", "25+", help="Number of literature sources")
+    
+    with batch_tab:
+        batch_section()
     
     # Additional Information
     st.markdown("---")
@@ -379,6 +721,10 @@ def main():
         - **Echogenicity**: Hypoechoic pattern suggests malignancy (OR: 1.9, 95% CI: 1.2-3.0)
         - **Vascularity**: Increased vascularity correlates with risk (OR: 2.3, 95% CI: 1.6-3.3)
         """)
+    
+    profiler = load_registry().profiler
+    if profiler is not None:
+        profiling_section(profiler)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
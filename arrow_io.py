@@ -0,0 +1,302 @@
+"""
+SalivAI - Apache Arrow / Parquet Columnar I/O
+Scores Arrow tables and Parquet files without materializing per-row strings
+
+Categorical inputs are read as dictionary-encoded arrays and mapped to model
+codes through their (tiny) dictionaries, so only integer indices touch the
+hot path. Results are written back as Arrow arrays: a float64 probability
+column plus dictionary-encoded risk_category and recommendation columns.
+
+Requires pyarrow (optional dependency).
+
+Usage:
+    from arrow_io import score_parquet
+
+    stats = score_parquet('registry.parquet', 'registry_scored.parquet')
+"""
+
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from batch_scoring import INTERVAL_COLUMNS, RESULT_COLUMNS, peak_rss_mb, report_progress
+from explanation import explanation_column_names
+from salivary_gland_malignancy_predictor import (
+    CATEGORY_DTYPES,
+    CATEGORY_LEVELS,
+    FEATURE_NAMES,
+    LiteratureBasedMalignancyPredictor,
+    RiskCategoryResult
+)
+
+# Rows per record batch when streaming Parquet files
+DEFAULT_BATCH_SIZE = 256_000
+
+
+def _dictionary_codes(array, column):
+    """Model codes for one dictionary-encoded Arrow array via its dictionary indices"""
+    # Map each dictionary entry once; unknown entries become the reference level
+    recode = CATEGORY_DTYPES[column].categories.get_indexer(array.dictionary.to_pandas())
+    # Trailing 0 is the slot for nulls (filled with len(dictionary) below)
+    recode = np.append(np.maximum(recode, 0), 0).astype(np.int8)
+    indices = array.indices
+    if indices.null_count:
+        indices = pc.fill_null(indices, len(array.dictionary))
+    return recode[indices.to_numpy(zero_copy_only=False)]
+
+
+def arrow_category_codes(array, column):
+    """
+    Integer category codes (index into CATEGORY_LEVELS) for an Arrow column
+
+    Dictionary-encoded columns are decoded from their indices; plain string
+    columns are dictionary-encoded in Arrow first.
+    """
+    if isinstance(array, pa.ChunkedArray):
+        if array.num_chunks == 1:
+            return arrow_category_codes(array.chunk(0), column)
+        return np.concatenate([arrow_category_codes(chunk, column) for chunk in array.chunks])
+    if not pa.types.is_dictionary(array.type):
+        array = pc.dictionary_encode(array)
+    return _dictionary_codes(array, column)
+
+
+def arrow_float64(array):
+    """Numeric Arrow column as a float64 numpy array (nulls become NaN)"""
+    values = pc.cast(array, pa.float64())
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks()
+    return values.to_numpy(zero_copy_only=False)
+
+
+def arrow_ages(array):
+    """Age column as float64 (nulls become NaN)"""
+    return arrow_float64(array)
+
+
+def arrow_inputs(data):
+    """Ages and per-column category codes of an Arrow Table or RecordBatch"""
+    codes = {column: arrow_category_codes(data.column(column), column) for column in CATEGORY_LEVELS}
+    return arrow_ages(data.column('age')), codes
+
+
+def score_arrow(data, predictor=None):
+    """
+    Score an Arrow Table or RecordBatch
+
+    Parameters:
+    data (pa.Table or pa.RecordBatch): Columns age, gender, location, size,
+        margins, echo and vascularity
+    predictor (LiteratureBasedMalignancyPredictor, optional): Model to use
+
+    Returns:
+    RiskCategoryResult: Probabilities and risk category codes
+    """
+    if predictor is None:
+        predictor = LiteratureBasedMalignancyPredictor()
+    return predictor.predict_risk_category_from_codes(*arrow_inputs(data))
+
+
+def risk_result_arrays(result):
+    """
+    Arrow arrays for the result columns (RESULT_COLUMNS order)
+
+    risk_category and recommendation are dictionary arrays over the three
+    strata, sharing the int8 category codes as indices.
+    """
+    indices = pa.array(result.codes.view(np.int8), type=pa.int8())
+    return [
+        pa.array(result.probabilities, type=pa.float64()),
+        pa.DictionaryArray.from_arrays(indices, pa.array(result.categories.tolist())),
+        pa.DictionaryArray.from_arrays(indices, pa.array(result.recommendations.tolist()))
+    ]
+
+
+def _set_columns(data, names, arrays):
+    """Table with the named columns appended, or replaced where they already exist"""
+    table = pa.Table.from_batches([data]) if isinstance(data, pa.RecordBatch) else data
+    for name, array in zip(names, arrays):
+        if name in table.column_names:
+            table = table.set_column(table.column_names.index(name), name, array)
+        else:
+            table = table.append_column(name, array)
+    return table
+
+
+def append_result_columns(data, result):
+    """Return the Table/RecordBatch with the result columns appended (or replaced)"""
+    return _set_columns(data, RESULT_COLUMNS, risk_result_arrays(result))
+
+
+def append_interval_columns(data, interval):
+    """Return the Table/RecordBatch with the interval bounds (INTERVAL_COLUMNS) appended"""
+    arrays = [pa.array(bound, type=pa.float64()) for bound in (interval.lower, interval.upper)]
+    return _set_columns(data, INTERVAL_COLUMNS, arrays)
+
+
+def explanation_arrays(explanation):
+    """
+    Arrow arrays for the explanation columns (explanation_column_names order)
+
+    Driver names are dictionary arrays over FEATURE_NAMES (null where the
+    driver's contribution is zero).
+    """
+    if explanation.drivers is None:
+        return [pa.array(explanation.contributions[:, index], type=pa.float64())
+                for index in range(explanation.contributions.shape[1])]
+    codes = explanation.driver_codes()
+    names = pa.array(FEATURE_NAMES)
+    arrays = []
+    for rank in range(explanation.top_k):
+        indices = pa.array(codes[:, rank], type=pa.int8(), mask=codes[:, rank] < 0)
+        arrays.append(pa.DictionaryArray.from_arrays(indices, names))
+        arrays.append(pa.array(explanation.contributions[:, rank], type=pa.float64()))
+    return arrays
+
+
+def append_explanation_columns(data, explanation):
+    """Return the Table/RecordBatch with the explanation columns appended (or replaced)"""
+    explain = 'all' if explanation.drivers is None else explanation.top_k
+    return _set_columns(data, explanation_column_names(explain), explanation_arrays(explanation))
+
+
+def validate_arrow(data, mode, first_row=0):
+    """
+    schema_validation.validate_cohort for an Arrow Table or RecordBatch
+
+    Only the input columns go through pandas (dictionary columns become
+    categoricals, so each column's few categories are checked once).
+
+    Parameters:
+    data (pa.Table or pa.RecordBatch): Input batch
+    mode (str): 'strict', 'coerce' or 'drop' (see validate_cohort)
+    first_row (int): Row number of the batch's first row in the whole input
+
+    Returns:
+    tuple: (Table with repaired input columns in their original Arrow types
+        ('coerce') or without the invalid rows ('drop'), ValidationReport)
+    """
+    from schema_validation import validate_cohort
+
+    table = pa.Table.from_batches([data]) if isinstance(data, pa.RecordBatch) else data
+    columns = [column for column in ('age',) + tuple(CATEGORY_LEVELS) if column in table.column_names]
+    frame = table.select(columns).to_pandas()
+    frame.index = frame.index + first_row
+    valid, report = validate_cohort(frame, mode)
+    if mode == 'drop':
+        if report.n_invalid:
+            table = table.filter(pa.array(~report.invalid_mask))
+    elif valid is not frame:
+        arrays = [pa.Array.from_pandas(valid[column]).cast(table.schema.field(column).type)
+                  for column in columns]
+        table = _set_columns(table, columns, arrays)
+    return table, report
+
+
+def open_parquet(path, memory_map=True):
+    """ParquetFile whose categorical columns are always read dictionary-encoded"""
+    return pq.ParquetFile(path, memory_map=memory_map, read_dictionary=list(CATEGORY_LEVELS))
+
+
+def iter_parquet_batches(path, batch_size=DEFAULT_BATCH_SIZE, memory_map=True):
+    """Stream a Parquet file as record batches (see open_parquet), row group by row group"""
+    return open_parquet(path, memory_map).iter_batches(batch_size=batch_size)
+
+
+def score_parquet(input_path, output_path, predictor=None, batch_size=DEFAULT_BATCH_SIZE,
+                  memory_map=True, accumulator=None, label_column=None, progress=False,
+                  interval_level=None, explain=None, validate=None):
+    """
+    Score a Parquet file into an output Parquet file, one record batch at a time
+
+    Parameters:
+    input_path (str or file-like): Parquet file with the predictor input columns
+    output_path (str): Destination Parquet file (overwritten)
+    predictor (LiteratureBasedMalignancyPredictor, optional): Model to use
+    batch_size (int): Rows per record batch
+    memory_map (bool): Memory-map the input file
+    accumulator (ReportAccumulator, optional): Collects report statistics per batch
+    label_column (str, optional): Outcome column for the accumulator's performance metrics
+    progress (bool or callable): Print a line after every batch, or call
+        progress(rows_so_far, batches_so_far)
+    interval_level (float, optional): Append delta-method interval bounds at this coverage
+    explain ('all' or int, optional): Append every feature's contribution or the top-k drivers
+    validate (str, optional): Check every batch first with validate_arrow
+        ('strict', 'coerce' or 'drop'), as score_csv does
+
+    Returns:
+    dict: rows, chunks, seconds, rows_per_second and peak_rss_mb, plus
+        validation (a ValidationReport over all input rows) when validating
+    """
+    if predictor is None:
+        predictor = LiteratureBasedMalignancyPredictor()
+    reports = []
+
+    start = time.perf_counter()
+    n_rows = 0
+    n_input_rows = 0
+    n_chunks = 0
+    writer = None
+    try:
+        for batch in iter_parquet_batches(input_path, batch_size, memory_map):
+            if validate is not None:
+                n_batch_rows = batch.num_rows
+                batch, report = validate_arrow(batch, validate, n_input_rows)
+                reports.append(report)
+                n_input_rows += n_batch_rows
+            result = score_arrow(batch, predictor)
+            if accumulator is not None:
+                labels = arrow_float64(batch.column(label_column)) if label_column else None
+                accumulator.update(result, labels)
+            table = predictor.profiled('output', batch.num_rows, append_result_columns, batch,
+                                       result)
+            if interval_level is not None:
+                interval = predictor.predict_proba_interval_from_codes(
+                    *arrow_inputs(batch), level=interval_level, method='delta'
+                )
+                table = append_interval_columns(table, interval)
+            if explain is not None:
+                explanation = predictor.explain_from_codes(
+                    *arrow_inputs(batch), top_k=None if explain == 'all' else explain
+                )
+                table = append_explanation_columns(table, explanation)
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, table.schema)
+            writer.write_table(table)
+            n_rows += batch.num_rows
+            n_chunks += 1
+            report_progress(progress, n_rows, n_chunks)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is None:
+        # Empty input: still produce a (row-less) output file, typed as a scored batch would be
+        schema = open_parquet(input_path, memory_map).schema_arrow
+        empty = RiskCategoryResult(np.empty(0), np.empty(0, dtype=np.uint8))
+        table = append_result_columns(schema.empty_table(), empty)
+        if interval_level is not None:
+            table = _set_columns(table, INTERVAL_COLUMNS, [pa.array([], type=pa.float64())] * 2)
+        if explain is not None:
+            empty_codes = {column: np.empty(0, dtype=np.int8) for column in CATEGORY_LEVELS}
+            explanation = predictor.explain_from_codes(
+                np.empty(0), empty_codes, top_k=None if explain == 'all' else explain
+            )
+            table = append_explanation_columns(table, explanation)
+        pq.write_table(table, output_path)
+
+    seconds = time.perf_counter() - start
+    stats = {
+        'rows': n_rows,
+        'chunks': n_chunks,
+        'seconds': seconds,
+        'rows_per_second': n_rows / seconds if seconds > 0 else float('inf'),
+        'peak_rss_mb': peak_rss_mb()
+    }
+    if validate is not None:
+        from schema_validation import ValidationReport
+        stats['validation'] = ValidationReport.concat(reports)
+    return stats
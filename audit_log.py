@@ -0,0 +1,469 @@
+"""
+SalivAI - Prediction Audit Log
+Append-only JSONL record of every prediction for clinical governance
+
+AuditLogger.log() only snapshots references to a scored batch and queues
+them; a background thread turns batches into JSONL lines (one per patient),
+writes them in large blocks and rotates the file by size or age. Rotated
+segments can be gzip-compressed. Memory is bounded: when the queue holds
+`max_pending` patients, log() blocks the caller (backpressure) or, with
+overflow='drop', drops the batch and counts it.
+
+Each line holds the timestamp, batch id, source, model version, the seven
+inputs, the probability and the risk category, e.g.
+    {"ts": "2026-01-05T09:12:44.120Z", "batch": "3f2a9c1e7b04-17", "source": "service",
+     "model_version": "literature-8c1d2e3f4a5b", "age": 55.0, "gender": "male", ...,
+     "probability": 0.8552, "risk_category": "High Risk"}
+
+Usage:
+    from audit_log import AuditLogger, summarize_audit_log
+
+    with AuditLogger('audit_logs/predictions.jsonl', source='batch') as logger:
+        predictor = LiteratureBasedMalignancyPredictor(audit_logger=logger)
+        predictor.predict_risk_category(X)
+
+    print(summarize_audit_log('audit_logs/predictions.jsonl'))
+"""
+
+import collections
+import datetime
+import functools
+import glob
+import gzip
+import itertools
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from scoring_core import CATEGORY_LEVELS, RISK_CATEGORIES, model_fingerprint
+
+DEFAULT_AUDIT_PATH = os.path.join('audit_logs', 'predictions.jsonl')
+
+# Rotate the active file once it exceeds this size...
+DEFAULT_MAX_BYTES = 256 * 1024 ** 2
+
+# ...or once it has been open this long (seconds; None disables)
+DEFAULT_MAX_AGE = 24 * 60 * 60
+
+# Patients queued but not yet written before log() applies backpressure
+DEFAULT_MAX_PENDING = 1_000_000
+
+# Seconds between background flushes
+DEFAULT_FLUSH_INTERVAL = 0.5
+
+# Patients formatted and written per block (bounds the text held in memory)
+WRITE_BLOCK_ROWS = 50_000
+
+OVERFLOW_POLICIES = ('block', 'drop')
+
+INPUT_COLUMNS = ['age'] + list(CATEGORY_LEVELS)
+
+# JSON text of every category level and risk category, encoded once
+_LEVEL_JSON = {
+    column: np.array([json.dumps(level) for level in levels], dtype=object)
+    for column, levels in CATEGORY_LEVELS.items()
+}
+_RISK_CATEGORY_JSON = np.array([json.dumps(risk['risk_category']) for risk in RISK_CATEGORIES],
+                               dtype=object)
+
+# Everything after the per-batch prefix of one JSONL line
+_LINE_TEMPLATE = '%s' + ''.join(', "%s": %%s' % column for column in INPUT_COLUMNS) + \
+    ', "probability": %s, "risk_category": %s}\n'
+
+# Sources and model versions repeat on every batch
+_json_string = functools.lru_cache(maxsize=256)(json.dumps)
+
+
+def _input_columns(inputs):
+    """
+    Snapshot the input columns of a batch without copying row data
+
+    Accepts a DataFrame, a list of patient dicts or a dict of column arrays
+    (categorical columns as strings or as integer codes).
+    """
+    if isinstance(inputs, list):
+        return {column: [record.get(column) for record in inputs] for column in INPUT_COLUMNS}
+    # Series are kept as references and converted on the writer thread
+    return {column: inputs[column] for column in INPUT_COLUMNS}
+
+
+def _json_column(values, column):
+    """JSON text of every value of one input column"""
+    if column == 'age':
+        ages = np.asarray(values, dtype=np.float64)
+        # NaN is not valid JSON
+        return ['null' if age != age else repr(age) for age in ages.tolist()]
+    if hasattr(values, 'cat'):
+        # Categorical Series: encode each category once, then gather by code (-1 = missing)
+        categories = [json.dumps(str(category)) for category in values.cat.categories] + ['null']
+        return np.array(categories, dtype=object)[values.cat.codes.to_numpy()].tolist()
+    values = np.asarray(values)
+    if values.dtype.kind in 'iu':
+        return _LEVEL_JSON[column][values].tolist()
+    # Encode each distinct value once
+    cache = {}
+    return [
+        cache[value] if value in cache else cache.setdefault(value, json.dumps(
+            None if value is None or value != value else str(value)))
+        for value in values.tolist()
+    ]
+
+
+def _format_timestamp(timestamp):
+    """ISO 8601 UTC timestamp with milliseconds"""
+    seconds = int(timestamp)
+    return '%s.%03dZ' % (time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(seconds)),
+                         int((timestamp - seconds) * 1000))
+
+
+def _json_columns(batches, column):
+    """JSON text of one input column across queued batches, converted in as few steps as possible"""
+    values = [batch[4][column] for batch in batches]
+    if column == 'age':
+        return _json_column(np.concatenate([np.asarray(ages, dtype=np.float64) for ages in values]),
+                            column)
+    if all(isinstance(codes, np.ndarray) and codes.dtype.kind in 'iu' for codes in values):
+        # Integer-coded batches (service, parallel scoring): one gather for all of them
+        return _LEVEL_JSON[column][np.concatenate(values)].tolist()
+    texts = []
+    for batch_values in values:
+        texts.extend(_json_column(batch_values, column))
+    return texts
+
+
+def format_batches(batches, session):
+    """JSONL text for queued batches, one line per patient"""
+    prefixes = []
+    for timestamp, number, source, model_version, _, probabilities, _ in batches:
+        prefix = '{"ts": "%s", "batch": "%s-%d", "source": %s, "model_version": %s' % (
+            _format_timestamp(timestamp), session, number,
+            _json_string(source), _json_string(model_version)
+        )
+        prefixes.extend([prefix] * len(probabilities))
+    fields = [_json_columns(batches, column) for column in INPUT_COLUMNS]
+    probabilities = ['null' if probability != probability else repr(probability)
+                     for probability in np.concatenate([batch[5] for batch in batches]).tolist()]
+    categories = _RISK_CATEGORY_JSON[np.concatenate([batch[6] for batch in batches])].tolist()
+    return ''.join([_LINE_TEMPLATE % row for row in
+                    zip(prefixes, *fields, probabilities, categories)])
+
+
+def _write_groups(batches):
+    """Split queued batches into groups of about WRITE_BLOCK_ROWS patients"""
+    group = []
+    n_rows = 0
+    for batch in batches:
+        group.append(batch)
+        n_rows += len(batch[5])
+        if n_rows >= WRITE_BLOCK_ROWS:
+            yield group
+            group = []
+            n_rows = 0
+    if group:
+        yield group
+
+
+class AuditLogger:
+    """
+    Buffered, background-flushed JSONL audit log with rotation
+
+    Thread-safe; one logger can be shared by every predictor in a process.
+    Call close() (or use it as a context manager) to flush on shutdown.
+    """
+
+    def __init__(self, path=DEFAULT_AUDIT_PATH, source=None, max_bytes=DEFAULT_MAX_BYTES,
+                 max_age=DEFAULT_MAX_AGE, compress=False, max_pending=DEFAULT_MAX_PENDING,
+                 overflow='block', flush_interval=DEFAULT_FLUSH_INTERVAL, fsync=False):
+        """
+        Parameters:
+        path (str): Active log file; rotated segments get a timestamp suffix
+        source (str, optional): Default `source` field (e.g. 'service', 'streamlit')
+        max_bytes (int): Rotate once the active file reaches this size
+        max_age (float, optional): Rotate once the active file is this many seconds old
+        compress (bool): gzip rotated segments
+        max_pending (int): Queued patients at which backpressure applies
+        overflow (str): 'block' waits for the writer; 'drop' discards the batch
+        flush_interval (float): Seconds between background writes
+        fsync (bool): fsync after every write (durable, slower)
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}, got {overflow!r}")
+        self.path = path
+        self.source = source
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.compress = compress
+        self.max_pending = max_pending
+        self.overflow = overflow
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+
+        # Monitoring counters
+        self.n_logged = 0
+        self.n_written = 0
+        self.n_dropped = 0
+
+        # Batch ids are "<session>-<n>": unique per logger without a uuid per batch
+        self.session = uuid.uuid4().hex[:12]
+        self._batch_numbers = itertools.count()
+
+        self._queue = collections.deque()
+        self._n_pending = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._error = None
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = None
+        self._opened_at = None
+        self._open()
+
+        self._writer = threading.Thread(target=self._run, name='salivai-audit-writer', daemon=True)
+        self._writer.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __getstate__(self):
+        raise TypeError("AuditLogger cannot be pickled; log from the process that owns it")
+
+    def log(self, inputs, probabilities, risk_codes, model_version, source=None):
+        """
+        Queue one scored batch
+
+        Parameters:
+        inputs: DataFrame, list of patient dicts or dict of column arrays
+        probabilities (np.array): Predicted probabilities
+        risk_codes (np.array): Risk category codes (index into RISK_CATEGORIES)
+        model_version (str): Identifier of the model that produced the scores
+        source (str, optional): Overrides the logger's default source
+
+        Returns:
+        bool: False if the batch was dropped
+        """
+        n_rows = len(probabilities)
+        if n_rows == 0:
+            return True
+        batch = (
+            time.time(),
+            next(self._batch_numbers),
+            source if source is not None else self.source,
+            model_version,
+            _input_columns(inputs),
+            np.array(probabilities, dtype=np.float64),
+            np.array(risk_codes, dtype=np.uint8)
+        )
+        with self._condition:
+            if self._closed:
+                raise ValueError("AuditLogger is closed")
+            while self._n_pending + n_rows > self.max_pending and self._n_pending > 0:
+                if self.overflow == 'drop':
+                    self.n_dropped += n_rows
+                    return False
+                # Backpressure: wake the writer and wait for it to drain
+                self._condition.notify_all()
+                self._condition.wait()
+                if self._closed:
+                    raise ValueError("AuditLogger is closed")
+            self._queue.append(batch)
+            self._n_pending += n_rows
+            self.n_logged += n_rows
+        return True
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far is on disk"""
+        with self._condition:
+            target = self.n_logged
+            self._condition.notify_all()
+            self._condition.wait_for(
+                lambda: self.n_written >= target or self._error is not None,
+                timeout
+            )
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        """Flush remaining records and stop the writer thread"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._writer.join()
+        self._file.close()
+        if self._error is not None:
+            raise self._error
+
+    def _open(self):
+        self._file = open(self.path, 'a', encoding='utf-8', newline='\n')
+        self._opened_at = time.time()
+
+    def _rotate(self):
+        """Move the active file aside (optionally gzipped) and start a new one"""
+        self._file.close()
+        stamp = datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%S%f')
+        rotated = f"{self.path}.{stamp}"
+        counter = 1
+        while os.path.exists(rotated) or os.path.exists(rotated + '.gz'):
+            rotated = f"{self.path}.{stamp}-{counter}"
+            counter += 1
+        os.replace(self.path, rotated)
+        if self.compress:
+            with open(rotated, 'rb') as source, gzip.open(rotated + '.gz', 'wb') as target:
+                shutil.copyfileobj(source, target)
+            os.remove(rotated)
+        self._open()
+
+    def _needs_rotation(self):
+        if self._file.tell() >= self.max_bytes:
+            return True
+        return self.max_age is not None and time.time() - self._opened_at >= self.max_age
+
+    def _run(self):
+        """Writer thread: drain the queue every flush_interval (or when woken)"""
+        while True:
+            with self._condition:
+                if not self._queue and not self._closed:
+                    self._condition.wait(self.flush_interval)
+                batches = list(self._queue)
+                self._queue.clear()
+                closing = self._closed
+
+            try:
+                n_rows = 0
+                for group in _write_groups(batches):
+                    self._file.write(format_batches(group, self.session))
+                    n_rows += sum(len(batch[5]) for batch in group)
+                    if self._needs_rotation():
+                        self._file.flush()
+                        self._rotate()
+                if batches:
+                    self._file.flush()
+                    if self.fsync:
+                        os.fsync(self._file.fileno())
+                elif self.max_age is not None and self._file.tell() and self._needs_rotation():
+                    self._rotate()
+            except Exception as error:
+                # Surface write failures to flush()/close() instead of dying silently
+                self._error = error
+                n_rows = sum(len(batch[5]) for batch in batches)
+
+            with self._condition:
+                self._n_pending -= n_rows
+                self.n_written += n_rows
+                self._condition.notify_all()
+                if closing and not self._queue:
+                    return
+
+
+def audit_log_files(path=DEFAULT_AUDIT_PATH):
+    """Rotated segments (oldest first) followed by the active file"""
+    files = sorted(glob.glob(glob.escape(path) + '.*'))
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+
+def iter_audit_records(path=DEFAULT_AUDIT_PATH):
+    """Yield every logged prediction as a dict, across rotated and compressed segments"""
+    for file_path in audit_log_files(path):
+        opener = gzip.open if file_path.endswith('.gz') else open
+        with opener(file_path, 'rt', encoding='utf-8') as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def read_audit_log(path=DEFAULT_AUDIT_PATH):
+    """All logged predictions as a DataFrame (string fields as categoricals)"""
+    import pandas as pd
+
+    frame = pd.DataFrame.from_records(iter_audit_records(path))
+    for column in ['source', 'model_version', 'risk_category'] + list(CATEGORY_LEVELS):
+        if column in frame:
+            frame[column] = frame[column].astype('category')
+    return frame
+
+
+def summarize_audit_log(path=DEFAULT_AUDIT_PATH):
+    """
+    Aggregate a log in one streaming pass
+
+    Returns:
+    dict: n_predictions, first/last timestamps, mean_probability and counts by
+        model_version, source and risk_category
+    """
+    n_predictions = 0
+    probability_sum = 0.0
+    first = last = None
+    counts = {field: collections.Counter() for field in ('model_version', 'source', 'risk_category')}
+    for record in iter_audit_records(path):
+        n_predictions += 1
+        if record['probability'] is not None:
+            probability_sum += record['probability']
+        first = record['ts'] if first is None or record['ts'] < first else first
+        last = record['ts'] if last is None or record['ts'] > last else last
+        for field, counter in counts.items():
+            counter[record[field]] += 1
+    return {
+        'n_predictions': n_predictions,
+        'first_prediction': first,
+        'last_prediction': last,
+        'mean_probability': probability_sum / n_predictions if n_predictions else None,
+        **{f'by_{field}': dict(counter) for field, counter in counts.items()}
+    }
+
+
+def replay_audit_log(path=DEFAULT_AUDIT_PATH, predictor=None, chunksize=100_000):
+    """
+    Re-score logged inputs and compare with the logged results
+
+    Records are matched on the coefficient fingerprint that ends every
+    model_version, not on its model-name prefix, so a log written through the
+    coefficient registry ("literature-v1-<fingerprint>") replays against any
+    predictor with the same coefficients and thresholds.
+
+    Returns:
+    dict: n_compared, n_skipped (other coefficients or thresholds),
+        max_abs_difference and n_category_mismatches
+    """
+    if predictor is None:
+        from salivary_gland_malignancy_predictor import LiteratureBasedMalignancyPredictor
+        predictor = LiteratureBasedMalignancyPredictor()
+    fingerprint = model_fingerprint(predictor.literature_coefficients, predictor.risk_thresholds)
+    stats = {'n_compared': 0, 'n_skipped': 0, 'max_abs_difference': 0.0, 'n_category_mismatches': 0}
+
+    def compare(records):
+        import pandas as pd
+
+        frame = pd.DataFrame.from_records(records)
+        result = predictor.predict_risk_category_columnar(frame[INPUT_COLUMNS].astype({'age': float}))
+        logged = frame['probability'].to_numpy(dtype=np.float64, na_value=np.nan)
+        difference = np.abs(result.probabilities - logged)
+        stats['n_compared'] += len(frame)
+        stats['max_abs_difference'] = max(stats['max_abs_difference'], float(np.nanmax(difference)))
+        stats['n_category_mismatches'] += int(
+            np.count_nonzero(result.categories[result.codes] != frame['risk_category'].to_numpy())
+        )
+
+    chunk = []
+    for record in iter_audit_records(path):
+        if record['model_version'].rsplit('-', 1)[-1] != fingerprint:
+            stats['n_skipped'] += 1
+            continue
+        chunk.append(record)
+        if len(chunk) >= chunksize:
+            compare(chunk)
+            chunk = []
+    if chunk:
+        compare(chunk)
+    return stats
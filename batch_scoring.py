@@ -0,0 +1,307 @@
+"""
+SalivAI - Streaming Batch Scoring
+Scores patient cohorts of any size chunk by chunk with constant memory
+
+Reads a CSV with the predictor input columns (age, gender, location, size,
+margins, echo, vascularity) and writes the same rows with
+malignancy_probability, risk_category and recommendation appended, matching
+literature_batch_analysis_results.csv.
+
+Parquet input (read as dictionary-encoded Arrow batches) is scored into a
+Parquet output with the same columns; see arrow_io.py.
+
+Usage:
+    python batch_scoring.py patients.csv results.csv
+    python batch_scoring.py patients.csv results.csv --chunksize 250000
+    python batch_scoring.py patients.csv results.csv --workers 8
+    python batch_scoring.py registry.parquet registry_scored.parquet
+    python batch_scoring.py patients.csv results.csv --report report.json --label-column outcome
+    python batch_scoring.py patients.csv results.csv --audit-log audit_logs/predictions.jsonl
+    python batch_scoring.py patients.csv results.csv --interval-level 0.95
+    python batch_scoring.py patients.csv results.csv --explain 3
+    python batch_scoring.py patients.csv results.csv --metrics metrics/salivai.prom
+    python batch_scoring.py patients.csv results.csv --validate drop --validation-report issues.csv
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import pandas as pd
+
+from salivary_gland_malignancy_predictor import (
+    CATEGORY_LEVELS,
+    LiteratureBasedMalignancyPredictor
+)
+
+# Rows per chunk; ~100k rows keeps each chunk at a few tens of MB
+DEFAULT_CHUNKSIZE = 100_000
+
+# Columns appended to every scored row (same as the demo results CSV)
+RESULT_COLUMNS = ['malignancy_probability', 'risk_category', 'recommendation']
+
+# Delta-method interval bounds appended when an interval level is requested
+INTERVAL_COLUMNS = ['malignancy_probability_lower', 'malignancy_probability_upper']
+
+# Parse categorical inputs straight into categoricals: cheaper to read and
+# to encode, and unknown values are preserved for the output file
+CSV_DTYPES = {column: 'category' for column in CATEGORY_LEVELS}
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def report_progress(progress, n_rows, n_chunks):
+    """Print a progress line (progress=True) or pass the counts to a progress callback"""
+    if callable(progress):
+        progress(n_rows, n_chunks)
+    elif progress:
+        print(f"  chunk {n_chunks}: {n_rows:,} rows scored", file=sys.stderr)
+
+
+def _append_results(chunk, risk_results):
+    """Write the RESULT_COLUMNS of a scored chunk"""
+    chunk['malignancy_probability'] = risk_results.probabilities
+    chunk['risk_category'] = risk_results.to_categorical('risk_category')
+    chunk['recommendation'] = risk_results.to_categorical('recommendation')
+    return chunk
+
+
+def score_chunk(predictor, chunk, accumulator=None, label_column=None, interval_level=None,
+                explain=None):
+    """
+    Append malignancy_probability, risk_category and recommendation to a chunk
+
+    Parameters:
+    predictor (LiteratureBasedMalignancyPredictor): Model used for scoring
+    chunk (pd.DataFrame): Input rows (modified in place)
+    accumulator (ReportAccumulator, optional): Updated with the chunk's results
+    label_column (str, optional): Outcome column passed to the accumulator
+    interval_level (float, optional): Also append delta-method interval bounds
+        (INTERVAL_COLUMNS) at this coverage, e.g. 0.95
+    explain ('all' or int, optional): Also append the log-odds contribution of
+        every feature ('all') or the top-k risk drivers (k); see explanation.py
+
+    Returns:
+    pd.DataFrame: The chunk with the result columns appended
+    """
+    risk_results = predictor.predict_risk_category_columnar(chunk)
+    if accumulator is not None:
+        accumulator.update(risk_results, chunk[label_column] if label_column else None)
+    predictor.profiled('output', len(chunk), _append_results, chunk, risk_results)
+    if interval_level is not None:
+        interval = predictor.predict_proba_interval(chunk, level=interval_level, method='delta')
+        chunk[INTERVAL_COLUMNS[0]] = interval.lower
+        chunk[INTERVAL_COLUMNS[1]] = interval.upper
+    if explain is not None:
+        explanation = predictor.explain(chunk, top_k=None if explain == 'all' else explain)
+        for column, values in explanation.to_frame().items():
+            chunk[column] = values.values
+    return chunk
+
+
+def iter_csv_chunks(input_path, chunksize=DEFAULT_CHUNKSIZE):
+    """Read a patient CSV lazily in fixed-size chunks"""
+    return pd.read_csv(input_path, chunksize=chunksize, dtype=CSV_DTYPES)
+
+
+def score_csv(input_path, output_path, predictor=None, chunksize=DEFAULT_CHUNKSIZE,
+              progress=False, accumulator=None, label_column=None, interval_level=None,
+              explain=None, validate=None):
+    """
+    Score a patient CSV into an output CSV without loading it into memory
+
+    Parameters:
+    input_path (str or file-like): CSV with the predictor input columns
+    output_path (str): Destination CSV (overwritten)
+    predictor (LiteratureBasedMalignancyPredictor, optional): Model to use
+    chunksize (int): Rows read, scored and written per step
+    progress (bool or callable): Print a line after every chunk, or call
+        progress(rows_so_far, chunks_so_far)
+    accumulator (ReportAccumulator, optional): Collects report statistics per chunk
+    label_column (str, optional): Outcome column for the accumulator's performance metrics
+    interval_level (float, optional): Append delta-method interval bounds at this coverage
+    explain ('all' or int, optional): Append every feature's contribution or the top-k drivers
+    validate (str, optional): Check every chunk first with schema_validation
+        ('strict', 'coerce' or 'drop'); 'strict' raises SchemaValidationError
+        at the first invalid chunk
+
+    Returns:
+    dict: rows, chunks, seconds, rows_per_second and peak_rss_mb, plus
+        validation (a ValidationReport over all input rows) when validating
+    """
+    if predictor is None:
+        predictor = LiteratureBasedMalignancyPredictor()
+    if validate is not None:
+        from schema_validation import ValidationReport, validate_cohort
+        reports = []
+
+    start = time.perf_counter()
+    n_rows = 0
+    n_chunks = 0
+
+    with open(output_path, 'w', newline='', encoding='utf-8') as output:
+        for chunk in iter_csv_chunks(input_path, chunksize):
+            if validate is not None:
+                chunk, report = validate_cohort(chunk, validate)
+                reports.append(report)
+            score_chunk(predictor, chunk, accumulator, label_column, interval_level,
+                        explain).to_csv(output, header=n_chunks == 0, index=False)
+            n_rows += len(chunk)
+            n_chunks += 1
+            report_progress(progress, n_rows, n_chunks)
+
+    seconds = time.perf_counter() - start
+    stats = {
+        'rows': n_rows,
+        'chunks': n_chunks,
+        'seconds': seconds,
+        'rows_per_second': n_rows / seconds if seconds > 0 else float('inf'),
+        'peak_rss_mb': peak_rss_mb()
+    }
+    if validate is not None:
+        stats['validation'] = ValidationReport.concat(reports)
+    return stats
+
+
+def parse_explain(value):
+    """--explain value: 'all' or a positive number of top drivers"""
+    if value == 'all':
+        return value
+    try:
+        top_k = int(value)
+    except ValueError:
+        top_k = 0
+    if top_k < 1:
+        raise argparse.ArgumentTypeError(f"expected 'all' or a positive integer, got {value!r}")
+    return top_k
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Stream a patient CSV through the SalivAI literature-based predictor"
+    )
+    parser.add_argument('input', help="Input CSV (or .parquet) with the predictor columns")
+    parser.add_argument('output', help="Output CSV (or .parquet) with input columns plus results")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help=f"Rows per chunk (default: {DEFAULT_CHUNKSIZE:,})")
+    parser.add_argument('--progress', action='store_true', help="Report progress per chunk")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Score byte-range shards in this many processes (default: 1)")
+    parser.add_argument('--report', help="Also write a generate_report-style JSON summary here")
+    parser.add_argument('--label-column',
+                        help="Outcome column (1 = malignant) for the report's performance metrics")
+    parser.add_argument('--audit-log', help="Append every prediction to this JSONL audit log")
+    parser.add_argument('--interval-level', type=float,
+                        help="Append delta-method probability bounds at this coverage (e.g. 0.95)")
+    parser.add_argument('--explain', nargs='?', const='all', type=parse_explain, metavar='K',
+                        help="Append each feature's log-odds contribution, or only the top K "
+                             "risk drivers per patient")
+    parser.add_argument('--metrics',
+                        help="Profile the scoring stages and write Prometheus metrics here")
+    parser.add_argument('--validate', choices=['strict', 'coerce', 'drop'],
+                        help="Check the inputs first: stop at the first invalid chunk, repair "
+                             "what can be repaired, or drop invalid rows")
+    parser.add_argument('--validation-report',
+                        help="Write one CSV row per input problem found by --validate here")
+    args = parser.parse_args(argv)
+
+    accumulator = None
+    if args.report:
+        from report_accumulator import ReportAccumulator
+        accumulator = ReportAccumulator()
+    elif args.label_column:
+        parser.error("--label-column requires --report")
+    if args.validate and args.workers > 1:
+        parser.error("--validate is not supported with --workers")
+    if args.validation_report and not args.validate:
+        parser.error("--validation-report requires --validate")
+
+    audit_logger = None
+    if args.audit_log:
+        if args.workers > 1:
+            parser.error("--audit-log is not supported with --workers")
+        from audit_log import AuditLogger
+        audit_logger = AuditLogger(args.audit_log, source='batch_scoring')
+    profiler = None
+    if args.metrics:
+        if args.workers > 1:
+            parser.error("--metrics is not supported with --workers")
+        from stage_profiler import StageProfiler
+        profiler = StageProfiler()
+    predictor = LiteratureBasedMalignancyPredictor(audit_logger=audit_logger, profiler=profiler)
+
+    from schema_validation import SchemaValidationError
+    try:
+        if args.input.endswith('.parquet'):
+            if not args.output.endswith('.parquet'):
+                parser.error("Parquet input requires a .parquet output file")
+            if args.workers > 1:
+                parser.error("--workers is only supported for CSV input")
+            from arrow_io import score_parquet
+            stats = score_parquet(args.input, args.output, predictor=predictor,
+                                  batch_size=args.chunksize, progress=args.progress,
+                                  accumulator=accumulator, label_column=args.label_column,
+                                  interval_level=args.interval_level, explain=args.explain,
+                                  validate=args.validate)
+        elif args.workers > 1:
+            from parallel_scoring import ParallelScorer
+            with ParallelScorer(predictor, n_workers=args.workers) as scorer:
+                stats = scorer.score_csv(args.input, args.output, accumulator=accumulator,
+                                         label_column=args.label_column,
+                                         interval_level=args.interval_level,
+                                         explain=args.explain)
+        else:
+            stats = score_csv(args.input, args.output, predictor=predictor,
+                              chunksize=args.chunksize, progress=args.progress,
+                              accumulator=accumulator, label_column=args.label_column,
+                              interval_level=args.interval_level, explain=args.explain,
+                              validate=args.validate)
+    except SchemaValidationError as error:
+        if audit_logger is not None:
+            audit_logger.close()
+        if args.validation_report:
+            error.report.to_frame().to_csv(args.validation_report, index=False)
+        sys.exit(f"Validation failed: {error}")
+    if audit_logger is not None:
+        audit_logger.close()
+
+    print(f"Scored {stats['rows']:,} rows in {stats['chunks']} chunks "
+          f"({stats['seconds']:.2f}s, {stats['rows_per_second']:,.0f} rows/s)")
+    if stats['peak_rss_mb'] is not None:
+        print(f"Peak RSS: {stats['peak_rss_mb']:.1f} MB")
+
+    if 'validation' in stats:
+        validation = stats['validation']
+        print(f"Validation ({args.validate}): {validation.message()}")
+        if validation.coerced:
+            print("Repaired values: " + ', '.join(
+                f"{column} {len(positions):,}" for column, positions in validation.coerced.items()
+            ))
+        if args.validation_report:
+            validation.to_frame().to_csv(args.validation_report, index=False)
+            print(f"Validation report saved to {args.validation_report}")
+
+    if profiler is not None:
+        profiler.write_prometheus(args.metrics)
+        print("Scoring stages:")
+        print('\n'.join(profiler.summary_lines()))
+        print(f"Metrics saved to {args.metrics}")
+
+    if accumulator is not None:
+        with open(args.report, 'w', encoding='utf-8') as handle:
+            json.dump(accumulator.report(predictor), handle, indent=2)
+        print(f"Report saved to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+SalivAI - Audit Log Overhead Benchmark
+Measures what audit logging adds to each prediction, for the buffered
+background AuditLogger and for a naive synchronous json.dumps + write per
+prediction, plus the writer thread's throughput on large batches.
+
+Run from the repository root:
+    python -m benchmarks.bench_audit_log
+    python -m benchmarks.bench_audit_log --single 50000 --rows 1000000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from audit_log import AuditLogger
+from benchmarks.common import make_patient_frame
+from salivary_gland_malignancy_predictor import LiteratureBasedMalignancyPredictor
+from scoring_core import RISK_CATEGORIES, encode_records
+
+
+def time_single(predictor, patients, log_sync=None):
+    """Seconds per single-patient prediction (optionally with a synchronous log write)"""
+    encoded = [encode_records([patient]) for patient in patients]
+    start = time.perf_counter()
+    for patient, (ages, codes) in zip(patients, encoded):
+        result = predictor.predict_risk_category_from_codes(ages, codes)
+        if log_sync is not None:
+            log_sync(patient, result)
+    return (time.perf_counter() - start) / len(patients)
+
+
+def run(n_single, n_rows, directory):
+    patients = make_patient_frame(n_single).to_dict('records')
+    plain = LiteratureBasedMalignancyPredictor()
+    baseline = time_single(plain, patients)
+
+    # Naive: serialize and write one line per prediction on the request path
+    with open(os.path.join(directory, 'sync.jsonl'), 'w', encoding='utf-8') as handle:
+        def log_sync(patient, result):
+            record = dict(patient, probability=float(result.probabilities[0]),
+                          risk_category=RISK_CATEGORIES[result.codes[0]]['risk_category'],
+                          model_version=plain.model_version)
+            handle.write(json.dumps(record) + '\n')
+            handle.flush()
+        synchronous = time_single(plain, patients, log_sync)
+
+    with AuditLogger(os.path.join(directory, 'single.jsonl')) as logger:
+        buffered = time_single(LiteratureBasedMalignancyPredictor(audit_logger=logger), patients)
+
+    # Request-path cost alone: log() with the writer held back until the end
+    with AuditLogger(os.path.join(directory, 'enqueue.jsonl'), flush_interval=3600) as logger:
+        ages, codes = encode_records(patients[:1])
+        result = plain.predict_risk_category_from_codes(ages, codes)
+        inputs = {'age': ages, **codes}
+        start = time.perf_counter()
+        for _ in patients:
+            logger.log(inputs, result.probabilities, result.codes, plain.model_version)
+        enqueue = (time.perf_counter() - start) / len(patients)
+
+    print(f"Single-patient predictions ({n_single:,}):")
+    print(f"  no logging:          {baseline * 1e6:8.1f} us/prediction")
+    print(f"  synchronous write:   {synchronous * 1e6:8.1f} us/prediction "
+          f"(+{(synchronous - baseline) * 1e6:.1f} us)")
+    print(f"  AuditLogger:         {buffered * 1e6:8.1f} us/prediction "
+          f"(+{(buffered - baseline) * 1e6:.1f} us, writer thread included)")
+    print(f"  AuditLogger.log():   {enqueue * 1e6:8.1f} us/call (request-path cost alone)")
+
+    X = make_patient_frame(n_rows)
+    start = time.perf_counter()
+    plain.predict_risk_category_columnar(X)
+    baseline_batch = time.perf_counter() - start
+
+    logger = AuditLogger(os.path.join(directory, 'batch.jsonl'))
+    logged = LiteratureBasedMalignancyPredictor(audit_logger=logger)
+    start = time.perf_counter()
+    logged.predict_risk_category_columnar(X)
+    caller_batch = time.perf_counter() - start
+    logger.close()
+    total_batch = time.perf_counter() - start
+
+    print(f"\nBatch of {n_rows:,} rows:")
+    print(f"  no logging:          {baseline_batch * 1000:8.1f} ms")
+    print(f"  AuditLogger (caller): {caller_batch * 1000:7.1f} ms")
+    print(f"  writer drain:        {total_batch * 1000:8.1f} ms "
+          f"({n_rows / total_batch:,.0f} records/s, "
+          f"{os.path.getsize(logger.path) / 1024 ** 2:.0f} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark audit logging overhead")
+    parser.add_argument('--single', type=int, default=20_000, help="Single-patient predictions")
+    parser.add_argument('--rows', type=int, default=200_000, help="Rows in the batch test")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        run(args.single, args.rows, directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+SalivAI - Compiled Scoring Benchmark
+Compares the compiled coefficient-vector scoring path against the original
+column-by-column linear predictor on pre-encoded design matrices.
+
+Run from the repository root:
+    python -m benchmarks.bench_compiled_scoring
+    python -m benchmarks.bench_compiled_scoring --sizes 1000 1000000
+"""
+
+import argparse
+
+import numpy as np
+
+from benchmarks.common import best_time
+from salivary_gland_malignancy_predictor import LiteratureBasedMalignancyPredictor
+
+
+def legacy_score(coefficients, X_encoded):
+    """Original predict_proba arithmetic: nine dict lookups and column multiply-adds"""
+    linear_pred = (
+        coefficients['intercept'] +
+        coefficients['age'] * X_encoded[:, 0] +
+        coefficients['location_submandibular'] * X_encoded[:, 1] +
+        coefficients['location_minor'] * X_encoded[:, 2] +
+        coefficients['size_2_4cm'] * X_encoded[:, 3] +
+        coefficients['size_gt_4cm'] * X_encoded[:, 4] +
+        coefficients['gender_male'] * X_encoded[:, 5] +
+        coefficients['margins_irregular'] * X_encoded[:, 6] +
+        coefficients['echo_hypoechoic'] * X_encoded[:, 7] +
+        coefficients['vascularity_increased'] * X_encoded[:, 8]
+    )
+    return 1 / (1 + np.exp(-linear_pred))
+
+
+def make_design_matrix(n_rows, random_state=42):
+    """Random encoded design matrix with the same layout as _encode_features"""
+    rng = np.random.default_rng(random_state)
+    X_encoded = np.zeros((n_rows, 9), dtype=np.float64)
+    X_encoded[:, 0] = (rng.normal(55, 15, n_rows).clip(18, 90) - 50) / 20
+    location = rng.choice(3, n_rows, p=[0.7, 0.2, 0.1])
+    size = rng.choice(3, n_rows, p=[0.4, 0.4, 0.2])
+    X_encoded[:, 1] = location == 1
+    X_encoded[:, 2] = location == 2
+    X_encoded[:, 3] = size == 1
+    X_encoded[:, 4] = size == 2
+    X_encoded[:, 5:] = rng.random((n_rows, 4)) < [0.4, 0.25, 0.35, 0.2]
+    return X_encoded
+
+
+def run(sizes, repeats):
+    predictor = LiteratureBasedMalignancyPredictor()
+    coefficients = predictor.literature_coefficients
+
+    print(f"{'rows':>12} {'legacy (s)':>12} {'compiled (s)':>13} {'speedup':>9} {'max |diff|':>12}")
+    print("-" * 62)
+    for n_rows in sizes:
+        X_encoded = make_design_matrix(n_rows)
+        out = np.empty(n_rows, dtype=np.float64)
+
+        legacy_time = best_time(lambda: legacy_score(coefficients, X_encoded), repeats)
+        compiled_time = best_time(lambda: predictor._score_encoded(X_encoded, out=out), repeats)
+        max_diff = np.abs(legacy_score(coefficients, X_encoded) - out).max()
+
+        print(f"{n_rows:>12,} {legacy_time:>12.5f} {compiled_time:>13.5f} "
+              f"{legacy_time / compiled_time:>8.2f}x {max_diff:>12.2e}")
+        del X_encoded, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark compiled vs legacy scoring")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 1_000_000, 10_000_000],
+                        help="Row counts to benchmark")
+    parser.add_argument('--repeats', type=int, default=5, help="Timed repeats per size")
+    args = parser.parse_args()
+    run(args.sizes, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
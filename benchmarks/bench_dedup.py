@@ -0,0 +1,64 @@
+"""
+SalivAI - Duplicate-Profile Collapsing Benchmark
+Scoring with dedup=True (each distinct (age, profile) pair scored once and
+scattered back) against the row-by-row path, on DataFrames with object and
+categorical columns and on pre-encoded codes, with whole-year ages (a few
+thousand distinct pairs) and ages with one decimal (tens of thousands)
+
+Run from the repository root:
+    python -m benchmarks.bench_dedup
+    python -m benchmarks.bench_dedup --rows 1000000 --repeats 5
+"""
+
+import argparse
+
+import numpy as np
+
+from benchmarks.common import best_time, make_patient_frame
+from salivary_gland_malignancy_predictor import FeatureEncoder, LiteratureBasedMalignancyPredictor
+
+
+def compare(name, n_rows, baseline, deduplicated, repeats):
+    """Print the best time of both calls and the speedup"""
+    before = best_time(baseline, repeats)
+    after = best_time(deduplicated, repeats)
+    print(f"  {name:<42}{before:>9.3f} s{after:>9.3f} s{before / after:>9.2f}x")
+
+
+def run(n_rows, repeats):
+    predictor = LiteratureBasedMalignancyPredictor()
+    for decimals, label in ((0, 'whole-year ages'), (1, 'ages with one decimal')):
+        X = make_patient_frame(n_rows)
+        X['age'] = X['age'].round(decimals)
+        X_category = make_patient_frame(n_rows, string_dtype='category')
+        X_category['age'] = X['age']
+        ages, codes = FeatureEncoder.ages(X), FeatureEncoder.codes(X)
+        ratio = predictor.predict_risk_category_columnar(X, dedup=True).compression_ratio
+
+        print(f"{n_rows:,} patients, {label} (compression ratio {ratio:,.1f}):")
+        print(f"  {'call':<42}{'rows':>11}{'dedup':>11}{'speedup':>10}")
+        compare('predict_proba (object columns)', n_rows,
+                lambda: predictor.predict_proba(X),
+                lambda: predictor.predict_proba(X, dedup=True), repeats)
+        compare('predict_proba (categorical columns)', n_rows,
+                lambda: predictor.predict_proba(X_category),
+                lambda: predictor.predict_proba(X_category, dedup=True), repeats)
+        compare('predict_risk_category_from_codes', n_rows,
+                lambda: predictor.predict_risk_category_from_codes(ages, codes),
+                lambda: predictor.predict_risk_category_from_codes(ages, codes, dedup=True),
+                repeats)
+        compare('predict_risk_category (dicts)', n_rows,
+                lambda: predictor.predict_risk_category(X_category),
+                lambda: predictor.predict_risk_category(X_category, dedup=True), repeats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark duplicate-profile collapsing")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Cohort size")
+    parser.add_argument('--repeats', type=int, default=3, help="Best-of repeats")
+    args = parser.parse_args()
+    run(args.rows, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+SalivAI - Feature Encoder Benchmark
+Compares the integer-coded FeatureEncoder against the original encoder,
+which copied the input frame and ran one string comparison per indicator.
+
+Run from the repository root:
+    python -m benchmarks.bench_encoder
+    python -m benchmarks.bench_encoder --sizes 10000 5000000 --string-dtype str
+"""
+
+import argparse
+
+import numpy as np
+
+from benchmarks.common import best_time, make_patient_frame
+from salivary_gland_malignancy_predictor import FeatureEncoder
+
+
+def legacy_encode(X):
+    """Original _encode_features: frame copy plus eight string comparisons"""
+    X_encoded = X.copy()
+    X_encoded['age_norm'] = (X_encoded['age'] - 50) / 20
+    X_encoded['location_submandibular'] = (X_encoded['location'] == 'submandibular').astype(int)
+    X_encoded['location_minor'] = (X_encoded['location'] == 'minor').astype(int)
+    X_encoded['size_2_4cm'] = (X_encoded['size'] == '2-4cm').astype(int)
+    X_encoded['size_gt_4cm'] = (X_encoded['size'] == '>4cm').astype(int)
+    X_encoded['gender_male'] = (X_encoded['gender'] == 'male').astype(int)
+    X_encoded['margins_irregular'] = (X_encoded['margins'] == 'irregular').astype(int)
+    X_encoded['echo_hypoechoic'] = (X_encoded['echo'] == 'hypoechoic').astype(int)
+    X_encoded['vascularity_increased'] = (X_encoded['vascularity'] == 'increased').astype(int)
+    feature_columns = [
+        'age_norm', 'location_submandibular', 'location_minor',
+        'size_2_4cm', 'size_gt_4cm', 'gender_male',
+        'margins_irregular', 'echo_hypoechoic', 'vascularity_increased'
+    ]
+    return X_encoded[feature_columns].values
+
+
+def run(sizes, repeats, string_dtype):
+    encoders = {
+        'float64': FeatureEncoder(np.float64),
+        'float32': FeatureEncoder(np.float32)
+    }
+
+    print(f"{'rows':>12} {'legacy (s)':>11} {'f64 (s)':>9} {'f64 reuse':>10} "
+          f"{'f32 reuse':>10} {'uint8 ind.':>11} {'speedup':>8}")
+    print("-" * 78)
+    for n_rows in sizes:
+        X = make_patient_frame(n_rows, string_dtype=string_dtype)
+        indicator_buffer = np.empty((n_rows, 8), dtype=np.uint8, order='F')
+
+        legacy_time = best_time(lambda: legacy_encode(X), repeats)
+        fresh_time = best_time(lambda: encoders['float64'].encode(X), repeats)
+        reuse_time = best_time(lambda: encoders['float64'].encode(X, reuse_buffer=True), repeats)
+        reuse32_time = best_time(lambda: encoders['float32'].encode(X, reuse_buffer=True), repeats)
+        indicator_time = best_time(
+            lambda: encoders['float64'].indicators(X, out=indicator_buffer), repeats
+        )
+        assert np.array_equal(legacy_encode(X), encoders['float64'].encode(X))
+
+        print(f"{n_rows:>12,} {legacy_time:>11.4f} {fresh_time:>9.4f} {reuse_time:>10.4f} "
+              f"{reuse32_time:>10.4f} {indicator_time:>11.4f} {legacy_time / reuse_time:>7.2f}x")
+        for encoder in encoders.values():
+            encoder.release_buffer()
+        del X, indicator_buffer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the feature encoder")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 1_000_000, 5_000_000],
+                        help="Row counts to benchmark")
+    parser.add_argument('--repeats', type=int, default=3, help="Timed repeats per size")
+    parser.add_argument('--string-dtype', choices=['object', 'str'], default='object',
+                        help="dtype of the categorical input columns")
+    args = parser.parse_args()
+    run(args.sizes, args.repeats, object if args.string_dtype == 'object' else 'str')
+
+
+if __name__ == "__main__":
+    main()
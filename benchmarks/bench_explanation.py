@@ -0,0 +1,86 @@
+"""
+SalivAI - Explanation Benchmark
+Times the vectorized explain() (all nine contributions and top-k drivers)
+against a Python loop building each patient's breakdown from the coefficient
+dict, as demo.py used to, and top-k by argpartition against a full argsort.
+On these contributions, mostly exact zeros, the stable argsort is faster
+at nine columns (equal keys sort as cheap runs); on dense values the two
+are even at nine columns and argpartition wins from ~16 columns on.
+
+Run from the repository root:
+    python -m benchmarks.bench_explanation
+    python -m benchmarks.bench_explanation --rows 1000000 --loop-rows 20000 --top-k 3
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.common import best_time, make_patient_frame
+from explanation import top_drivers
+from salivary_gland_malignancy_predictor import LiteratureBasedMalignancyPredictor
+from scoring_core import FEATURE_NAMES
+
+
+def loop_explain(predictor, X):
+    """One dict of contributions per patient, coefficient by coefficient"""
+    coefficients = predictor.literature_coefficients
+    explanations = []
+    for row in predictor._encode_features(X).tolist():
+        contributions = {name: coefficients[name] * value for name, value in zip(FEATURE_NAMES, row)}
+        total = coefficients['intercept'] + sum(contributions.values())
+        explanations.append((contributions, total))
+    return explanations
+
+
+def argsort_top_k(contributions, top_k):
+    """Full per-row sort, then the first k columns"""
+    order = np.argsort(-np.abs(contributions), axis=1, kind='stable')[:, :top_k]
+    return order, np.take_along_axis(contributions, order, axis=1)
+
+
+def run(n_rows, loop_rows, top_k, repeats):
+    predictor = LiteratureBasedMalignancyPredictor()
+    X = make_patient_frame(n_rows)
+
+    explanation = predictor.explain(X)
+    _, values = top_drivers(explanation.contributions, top_k)
+    _, expected = argsort_top_k(explanation.contributions, top_k)
+    print(f"Top-{top_k} check: max |argpartition - argsort| "
+          f"{np.abs(np.abs(values) - np.abs(expected)).max():.1e}")
+
+    start = time.perf_counter()
+    loop_explain(predictor, X.iloc[:loop_rows])
+    loop_seconds = (time.perf_counter() - start) * n_rows / loop_rows
+
+    proba = best_time(lambda: predictor.predict_proba(X), repeats)
+    full = best_time(lambda: predictor.explain(X), repeats)
+    drivers = best_time(lambda: predictor.explain(X, top_k=top_k), repeats)
+    partition = best_time(lambda: top_drivers(explanation.contributions, top_k), repeats)
+    argsort = best_time(lambda: argsort_top_k(explanation.contributions, top_k), repeats)
+
+    print(f"\n{n_rows:,} patients:")
+    print(f"  predict_proba (reference):    {proba:8.3f} s")
+    print(f"  explain() all contributions:  {full:8.3f} s")
+    print(f"  explain(top_k={top_k}):            {drivers:8.3f} s")
+    print(f"  Python loop per patient:      {loop_seconds:8.3f} s (extrapolated from {loop_rows:,}), "
+          f"{loop_seconds / full:.0f}x slower")
+    print(f"\nTop-{top_k} selection alone on the N x 9 contributions:")
+    print(f"  argpartition + sort of k:     {partition:8.3f} s")
+    print(f"  full argsort:                 {argsort:8.3f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-patient explanations")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Cohort size")
+    parser.add_argument('--loop-rows', type=int, default=20_000,
+                        help="Patients timed in the Python loop (extrapolated to --rows)")
+    parser.add_argument('--top-k', type=int, default=3, help="Drivers kept per patient")
+    parser.add_argument('--repeats', type=int, default=3, help="Best-of repeats")
+    args = parser.parse_args()
+    run(args.rows, args.loop_rows, args.top_k, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
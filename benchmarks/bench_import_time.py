@@ -0,0 +1,104 @@
+"""
+SalivAI - Import-Time (Cold Start) Benchmark
+Measures how long a fresh interpreter takes to import each entry point,
+using `python -X importtime` to attribute the cost to individual modules.
+
+Run from the repository root:
+    python -m benchmarks.bench_import_time
+    python -m benchmarks.bench_import_time --runs 10 --output import_times.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Entry points tracked for cold-start latency
+TARGETS = ['scoring_core', 'salivary_gland_malignancy_predictor', 'app']
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_importtime(stderr, target):
+    """
+    Cumulative microseconds of `target` and of each module it imports directly
+
+    Parses `python -X importtime` output, where children are listed before
+    their parent and indented two spaces per nesting level.
+    """
+    children = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        module = name.strip()
+        if depth == 1:
+            children[module] = int(cumulative_us)
+        elif depth == 0:
+            if module == target:
+                return int(cumulative_us), children
+            children = {}
+    return 0, {}
+
+
+def measure(target, runs):
+    """Wall time, import time and heaviest direct imports for importing `target` in fresh interpreters"""
+    wall_times = []
+    import_times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {target}'],
+            cwd=REPO_ROOT, capture_output=True, text=True
+        )
+        wall_times.append(time.perf_counter() - start)
+        if completed.returncode != 0:
+            raise RuntimeError(f"import {target} failed:\n{completed.stderr[-2000:]}")
+        import_times.append(parse_importtime(completed.stderr, target))
+
+    breakdowns = [children for _, children in import_times]
+    median_cumulative = {
+        module: statistics.median(breakdown.get(module, 0) for breakdown in breakdowns)
+        for module in set().union(*breakdowns)
+    }
+    return {
+        'wall_ms_median': statistics.median(wall_times) * 1000,
+        'wall_ms_min': min(wall_times) * 1000,
+        'import_ms': statistics.median(total for total, _ in import_times) / 1000,
+        'top_imports_ms': {
+            module: cumulative_us / 1000
+            for module, cumulative_us in sorted(
+                median_cumulative.items(), key=lambda item: item[1], reverse=True
+            )[:8]
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold-start import time")
+    parser.add_argument('--targets', nargs='+', default=TARGETS, help="Modules to import")
+    parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters per target")
+    parser.add_argument('--output', help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = {}
+    for target in args.targets:
+        result = measure(target, args.runs)
+        results[target] = result
+        print(f"{target}: {result['import_ms']:.0f} ms import, "
+              f"{result['wall_ms_median']:.0f} ms process wall (median of {args.runs})")
+        for module, milliseconds in result['top_imports_ms'].items():
+            print(f"    {module:<40} {milliseconds:>8.1f} ms")
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump({'python': sys.version, 'results': results}, handle, indent=2)
+        print(f"\nSaved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
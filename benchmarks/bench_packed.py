@@ -0,0 +1,68 @@
+"""
+SalivAI - Packed Profile Benchmark
+Bytes per patient and scoring throughput of 2-byte packed rows
+(predict_risk_category_packed, in memory and memory-mapped from .npy)
+against the DataFrame and pre-encoded code paths on the same cohort
+
+Run from the repository root:
+    python -m benchmarks.bench_packed
+    python -m benchmarks.bench_packed --rows 1000000 --repeats 5
+"""
+
+import argparse
+import os
+import tempfile
+
+import numpy as np
+
+from benchmarks.common import best_time, make_patient_frame
+from packed_profiles import load_packed, save_packed, unpack
+from salivary_gland_malignancy_predictor import LiteratureBasedMalignancyPredictor
+
+
+def run(n_rows, repeats):
+    predictor = LiteratureBasedMalignancyPredictor()
+    X = make_patient_frame(n_rows)
+    X['age'] = np.rint(X['age'])
+    packed = predictor.pack(X)
+    ages, codes = unpack(packed)
+    codes_bytes = ages.nbytes + sum(values.nbytes for values in codes.values())
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'cohort.npy')
+    save_packed(path, packed)
+    mapped = load_packed(path)
+
+    paths = [
+        ('DataFrame (predict_risk_category_columnar)', X.memory_usage(deep=True).sum(),
+         lambda: predictor.predict_risk_category_columnar(X)),
+        ('codes (predict_risk_category_from_codes)', codes_bytes,
+         lambda: predictor.predict_risk_category_from_codes(ages, codes)),
+        ('packed (predict_risk_category_packed)', packed.nbytes,
+         lambda: predictor.predict_risk_category_packed(packed)),
+        ('packed memmap (load_packed)', os.path.getsize(path),
+         lambda: predictor.predict_risk_category_packed(mapped))
+    ]
+    print(f"{n_rows:,} patients, whole-year ages:")
+    print(f"  {'input':<44}{'bytes/row':>10}{'seconds':>10}{'rows/s':>16}")
+    for name, n_bytes, call in paths:
+        seconds = best_time(call, repeats)
+        print(f"  {name:<44}{n_bytes / n_rows:>10.1f}{seconds:>10.3f}{n_rows / seconds:>16,.0f}")
+
+    save_seconds = best_time(lambda: save_packed(path, packed), repeats)
+    print(f"\nsave_packed: {save_seconds:.3f} s ({os.path.getsize(path) / 1e6:.1f} MB on disk)")
+    del mapped
+    os.remove(path)
+    os.rmdir(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark packed patient profiles")
+    parser.add_argument('--rows', type=int, default=10_000_000, help="Cohort size")
+    parser.add_argument('--repeats', type=int, default=3, help="Best-of repeats")
+    args = parser.parse_args()
+    run(args.rows, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+SalivAI - Parallel Scoring Scaling Benchmark
+Measures ParallelScorer throughput from 1 to N workers on DataFrames and on
+CSV files, reporting speedup and parallel efficiency against one worker.
+
+Run from the repository root:
+    python -m benchmarks.bench_parallel_scoring
+    python -m benchmarks.bench_parallel_scoring --rows 5000000 --workers 1 2 4 8 16 32
+"""
+
+import argparse
+import os
+import tempfile
+
+from benchmarks.common import best_time, make_patient_frame
+from parallel_scoring import ParallelScorer
+
+
+def default_worker_counts():
+    """1, 2, 4, ... up to os.cpu_count() (always including the core count itself)"""
+    n_cores = os.cpu_count() or 1
+    counts = []
+    workers = 1
+    while workers < n_cores:
+        counts.append(workers)
+        workers *= 2
+    return counts + [n_cores]
+
+
+def run(n_rows, worker_counts, backend, mode, repeats):
+    X = make_patient_frame(n_rows)
+    temp_dir = tempfile.mkdtemp(prefix='salivai-bench-')
+    input_path = os.path.join(temp_dir, 'patients.csv')
+    output_path = os.path.join(temp_dir, 'results.csv')
+    if mode == 'csv':
+        X.to_csv(input_path, index=False)
+
+    print(f"{n_rows:,} rows, {mode} input, {backend} backend, {os.cpu_count()} cores")
+    print(f"{'workers':>8} {'seconds':>9} {'rows/s':>13} {'speedup':>8} {'efficiency':>11}")
+    print("-" * 53)
+    baseline = None
+    for n_workers in worker_counts:
+        scorer_options = {'n_workers': n_workers, 'backend': backend}
+        if mode == 'csv':
+            # About four shards per worker so the pool stays balanced
+            scorer_options['shard_bytes'] = max(1, os.path.getsize(input_path) // (4 * n_workers))
+        with ParallelScorer(**scorer_options) as scorer:
+            if mode == 'csv':
+                task = lambda: scorer.score_csv(input_path, output_path)
+            else:
+                task = lambda: scorer.predict_proba(X)
+            task()  # warm up the pool
+            seconds = best_time(task, repeats)
+
+        baseline = baseline or seconds
+        speedup = baseline / seconds
+        print(f"{n_workers:>8} {seconds:>9.3f} {n_rows / seconds:>13,.0f} "
+              f"{speedup:>7.2f}x {speedup / n_workers:>10.0%}")
+
+    for path in (input_path, output_path):
+        if os.path.exists(path):
+            os.remove(path)
+    os.rmdir(temp_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel scoring scaling")
+    parser.add_argument('--rows', type=int, default=2_000_000, help="Cohort size")
+    parser.add_argument('--workers', type=int, nargs='+', default=default_worker_counts(),
+                        help="Worker counts to benchmark")
+    parser.add_argument('--backend', choices=['process', 'thread'], default='process')
+    parser.add_argument('--mode', choices=['frame', 'csv'], default='frame',
+                        help="Score an in-memory DataFrame or a CSV file")
+    parser.add_argument('--repeats', type=int, default=3, help="Timed repeats per worker count")
+    args = parser.parse_args()
+    run(args.rows, args.workers, args.backend, args.mode, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
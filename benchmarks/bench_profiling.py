@@ -0,0 +1,102 @@
+"""
+SalivAI - Stage Profiler Overhead Benchmark
+Cost of the per-stage instrumentation in LiteratureBasedMalignancyPredictor,
+with no profiler attached (the default) and with a StageProfiler
+
+The reference is the uninstrumented pipeline called directly: encode into
+the reusable buffer, score_design_matrix and bin_risk_categories. Calls of
+the three variants are interleaved and the median is reported, so machine
+noise hits them alike. A second table times the disabled check alone
+(profiled() around a no-op) in nanoseconds per stage.
+
+Run from the repository root:
+    python -m benchmarks.bench_profiling
+    python -m benchmarks.bench_profiling --sizes 1 256 100000 --repeats 2000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.common import make_patient_frame
+from salivary_gland_malignancy_predictor import LiteratureBasedMalignancyPredictor
+from scoring_core import bin_risk_categories, score_design_matrix
+from stage_profiler import StageProfiler
+
+
+def reference_risk_category(predictor, X):
+    """predict_risk_category_columnar's work without any profiling branch"""
+    design = predictor.encoder.encode(X, reuse_buffer=True)
+    probabilities = score_design_matrix(design, predictor._intercept, predictor._weights)
+    return probabilities, bin_risk_categories(probabilities, predictor.risk_thresholds)
+
+
+def interleaved_medians(calls, repeats):
+    """Median wall time of each call, timing them in turn `repeats` times"""
+    timings = np.empty((len(calls), repeats))
+    for call in calls:
+        call()
+    for repeat in range(repeats):
+        for index, call in enumerate(calls):
+            start = time.perf_counter()
+            call()
+            timings[index, repeat] = time.perf_counter() - start
+    return np.median(timings, axis=1)
+
+
+def stage_check_ns(predictor, repeats=1_000_000):
+    """Nanoseconds per profiled() call around a no-op, minus the bare no-op call"""
+    def noop():
+        return None
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        noop()
+    bare = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        predictor.profiled('encode', 1, noop)
+    wrapped = time.perf_counter() - start
+    return (wrapped - bare) / repeats * 1e9
+
+
+def run(sizes, repeats):
+    disabled = LiteratureBasedMalignancyPredictor()
+    enabled = LiteratureBasedMalignancyPredictor(profiler=StageProfiler())
+
+    print("predict_risk_category_columnar, median per call "
+          "(encode, linear, sigmoid and categorize stages)")
+    print(f"  {'rows':>10}{'reference':>14}{'disabled':>14}{'enabled':>14}"
+          f"{'disabled +%':>14}{'enabled +%':>13}")
+    for n_rows in sizes:
+        X = make_patient_frame(n_rows)
+        count = max(repeats * 1_000 // max(n_rows, 1_000), 5)
+        reference, off, on = interleaved_medians([
+            lambda: reference_risk_category(disabled, X),
+            lambda: disabled.predict_risk_category_columnar(X),
+            lambda: enabled.predict_risk_category_columnar(X)
+        ], min(count, repeats))
+        print(f"  {n_rows:>10,}{reference * 1e6:>11.1f} us{off * 1e6:>11.1f} us{on * 1e6:>11.1f} us"
+              f"{(off / reference - 1) * 100:>13.1f}%{(on / reference - 1) * 100:>12.1f}%")
+
+    print("\nDisabled check alone (profiler is None, one stage):")
+    print(f"  {stage_check_ns(disabled):.0f} ns per stage, 4 stages per scoring call")
+    print("With a profiler, each stage adds two perf_counter calls and a locked "
+          "counter update:")
+    print(f"  {stage_check_ns(enabled, repeats=200_000):.0f} ns per stage")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the stage profiler overhead")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 256, 10_000, 1_000_000],
+                        help="Rows per call (default: 1 256 10000 1000000)")
+    parser.add_argument('--repeats', type=int, default=1_000,
+                        help="Most interleaved repeats per size (default: 1000)")
+    args = parser.parse_args()
+    run(args.sizes, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
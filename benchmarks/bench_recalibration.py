@@ -0,0 +1,79 @@
+"""
+SalivAI - Recalibration Fit-Time Benchmark
+Times the chunked IRLS recalibration in every mode, in memory and streamed
+from CSV, and (if scikit-learn is installed) an in-memory
+LogisticRegression fit of the full model for comparison.
+
+The synthetic outcomes come from a miscalibrated version of the literature
+model (intercept shifted, slope 0.8), so every mode has something to fit.
+
+Run from the repository root:
+    python -m benchmarks.bench_recalibration
+    python -m benchmarks.bench_recalibration --rows 5000000 --chunksize 250000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from batch_scoring import peak_rss_mb
+from benchmarks.common import make_patient_frame
+from recalibration import MODES, csv_chunks, frame_chunks, recalibrate
+from salivary_gland_malignancy_predictor import LiteratureBasedMalignancyPredictor
+
+
+def make_cohort(n_rows):
+    predictor = LiteratureBasedMalignancyPredictor()
+    X = make_patient_frame(n_rows)
+    design = predictor.encoder.encode(X)
+    logits = 0.7 + 0.8 * (design @ predictor._weights + predictor._intercept)
+    y_true = np.random.default_rng(0).binomial(1, 1 / (1 + np.exp(-logits)))
+    return X, y_true, design
+
+
+def report(label, result):
+    print(f"  {label:<22} {result.seconds:7.2f} s, {result.n_iter} passes, "
+          f"converged={result.converged}, deviance {result.deviance_history[0]:,.0f} -> "
+          f"{result.deviance_history[-1]:,.0f}")
+
+
+def run(n_rows, chunksize):
+    X, y_true, design = make_cohort(n_rows)
+    print(f"Recalibrating on {n_rows:,} patients in chunks of {chunksize:,}:")
+    for mode in MODES:
+        report(f"{mode} (in memory)", recalibrate(frame_chunks(X, y_true, chunksize), mode=mode))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'cohort.csv')
+        X.assign(outcome=y_true).to_csv(path, index=False)
+        del X
+        for mode in MODES:
+            report(f"{mode} (CSV stream)", recalibrate(csv_chunks(path, 'outcome', chunksize), mode=mode))
+
+    try:
+        from sklearn.linear_model import LogisticRegression
+    except ImportError:
+        pass
+    else:
+        start = time.perf_counter()
+        LogisticRegression(C=np.inf, tol=1e-8, max_iter=1000).fit(design, y_true)
+        print(f"  {'sklearn full (in mem)':<22} {time.perf_counter() - start:7.2f} s "
+              f"(whole design matrix in memory)")
+
+    if peak_rss_mb() is not None:
+        print(f"Peak RSS: {peak_rss_mb():.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chunked IRLS recalibration")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Labelled cohort size")
+    parser.add_argument('--chunksize', type=int, default=100_000, help="Rows per chunk")
+    args = parser.parse_args()
+    run(args.rows, args.chunksize)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+SalivAI - HTTP Scoring Service Benchmark
+Drives scoring_service.py with concurrent keep-alive clients and reports
+throughput and latency percentiles for single-patient requests.
+
+The service runs in its own process so client overhead is not charged to it.
+
+Run from the repository root:
+    python -m benchmarks.bench_service
+    python -m benchmarks.bench_service --connections 64 --requests 200 --max-latency-ms 1
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.common import make_patient_frame
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def make_request(body):
+    return (
+        "POST /predict_risk_category HTTP/1.1\r\n"
+        "Host: localhost\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n"
+    ).encode('latin-1') + body
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    length = 0
+    for line in head.split(b'\r\n'):
+        if line.lower().startswith(b'content-length:'):
+            length = int(line.split(b':', 1)[1])
+    body = await reader.readexactly(length)
+    if not head.startswith(b'HTTP/1.1 200'):
+        raise RuntimeError(f"Unexpected response: {head[:40]!r} {body[:200]!r}")
+    return body
+
+
+async def client(port, requests, latencies):
+    """One keep-alive connection sending its requests back to back"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        for request in requests:
+            start = time.perf_counter()
+            writer.write(request)
+            await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+
+async def run(connections, n_requests, max_latency_ms, max_batch_size):
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, 'scoring_service.py', '--port', str(port),
+         '--max-latency-ms', str(max_latency_ms), '--max-batch-size', str(max_batch_size)],
+        cwd=REPO_ROOT, stdout=subprocess.DEVNULL
+    )
+    try:
+        await wait_for_port(port)
+        patients = make_patient_frame(connections * n_requests).to_dict('records')
+        requests = [make_request(json.dumps(patient).encode('utf-8')) for patient in patients]
+
+        # Warm-up
+        await asyncio.gather(*[client(port, requests[:5], []) for _ in range(connections)])
+
+        latencies = []
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            client(port, requests[index::connections], latencies) for index in range(connections)
+        ])
+        seconds = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies_ms = np.array(latencies) * 1000
+    print(f"{connections} connections x {n_requests} requests, window {max_latency_ms:g} ms, "
+          f"max batch {max_batch_size}")
+    print(f"  throughput: {len(latencies) / seconds:,.0f} requests/s")
+    print(f"  latency:    p50 {np.percentile(latencies_ms, 50):.2f} ms, "
+          f"p99 {np.percentile(latencies_ms, 99):.2f} ms, max {latencies_ms.max():.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the HTTP scoring service")
+    parser.add_argument('--connections', type=int, default=32, help="Concurrent keep-alive clients")
+    parser.add_argument('--requests', type=int, default=200, help="Requests per connection")
+    parser.add_argument('--max-latency-ms', type=float, default=2.0, help="Micro-batch window")
+    parser.add_argument('--max-batch-size', type=int, default=256, help="Micro-batch size cap")
+    args = parser.parse_args()
+    asyncio.run(run(args.connections, args.requests, args.max_latency_ms, args.max_batch_size))
+
+
+if __name__ == "__main__":
+    main()
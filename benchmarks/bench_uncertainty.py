@@ -0,0 +1,78 @@
+"""
+SalivAI - Monte Carlo Interval Benchmark
+Times predict_proba_interval against a naive version that materializes the
+full N x K probability matrix and calls np.percentile.
+
+Two cohorts: integer ages (as entered in the clinic; duplicate patients are
+simulated once) and continuous ages (every patient distinct, the worst case).
+
+Run from the repository root:
+    python -m benchmarks.bench_uncertainty
+    python -m benchmarks.bench_uncertainty --rows 1000000 --samples 10000 --worst-case-rows 50000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.common import make_patient_frame
+from salivary_gland_malignancy_predictor import LiteratureBasedMalignancyPredictor
+from scoring_core import coefficient_standard_errors, stable_sigmoid
+from uncertainty import sample_weights
+
+
+def naive_interval(predictor, X, n_samples, random_state):
+    """Full N x K probability matrix, then np.percentile per row"""
+    weight_samples = sample_weights(predictor._weights, coefficient_standard_errors(),
+                                    n_samples, random_state)
+    probabilities = stable_sigmoid(predictor.encoder.encode(X) @ weight_samples + predictor._intercept)
+    return np.percentile(probabilities, [2.5, 97.5], axis=1)
+
+
+def timed_interval(predictor, X, n_samples):
+    start = time.perf_counter()
+    interval = predictor.predict_proba_interval(X, n_samples=n_samples, random_state=0)
+    return interval, time.perf_counter() - start
+
+
+def run(n_rows, n_samples, worst_case_rows, naive_rows):
+    predictor = LiteratureBasedMalignancyPredictor()
+
+    X = make_patient_frame(naive_rows)
+    interval, _ = timed_interval(predictor, X, n_samples)
+    start = time.perf_counter()
+    lower, upper = naive_interval(predictor, X, n_samples, 0)
+    naive_seconds = time.perf_counter() - start
+    _, seconds = timed_interval(predictor, X, n_samples)
+    print(f"Check on {naive_rows:,} patients x {n_samples:,} samples: "
+          f"max |difference| {max(np.abs(lower - interval.lower).max(), np.abs(upper - interval.upper).max()):.1e}")
+    print(f"  naive (N x K matrix):   {naive_seconds:8.2f} s, "
+          f"{naive_rows * n_samples * 8 / 1024 ** 2:,.0f} MB matrix")
+    print(f"  predict_proba_interval: {seconds:8.2f} s")
+
+    X = make_patient_frame(n_rows)
+    X['age'] = X['age'].round()
+    _, seconds = timed_interval(predictor, X, n_samples)
+    print(f"\n{n_rows:,} patients with integer ages x {n_samples:,} samples: {seconds:.1f} s")
+
+    X = make_patient_frame(worst_case_rows)
+    _, seconds = timed_interval(predictor, X, n_samples)
+    print(f"{worst_case_rows:,} distinct patients x {n_samples:,} samples: {seconds:.1f} s "
+          f"(~{seconds * n_rows / worst_case_rows / 60:.1f} min extrapolated to {n_rows:,})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Monte Carlo probability intervals")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Cohort size")
+    parser.add_argument('--samples', type=int, default=10_000, help="Coefficient samples K")
+    parser.add_argument('--worst-case-rows', type=int, default=20_000,
+                        help="Distinct patients timed for the worst-case extrapolation")
+    parser.add_argument('--naive-rows', type=int, default=2_000,
+                        help="Patients in the naive comparison (needs rows x samples x 8 bytes)")
+    args = parser.parse_args()
+    run(args.rows, args.samples, args.worst_case_rows, args.naive_rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+SalivAI - Schema Validation Benchmark
+Times validate_cohort in each mode against one encoding pass of the same
+cohort (_encode_features), on object and categorical string columns, with
+0.1% of the rows made invalid
+
+Run from the repository root:
+    python -m benchmarks.bench_validation
+    python -m benchmarks.bench_validation --rows 1000000 --string-dtype category
+"""
+
+import argparse
+
+import numpy as np
+
+from benchmarks.common import best_time, make_patient_frame
+from salivary_gland_malignancy_predictor import LiteratureBasedMalignancyPredictor
+from schema_validation import validate_cohort
+
+
+def make_dirty_frame(n_rows, string_dtype, invalid_share=0.001, random_state=0):
+    """Patient cohort with misspelled sizes, missing echo values and implausible ages"""
+    X = make_patient_frame(n_rows, string_dtype=string_dtype)
+    rng = np.random.default_rng(random_state)
+    n_invalid = max(int(n_rows * invalid_share) // 3, 1)
+    if string_dtype == 'category':
+        X['size'] = X['size'].cat.add_categories(['<2cm'])
+    X.loc[rng.choice(n_rows, n_invalid), 'size'] = '<2cm'
+    X.loc[rng.choice(n_rows, n_invalid), 'echo'] = None
+    X.loc[rng.choice(n_rows, n_invalid), 'age'] = 120.0
+    return X
+
+
+def run(n_rows, string_dtype, repeats):
+    predictor = LiteratureBasedMalignancyPredictor()
+    X = make_dirty_frame(n_rows, string_dtype)
+
+    encode = best_time(lambda: predictor._encode_features(X), repeats)
+    print(f"{n_rows:,} patients ({string_dtype} columns):")
+    print(f"  _encode_features (reference): {encode:8.3f} s")
+    for mode in ('coerce', 'drop'):
+        seconds = best_time(lambda: validate_cohort(X, mode), repeats)
+        _, report = validate_cohort(X, mode)
+        print(f"  validate_cohort({mode!r}):{' ' * (9 - len(mode))}{seconds:8.3f} s  "
+              f"({n_rows / seconds:,.0f} rows/s, {report.n_invalid:,} invalid rows)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark input schema validation")
+    parser.add_argument('--rows', type=int, default=10_000_000, help="Cohort size")
+    parser.add_argument('--string-dtype', choices=['object', 'category'], default='object',
+                        help="dtype of the categorical input columns (default: object)")
+    parser.add_argument('--repeats', type=int, default=3, help="Best-of repeats")
+    args = parser.parse_args()
+    run(args.rows, args.string_dtype, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
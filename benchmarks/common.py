@@ -0,0 +1,49 @@
+"""
+Shared helpers for the SalivAI benchmarks
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from salivary_gland_malignancy_predictor import CATEGORY_LEVELS
+
+
+def best_time(func, repeats):
+    """Best wall time of `repeats` calls"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def make_patient_frame(n_rows, random_state=42, string_dtype=object):
+    """
+    Random patient cohort with the same columns and distributions as create_sample_data
+    
+    Unlike create_sample_data this prints nothing, generates no labels and lets
+    the benchmark choose the string dtype (object columns by default, as read
+    from CSV by older pandas versions).
+    """
+    rng = np.random.default_rng(random_state)
+    probabilities = {
+        'location': [0.7, 0.2, 0.1],
+        'size': [0.4, 0.4, 0.2],
+        'gender': [0.6, 0.4],
+        'margins': [0.75, 0.25],
+        'echo': [0.65, 0.35],
+        'vascularity': [0.8, 0.2]
+    }
+    data = {'age': rng.normal(55, 15, n_rows).clip(18, 90)}
+    for column, levels in CATEGORY_LEVELS.items():
+        codes = rng.choice(len(levels), n_rows, p=probabilities[column])
+        # Built column by column: letting pandas infer string columns first
+        # would create one Python string per cell (gigabytes at 10M rows)
+        if string_dtype == 'category':
+            data[column] = pd.Categorical.from_codes(codes, levels)
+        else:
+            data[column] = pd.Series(np.asarray(levels, dtype=object)[codes], dtype=string_dtype)
+    return pd.DataFrame(data)
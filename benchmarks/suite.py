@@ -0,0 +1,297 @@
+"""
+SalivAI - Hot-Path Benchmark Suite
+Times every predictor hot path across cohort sizes and checks for regressions
+
+Cases: _encode_features, predict_proba, predict, predict_risk_category (the
+legacy list of dicts), predict_risk_category_columnar, get_feature_importance,
+generate_report with and without labels, and create_sample_data. Each runs
+at 1, 1k, 100k, 1M and 10M rows by default.
+
+Per case and size the suite records call-latency percentiles (p50/p90/p99
+over adaptive repeats after one warm-up call), throughput at the median
+latency and the peak memory allocated during one extra call (tracemalloc,
+untimed). Results are written as JSON together with the environment
+(versions, CPU count, git commit), so runs on the same machine compare.
+
+--baseline compares the new run with an earlier JSON file and exits with
+status 1 when any case's median (or --metric) latency grew by more than --tolerance
+(and by more than --min-delta seconds, which keeps microsecond cases from
+failing on timer noise).
+
+Run from the repository root:
+    python -m benchmarks.suite --output bench_results/baseline.json
+    python -m benchmarks.suite --sizes 1 1000 100000 --output current.json --baseline bench_results/baseline.json
+    python -m benchmarks.suite --cases predict_proba generate_report --sizes 1000000
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import make_patient_frame
+from salivary_gland_malignancy_predictor import LiteratureBasedMalignancyPredictor, create_sample_data
+
+DEFAULT_SIZES = [1, 1_000, 100_000, 1_000_000, 10_000_000]
+
+# Allowed growth of the median latency before --baseline reports a regression
+DEFAULT_TOLERANCE = 0.20
+
+# Smaller absolute slowdowns (seconds) are timer noise, never regressions
+DEFAULT_MIN_DELTA = 50e-6
+
+# Cases whose work does not depend on the cohort (no rows/s reported)
+ROW_INDEPENDENT = {'get_feature_importance'}
+
+# Row limits of cases that create Python objects per row (10M rows need
+# several GB); lifted with --no-row-limits
+MAX_ROWS = {
+    'predict_risk_category': 1_000_000,
+    'create_sample_data': 1_000_000
+}
+
+
+def _quiet(func, *args, **kwargs):
+    """Call func with its stdout discarded (create_sample_data prints a banner)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+# name -> function(predictor, X, y) returning the zero-argument call to time
+CASES = {
+    '_encode_features': lambda predictor, X, y: lambda: predictor._encode_features(X),
+    'predict_proba': lambda predictor, X, y: lambda: predictor.predict_proba(X),
+    'predict': lambda predictor, X, y: lambda: predictor.predict(X),
+    'predict_risk_category': lambda predictor, X, y: lambda: predictor.predict_risk_category(X),
+    'predict_risk_category_columnar':
+        lambda predictor, X, y: lambda: predictor.predict_risk_category_columnar(X),
+    'get_feature_importance': lambda predictor, X, y: predictor.get_feature_importance,
+    'generate_report': lambda predictor, X, y: lambda: predictor.generate_report(X),
+    'generate_report_labels': lambda predictor, X, y: lambda: predictor.generate_report(X, y),
+    'create_sample_data': lambda predictor, X, y: lambda: _quiet(create_sample_data, len(X))
+}
+
+
+def make_labels(predictor, X, random_state=0):
+    """Outcomes drawn from the model's own probabilities, with both classes present"""
+    rng = np.random.default_rng(random_state)
+    y = rng.binomial(1, predictor.predict_proba(X))
+    y[:2] = [0, 1][:len(y)]
+    return y
+
+
+def time_call(call, budget, min_repeats, max_repeats):
+    """
+    Per-call wall times after one warm-up call
+
+    Repeats enough calls to fill `budget` seconds (as estimated from the
+    warm-up), clamped to [min_repeats, max_repeats].
+    """
+    start = time.perf_counter()
+    call()
+    warmup = time.perf_counter() - start
+    repeats = int(min(max(budget / max(warmup, 1e-9), min_repeats), max_repeats))
+
+    timings = np.empty(repeats)
+    for index in range(repeats):
+        start = time.perf_counter()
+        call()
+        timings[index] = time.perf_counter() - start
+    return timings
+
+
+def peak_memory(call):
+    """Peak bytes allocated (above the starting level) during one call"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        call()
+        return tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(name, predictor, X, y, budget, min_repeats, max_repeats, measure_memory,
+             row_limits=True):
+    """Timing and memory record of one case at one size"""
+    n_rows = len(X)
+    record = {'case': name, 'rows': n_rows}
+    if row_limits and n_rows > MAX_ROWS.get(name, n_rows):
+        record['skipped'] = f"above {MAX_ROWS[name]:,} rows (Python objects per row)"
+        return record
+    if name == 'generate_report_labels' and n_rows < 2:
+        record['skipped'] = "needs both outcome classes"
+        return record
+
+    call = CASES[name](predictor, X, y)
+    gc.collect()
+    timings = time_call(call, budget, min_repeats, max_repeats)
+    p50, p90, p99 = np.percentile(timings, [50, 90, 99])
+    record.update({
+        'repeats': len(timings),
+        'mean_seconds': float(timings.mean()),
+        'min_seconds': float(timings.min()),
+        'p50_seconds': float(p50),
+        'p90_seconds': float(p90),
+        'p99_seconds': float(p99),
+        'rows_per_second': None if name in ROW_INDEPENDENT else n_rows / p50
+    })
+    if measure_memory:
+        record['peak_memory_mb'] = peak_memory(call) / 1024 ** 2
+    return record
+
+
+def environment(string_dtype):
+    """Machine, library versions and input settings stored with the results"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'string_dtype': string_dtype
+    }
+
+
+def run_suite(sizes, cases, budget, min_repeats, max_repeats, measure_memory,
+              string_dtype='object', row_limits=True):
+    """Run every case at every size, printing one line per result"""
+    predictor = LiteratureBasedMalignancyPredictor()
+    results = []
+    for n_rows in sizes:
+        X = make_patient_frame(n_rows, string_dtype=string_dtype)
+        y = make_labels(predictor, X)
+        print(f"\n{n_rows:,} rows", flush=True)
+        print(f"  {'case':<32}{'repeats':>8}{'p50 ms':>11}{'p99 ms':>11}{'rows/s':>15}{'peak MB':>10}")
+        for name in cases:
+            record = run_case(name, predictor, X, y, budget, min_repeats, max_repeats,
+                              measure_memory, row_limits)
+            results.append(record)
+            if 'skipped' in record:
+                print(f"  {name:<32}  skipped: {record['skipped']}", flush=True)
+                continue
+            memory = f"{record['peak_memory_mb']:10.1f}" if measure_memory else f"{'-':>10}"
+            throughput = record['rows_per_second']
+            throughput = f"{throughput:15,.0f}" if throughput is not None else f"{'-':>15}"
+            print(f"  {name:<32}{record['repeats']:8d}{record['p50_seconds'] * 1000:11.3f}"
+                  f"{record['p99_seconds'] * 1000:11.3f}{throughput}{memory}", flush=True)
+        del X, y
+    return results
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE, min_delta=DEFAULT_MIN_DELTA,
+            metric='p50'):
+    """
+    Latency changes against a baseline run
+
+    Parameters:
+    results (list): Records from run_suite
+    baseline (dict): An earlier results JSON
+    tolerance (float): Allowed relative slowdown
+    min_delta (float): Slowdowns below this many seconds never count
+    metric (str): 'p50' (default), 'mean' or 'min' latency
+
+    Returns:
+    list: dicts with case, rows, baseline and current seconds, ratio and
+        regression (True when slower by more than tolerance and min_delta)
+    """
+    key = f'{metric}_seconds'
+    previous = {
+        (record['case'], record['rows']): record
+        for record in baseline['results'] if key in record
+    }
+    changes = []
+    for record in results:
+        before = previous.get((record['case'], record['rows']))
+        if before is None or key not in record:
+            continue
+        old, new = before[key], record[key]
+        changes.append({
+            'case': record['case'],
+            'rows': record['rows'],
+            'baseline_seconds': old,
+            'seconds': new,
+            'ratio': new / old if old > 0 else math.inf,
+            'regression': new > old * (1 + tolerance) and new - old > min_delta
+        })
+    return changes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every predictor hot path")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Cohort sizes (default: 1 1000 100000 1000000 10000000)")
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES),
+                        help="Cases to run (default: all)")
+    parser.add_argument('--budget', type=float, default=1.0,
+                        help="Target seconds of timed calls per case and size (default: 1)")
+    parser.add_argument('--min-repeats', type=int, default=3, help="Fewest timed calls (default: 3)")
+    parser.add_argument('--max-repeats', type=int, default=1000,
+                        help="Most timed calls (default: 1000)")
+    parser.add_argument('--string-dtype', choices=['object', 'category'], default='object',
+                        help="dtype of the categorical input columns (default: object)")
+    parser.add_argument('--no-row-limits', action='store_true',
+                        help="Also run the per-row-object cases above their MAX_ROWS")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="Skip the extra tracemalloc call per case")
+    parser.add_argument('--output', help="Write the results JSON here")
+    parser.add_argument('--baseline', help="Earlier results JSON to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Allowed median slowdown (default: {DEFAULT_TOLERANCE * 100:.0f}%%)")
+    parser.add_argument('--min-delta', type=float, default=DEFAULT_MIN_DELTA,
+                        help=f"Ignore slowdowns below this many seconds (default: {DEFAULT_MIN_DELTA:g})")
+    parser.add_argument('--metric', choices=['p50', 'mean', 'min'], default='p50',
+                        help="Latency compared with the baseline (default: p50)")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.sizes, args.cases, args.budget, args.min_repeats, args.max_repeats,
+                        not args.no_memory, args.string_dtype, not args.no_row_limits)
+    if args.output:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump({'environment': environment(args.string_dtype), 'results': results},
+                      handle, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as handle:
+            baseline = json.load(handle)
+        changes = compare(results, baseline, args.tolerance, args.min_delta, args.metric)
+        regressions = [change for change in changes if change['regression']]
+        print(f"\nAgainst {args.baseline} (commit {baseline['environment'].get('git_commit')}): "
+              f"{len(changes)} comparable results, {len(regressions)} regression(s) "
+              f"beyond {args.tolerance:.0%} ({args.metric} latency)")
+        for change in changes:
+            flag = 'REGRESSION' if change['regression'] else ''
+            print(f"  {change['case']:<32}{change['rows']:>12,}  "
+                  f"{change['baseline_seconds'] * 1000:10.3f} -> {change['seconds'] * 1000:10.3f} ms"
+                  f"  x{change['ratio']:.2f}  {flag}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+SalivAI - Bootstrap Validation
+Confidence intervals for AUC and threshold metrics on a labelled local cohort
+
+Patients are first collapsed into groups of (distinct score, outcome). A
+bootstrap resample then only needs a histogram over those groups: B x n
+resampled row indices are drawn in blocks, mapped to their groups and counted
+with np.bincount. AUC comes from the histogram in rank form (negatives
+ranked below each positive, ties counting one half, as roc_auc_score), and
+sensitivity, specificity, PPV, NPV and accuracy from its suffix sums at the
+threshold. Nothing is sorted per resample.
+
+Resamples are split into fixed-size tasks with independent seeds spawned from
+one SeedSequence, so results are reproducible whatever the worker count.
+Tasks run in a process pool.
+
+Usage:
+    from bootstrap_validation import bootstrap_validation
+
+    result = bootstrap_validation(y_true, predictor.predict_proba(X), random_state=42)
+    result.confidence_intervals()
+    result.compare(predictor.expected_performance)
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from validation_metrics import _safe_ratio, known_outcomes
+
+# Metrics computed per resample, in report order (as in generate_report)
+METRICS = ('auc', 'sensitivity', 'specificity', 'ppv', 'npv', 'accuracy')
+
+DEFAULT_N_RESAMPLES = 2000
+
+# Resamples per pool task; fixed so the random streams do not depend on n_workers
+RESAMPLES_PER_TASK = 50
+
+# Upper bound on the resampled indices and group histograms held at once per task
+DEFAULT_BLOCK_BYTES = 32 * 1024 ** 2
+
+
+class BootstrapResult:
+    """
+    Bootstrap distribution of the validation metrics
+
+    Attributes:
+    estimates (dict): Metrics on the full cohort
+    samples (dict): Metric per resample, arrays of length n_resamples (AUC is
+        NaN for resamples that drew a single class)
+    threshold (float): Cut-off used for the threshold metrics
+    """
+
+    def __init__(self, estimates, samples, threshold):
+        self.estimates = estimates
+        self.samples = samples
+        self.threshold = threshold
+
+    @property
+    def n_resamples(self):
+        return len(self.samples['auc'])
+
+    def confidence_intervals(self, level=0.95):
+        """
+        Percentile bootstrap intervals
+
+        Returns:
+        dict: metric -> (lower, upper)
+        """
+        tail = (1 - level) / 2 * 100
+        return {
+            metric: tuple(float(bound) for bound in np.nanpercentile(values, [tail, 100 - tail]))
+            for metric, values in self.samples.items()
+        }
+
+    def compare(self, expected_performance, level=0.95):
+        """
+        Check the local intervals against literature ranges
+
+        Parameters:
+        expected_performance (dict): metric -> (low, high), e.g.
+            LiteratureBasedMalignancyPredictor.expected_performance
+        level (float): Coverage of the bootstrap intervals
+
+        Returns:
+        dict: metric -> estimate, ci, expected and status; status is
+            'consistent' when the interval overlaps the literature range,
+            otherwise 'below' or 'above'
+        """
+        intervals = self.confidence_intervals(level)
+        comparison = {}
+        for metric, (low, high) in expected_performance.items():
+            if metric not in intervals:
+                continue
+            lower, upper = intervals[metric]
+            if upper < low:
+                status = 'below'
+            elif lower > high:
+                status = 'above'
+            else:
+                status = 'consistent'
+            comparison[metric] = {
+                'estimate': self.estimates[metric],
+                'ci': (lower, upper),
+                'expected': (low, high),
+                'status': status
+            }
+        return comparison
+
+
+def group_patients(y_true, scores):
+    """
+    Group index per patient: 2 * rank of its distinct score + outcome
+
+    Patients whose outcome is unknown (NaN label) are left out.
+
+    Returns:
+    tuple: (ascending distinct scores, int32 group per known patient)
+    """
+    labels, scores = known_outcomes(y_true, scores)
+    distinct_scores, score_rank = np.unique(scores, return_inverse=True)
+    groups = score_rank.reshape(-1) * 2 + labels
+    return distinct_scores, groups.astype(np.int32)
+
+
+def metrics_from_histograms(histograms, distinct_scores, threshold):
+    """
+    Validation metrics for each row of a (resamples, 2 * n_scores) group histogram
+
+    Returns:
+    dict: METRICS -> array with one value per row
+    """
+    histograms = np.atleast_2d(histograms)
+    negatives = histograms[:, 0::2]
+    positives = histograms[:, 1::2]
+    n_positive = positives.sum(axis=1)
+    n_negative = negatives.sum(axis=1)
+
+    # Rank-form AUC: negatives strictly below each positive, plus half the ties
+    negatives_below = np.cumsum(negatives, axis=1) - negatives
+    wins = np.einsum('ij,ij->i', positives, negatives_below + 0.5 * negatives)
+    pairs = (n_positive * n_negative).astype(np.float64)
+    auc = np.full(len(histograms), np.nan)
+    np.divide(wins, pairs, out=auc, where=pairs > 0)
+
+    # Called positive: score >= threshold
+    cut = np.searchsorted(distinct_scores, threshold, side='left')
+    tp = positives[:, cut:].sum(axis=1)
+    fp = negatives[:, cut:].sum(axis=1)
+    fn = n_positive - tp
+    tn = n_negative - fp
+    return {
+        'auc': auc,
+        'sensitivity': _safe_ratio(tp, tp + fn),
+        'specificity': _safe_ratio(tn, tn + fp),
+        'ppv': _safe_ratio(tp, tp + fp),
+        'npv': _safe_ratio(tn, tn + fn),
+        'accuracy': _safe_ratio(tp + tn, n_positive + n_negative)
+    }
+
+
+def _bootstrap_task(groups, distinct_scores, threshold, n_resamples, seed, block_bytes):
+    """Pool task: metrics for n_resamples resamples drawn from one seed"""
+    rng = np.random.default_rng(seed)
+    n_rows = len(groups)
+    n_groups = 2 * len(distinct_scores)
+    # Bytes per resample in a block: int32 indices and their groups (8 * n_rows),
+    # its int64 histogram and the cumulative-sum temporaries of
+    # metrics_from_histograms (about 8 * 3 * n_groups)
+    row_bytes = 8 * n_rows + 8 * 3 * n_groups
+    block = int(max(1, min(n_resamples, block_bytes // row_bytes)))
+
+    histograms = np.empty((block, n_groups), dtype=np.int64)
+    results = []
+    for start in range(0, n_resamples, block):
+        stop = min(start + block, n_resamples)
+        indices = rng.integers(0, n_rows, size=(stop - start, n_rows), dtype=np.int32)
+        resampled = np.take(groups, indices)
+        for row, resample in enumerate(resampled):
+            histograms[row] = np.bincount(resample, minlength=n_groups)
+        results.append(metrics_from_histograms(histograms[:stop - start], distinct_scores,
+                                               threshold))
+    return {metric: np.concatenate([result[metric] for result in results]) for metric in METRICS}
+
+
+def bootstrap_validation(y_true, scores, n_resamples=DEFAULT_N_RESAMPLES, threshold=0.5,
+                         n_workers=None, random_state=None, block_bytes=DEFAULT_BLOCK_BYTES):
+    """
+    Bootstrap the validation metrics of scored, labelled patients
+
+    Parameters:
+    y_true (array-like): Binary outcomes (1 = malignant; NaN = unknown, left out)
+    scores (array-like): Predicted probabilities
+    n_resamples (int): Number of bootstrap resamples B
+    threshold (float): Cut-off for the threshold metrics (generate_report uses 0.5)
+    n_workers (int, optional): Worker processes (default: os.cpu_count();
+        1 runs in this process)
+    random_state (int, optional): Seed for reproducible resamples
+    block_bytes (int): Memory budget of one block of resamples (indices,
+        group histograms and metric temporaries), per worker
+
+    Returns:
+    BootstrapResult: Full-cohort estimates and per-resample metrics
+    """
+    distinct_scores, groups = group_patients(y_true, scores)
+    full = np.bincount(groups, minlength=2 * len(distinct_scores))
+    estimates = {
+        metric: float(values[0])
+        for metric, values in metrics_from_histograms(full, distinct_scores, threshold).items()
+    }
+    if np.isnan(estimates['auc']):
+        raise ValueError("Only one class present in y_true; ROC analysis is not defined")
+
+    task_sizes = [
+        min(RESAMPLES_PER_TASK, n_resamples - start)
+        for start in range(0, n_resamples, RESAMPLES_PER_TASK)
+    ]
+    seeds = np.random.SeedSequence(random_state).spawn(len(task_sizes))
+    tasks = [
+        (groups, distinct_scores, threshold, size, seed, block_bytes)
+        for size, seed in zip(task_sizes, seeds)
+    ]
+
+    n_workers = min(n_workers or os.cpu_count() or 1, max(len(tasks), 1))
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            results = list(pool.map(_bootstrap_task, *zip(*tasks)))
+    else:
+        results = [_bootstrap_task(*task) for task in tasks]
+
+    samples = {
+        metric: np.concatenate([result[metric] for result in results]) if results else np.empty(0)
+        for metric in METRICS
+    }
+    return BootstrapResult(estimates, samples, threshold)
@@ -0,0 +1,470 @@
+"""
+SalivAI - Coefficient Registry
+Named, versioned coefficient sets with validation, checksums and hot-swap
+
+Each set is one JSON file, coefficient_sets/<name>/<version>.json:
+
+    {"name": "literature", "version": "1", "created": "2024-06-01T09:00:00+00:00",
+     "coefficients": {"intercept": -3.2, "age": 0.049, ...},
+     "risk_thresholds": {"low": 0.3, "intermediate": 0.7},
+     "odds_ratio_confidence_intervals": {"age": [1.02, 1.08], ...},   (optional)
+     "metadata": {...},                                               (optional)
+     "checksum": "<sha256 of the coefficients, risk thresholds and intervals>"}
+
+A version is validated and compiled into a LiteratureBasedMalignancyPredictor
+once, then kept warm in a small LRU cache. The active version is a single
+reference replaced atomically: a request (or micro-batch) reads it once and
+finishes with that predictor even if another version is activated meanwhile,
+so swapping never drops or mixes in-flight work.
+
+The active version is recorded in coefficient_sets/ACTIVE ("name/version",
+literature/1 when absent). Every process sharing the directory picks up a
+change of that file within poll_interval seconds, so activating a version
+from the command line hot-swaps a running Streamlit app and scoring service.
+
+Usage:
+    registry = CoefficientRegistry()
+    predictor = registry.active()            # call per request, do not keep it
+    registry.save('local', '2', result.coefficients, metadata=result.diagnostics())
+    registry.activate('local', '2')
+
+    python coefficient_registry.py list
+    python coefficient_registry.py save local 2 recalibrated.json --activate
+    python coefficient_registry.py activate literature 1
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+import warnings
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from salivary_gland_malignancy_predictor import LiteratureBasedMalignancyPredictor
+from scoring_core import FEATURE_NAMES, RISK_THRESHOLDS, coefficient_checksum
+
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'coefficient_sets')
+
+# Pointer file naming the active version
+ACTIVE_FILE = 'ACTIVE'
+
+# Active version when no pointer file exists
+DEFAULT_SET = ('literature', '1')
+
+# Compiled versions kept warm
+DEFAULT_CACHE_SIZE = 4
+
+# Seconds between checks of the pointer file
+DEFAULT_POLL_INTERVAL = 1.0
+
+_NAME_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_.-]*$')
+
+
+class RegistryError(ValueError):
+    """Unknown, malformed or tampered coefficient set"""
+
+
+def _check_name(value, what):
+    if not isinstance(value, str) or not _NAME_PATTERN.match(value):
+        raise RegistryError(f"Invalid {what} {value!r}: use letters, digits, '.', '_' and '-'")
+    return value
+
+
+def _finite_floats(values, keys, what):
+    """Dict of floats for exactly `keys`, or RegistryError"""
+    if not isinstance(values, dict):
+        raise RegistryError(f"{what} must be a JSON object")
+    missing = [key for key in keys if key not in values]
+    unknown = [key for key in values if key not in keys]
+    if missing or unknown:
+        raise RegistryError(f"{what}: missing {missing or 'none'}, unknown {unknown or 'none'}")
+    result = {}
+    for key in keys:
+        value = values[key]
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise RegistryError(f"{what}[{key!r}] must be a finite number, got {value!r}")
+        result[key] = float(value)
+    return result
+
+
+def validate_coefficient_set(document):
+    """
+    Check a coefficient-set document and normalize its numbers
+
+    Parameters:
+    document (dict): Parsed coefficient-set JSON
+
+    Returns:
+    dict: The document with float coefficients, thresholds and intervals
+
+    Raises:
+    RegistryError: Missing or unknown keys, non-finite values, thresholds
+        outside 0 < low <= intermediate < 1, malformed intervals or a checksum
+        that does not match the contents
+    """
+    if not isinstance(document, dict):
+        raise RegistryError("A coefficient set must be a JSON object")
+    _check_name(document.get('name'), 'name')
+    _check_name(document.get('version'), 'version')
+
+    coefficients = _finite_floats(document.get('coefficients'), ['intercept'] + FEATURE_NAMES,
+                                  'coefficients')
+    thresholds = _finite_floats(document.get('risk_thresholds'), ['low', 'intermediate'],
+                                'risk_thresholds')
+    if not 0 < thresholds['low'] <= thresholds['intermediate'] < 1:
+        raise RegistryError("risk_thresholds must satisfy 0 < low <= intermediate < 1")
+
+    intervals = document.get('odds_ratio_confidence_intervals')
+    if intervals is not None:
+        if not isinstance(intervals, dict) or sorted(intervals) != sorted(FEATURE_NAMES):
+            raise RegistryError("odds_ratio_confidence_intervals must cover every feature")
+        normalized = {}
+        for name, bounds in intervals.items():
+            if not isinstance(bounds, (list, tuple)) or len(bounds) != 2:
+                raise RegistryError(f"interval {name!r} must be [lower, upper]")
+            bounds = _finite_floats(dict(zip(('lower', 'upper'), bounds)), ['lower', 'upper'],
+                                    f"interval {name!r}")
+            if not 0 < bounds['lower'] < bounds['upper']:
+                raise RegistryError(f"interval {name!r} must satisfy 0 < lower < upper")
+            normalized[name] = (bounds['lower'], bounds['upper'])
+        intervals = normalized
+
+    checksum = coefficient_checksum(coefficients, thresholds, intervals)
+    if document.get('checksum') != checksum:
+        raise RegistryError(
+            f"Checksum mismatch for {document['name']}/{document['version']}: the file was "
+            "edited by hand; save it through CoefficientRegistry.save"
+        )
+    return dict(document, coefficients=coefficients, risk_thresholds=thresholds,
+                odds_ratio_confidence_intervals=intervals)
+
+
+def _version_key(version):
+    """Numeric versions in numeric order, before named ones"""
+    return (0, int(version), '') if version.isdigit() else (1, 0, version)
+
+
+def _write_atomically(path, text):
+    """Write a file through a temporary sibling and os.replace"""
+    handle, temporary = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(handle, 'w', encoding='utf-8') as output:
+            output.write(text)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+class CoefficientRegistry:
+    """
+    Versioned coefficient sets compiled into warm, hot-swappable predictors
+
+    Thread-safe. active() is lock-free except when it re-reads the pointer
+    file (at most once per poll_interval).
+    """
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, cache_size=DEFAULT_CACHE_SIZE,
+                 poll_interval=DEFAULT_POLL_INTERVAL, use_lookup_table=False, audit_logger=None,
+                 profiler=None):
+        """
+        Parameters:
+        directory (str): Root holding <name>/<version>.json and the ACTIVE pointer
+        cache_size (int): Compiled versions kept in the LRU cache
+        poll_interval (float): Seconds between checks of the ACTIVE file
+            (0 checks on every call)
+        use_lookup_table (bool): Precompute each version's lookup table when compiling
+        audit_logger (AuditLogger, optional): Attached to every compiled predictor
+        profiler (StageProfiler, optional): Attached to every compiled predictor,
+            so stage timings accumulate across hot-swaps
+        """
+        self.directory = directory
+        self.cache_size = max(int(cache_size), 1)
+        self.poll_interval = poll_interval
+        self.use_lookup_table = use_lookup_table
+        self.audit_logger = audit_logger
+        self.profiler = profiler
+
+        self._lock = threading.RLock()
+        self._scorers = OrderedDict()
+        self._active = None
+        self._active_stamp = None
+        self._next_poll = 0.0
+
+    def path(self, name, version):
+        """File of one coefficient set"""
+        return os.path.join(self.directory, _check_name(name, 'name'),
+                            _check_name(version, 'version') + '.json')
+
+    def versions(self, name=None):
+        """
+        Stored coefficient sets
+
+        Returns:
+        list: (name, version) pairs sorted by name, then version
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        names = [name] if name is not None else sorted(os.listdir(self.directory))
+        found = []
+        for set_name in names:
+            folder = os.path.join(self.directory, set_name)
+            if not os.path.isdir(folder) or not _NAME_PATTERN.match(set_name):
+                continue
+            stored = [entry[:-5] for entry in os.listdir(folder)
+                      if entry.endswith('.json') and _NAME_PATTERN.match(entry[:-5])]
+            found.extend((set_name, version) for version in sorted(stored, key=_version_key))
+        return found
+
+    def load(self, name, version):
+        """
+        Read and validate one coefficient set
+
+        Returns:
+        dict: The validated document (see validate_coefficient_set)
+        """
+        path = self.path(name, version)
+        try:
+            with open(path, encoding='utf-8') as handle:
+                document = json.load(handle)
+        except FileNotFoundError:
+            raise RegistryError(f"Unknown coefficient set {name}/{version} ({path})") from None
+        except ValueError as error:
+            raise RegistryError(f"{path} is not valid JSON: {error}") from None
+
+        document = validate_coefficient_set(document)
+        if (document['name'], document['version']) != (name, version):
+            raise RegistryError(f"{path} declares {document['name']}/{document['version']}")
+        return document
+
+    def compile(self, name, version):
+        """Validated set compiled into a new predictor (not cached)"""
+        document = self.load(name, version)
+        return LiteratureBasedMalignancyPredictor(
+            use_lookup_table=self.use_lookup_table,
+            audit_logger=self.audit_logger,
+            coefficients=document['coefficients'],
+            risk_thresholds=document['risk_thresholds'],
+            odds_ratio_confidence_intervals=document['odds_ratio_confidence_intervals'],
+            model_name=f"{name}-v{version}",
+            profiler=self.profiler
+        )
+
+    def scorer(self, name, version):
+        """
+        Compiled predictor of one version, from the LRU cache when warm
+
+        Treat it as read-only: the same instance serves every caller.
+        """
+        key = (name, version)
+        with self._lock:
+            predictor = self._scorers.get(key)
+            if predictor is None:
+                predictor = self.compile(name, version)
+                self._scorers[key] = predictor
+                while len(self._scorers) > self.cache_size:
+                    self._scorers.popitem(last=False)
+            else:
+                self._scorers.move_to_end(key)
+            return predictor
+
+    def activate(self, name, version, persist=True):
+        """
+        Make a version the active one
+
+        The version is validated and compiled before the swap, so a bad set
+        leaves the current one active. Requests already holding the previous
+        predictor finish with it.
+
+        Parameters:
+        name (str): Coefficient set name
+        version (str): Version within the set
+        persist (bool): Also update the ACTIVE file, switching every process
+            that shares the directory; False swaps this registry only
+
+        Returns:
+        LiteratureBasedMalignancyPredictor: The newly active predictor
+        """
+        version = str(version)
+        predictor = self.scorer(name, version)
+        with self._lock:
+            if persist:
+                os.makedirs(self.directory, exist_ok=True)
+                _write_atomically(self._active_path(), f"{name}/{version}\n")
+                self._active_stamp = self._pointer_stamp()
+                self._next_poll = time.monotonic() + self.poll_interval
+            self._active = ((name, version), predictor)
+        return predictor
+
+    def active(self):
+        """
+        Predictor of the active version
+
+        Fetch it once per request or batch and use that reference throughout;
+        do not keep it across requests, or hot-swaps will be missed.
+        """
+        active = self._active
+        if active is None or time.monotonic() >= self._next_poll:
+            active = self._poll()
+        return active[1]
+
+    def active_version(self):
+        """(name, version) of the active coefficient set"""
+        self.active()
+        return self._active[0]
+
+    def _active_path(self):
+        return os.path.join(self.directory, ACTIVE_FILE)
+
+    def _pointer_stamp(self):
+        """Identity of the current ACTIVE file, None if there is none"""
+        try:
+            stat = os.stat(self._active_path())
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _pointer_key(self):
+        """Key named by the ACTIVE file, DEFAULT_SET if there is none"""
+        try:
+            with open(self._active_path(), encoding='utf-8') as handle:
+                return tuple(handle.read().strip().split('/', 1))
+        except FileNotFoundError:
+            return DEFAULT_SET
+
+    def _poll(self):
+        """Follow the ACTIVE file if it changed since the last check"""
+        with self._lock:
+            self._next_poll = time.monotonic() + self.poll_interval
+            stamp = self._pointer_stamp()
+            if self._active is not None and stamp == self._active_stamp:
+                return self._active
+
+            key = self._pointer_key()
+            try:
+                if len(key) != 2:
+                    raise RegistryError(f"{self._active_path()} must contain name/version")
+                # Another process may have overwritten the version it points to
+                self._scorers.pop(key, None)
+                self._active = (key, self.scorer(*key))
+            except (OSError, RegistryError) as error:
+                if self._active is None:
+                    raise
+                name, version = self._active[0]
+                warnings.warn(f"Keeping {name}/{version} active: {error}")
+            self._active_stamp = stamp
+            return self._active
+
+    def save(self, name, version, coefficients, risk_thresholds=None,
+             odds_ratio_confidence_intervals=None, metadata=None, overwrite=False):
+        """
+        Store a new coefficient set with its checksum
+
+        Parameters:
+        name (str): Coefficient set name (e.g. 'literature', 'local')
+        version (str): Version within the set; versions are immutable unless
+            overwrite is True, and overwriting the active version swaps it in
+        coefficients (dict): Intercept and the FEATURE_NAMES weights
+        risk_thresholds (dict, optional): 'low' and 'intermediate' (default: RISK_THRESHOLDS)
+        odds_ratio_confidence_intervals (dict, optional): feature -> (lower, upper)
+        metadata (dict, optional): Free-form provenance, e.g. recalibration diagnostics
+
+        Returns:
+        str: Path of the written file
+        """
+        version = str(version)
+        path = self.path(name, version)
+        replacing = os.path.exists(path)
+        if replacing and not overwrite:
+            raise RegistryError(f"{name}/{version} already exists; versions are immutable")
+
+        coefficients = _finite_floats(coefficients, ['intercept'] + FEATURE_NAMES, 'coefficients')
+        thresholds = _finite_floats(dict(RISK_THRESHOLDS if risk_thresholds is None else risk_thresholds),
+                                    ['low', 'intermediate'], 'risk_thresholds')
+        document = {
+            'name': name,
+            'version': version,
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'coefficients': coefficients,
+            'risk_thresholds': thresholds
+        }
+        if odds_ratio_confidence_intervals is not None:
+            document['odds_ratio_confidence_intervals'] = {
+                feature: list(bounds) for feature, bounds in odds_ratio_confidence_intervals.items()
+            }
+        if metadata is not None:
+            document['metadata'] = metadata
+        document['checksum'] = coefficient_checksum(coefficients, thresholds,
+                                                    document.get('odds_ratio_confidence_intervals'))
+        validate_coefficient_set(document)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _write_atomically(path, json.dumps(document, indent=2) + '\n')
+        with self._lock:
+            self._scorers.pop((name, version), None)
+            if replacing and self._pointer_key() == (name, version):
+                # Rewriting ACTIVE makes every process recompile the new coefficients
+                self.activate(name, version)
+            elif replacing and self._active is not None and self._active[0] == (name, version):
+                self.activate(name, version, persist=False)
+        return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage SalivAI coefficient sets")
+    parser.add_argument('--directory', default=DEFAULT_DIRECTORY,
+                        help="Registry root (default: coefficient_sets next to this file)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('list', help="List stored versions (* marks the active one)")
+
+    activate = commands.add_parser('activate', help="Hot-swap every process to a version")
+    activate.add_argument('name')
+    activate.add_argument('version')
+
+    save = commands.add_parser('save', help="Store coefficients from a JSON file as a new version")
+    save.add_argument('name')
+    save.add_argument('version')
+    save.add_argument('source', help="recalibration.py output, or a JSON object with "
+                                     "'coefficients' and optional 'risk_thresholds'")
+    save.add_argument('--activate', action='store_true', help="Activate the new version")
+    save.add_argument('--overwrite', action='store_true', help="Replace an existing version")
+    args = parser.parse_args(argv)
+
+    registry = CoefficientRegistry(args.directory)
+    if args.command == 'list':
+        active = registry.active_version() if registry.versions() else None
+        for name, version in registry.versions():
+            document = registry.load(name, version)
+            marker = '*' if (name, version) == active else ' '
+            print(f"{marker} {name}/{version:<10} {document['checksum'][:12]}  "
+                  f"{document.get('created', '')}")
+
+    elif args.command == 'activate':
+        predictor = registry.activate(args.name, args.version)
+        print(f"Active: {args.name}/{args.version} ({predictor.model_version})")
+
+    else:
+        with open(args.source, encoding='utf-8') as handle:
+            source = json.load(handle)
+        metadata = {'source': os.path.basename(args.source)}
+        if 'diagnostics' in source:
+            metadata['recalibration'] = source['diagnostics']
+        path = registry.save(args.name, args.version, source['coefficients'],
+                             risk_thresholds=source.get('risk_thresholds'),
+                             odds_ratio_confidence_intervals=source.get('odds_ratio_confidence_intervals'),
+                             metadata=metadata, overwrite=args.overwrite)
+        print(f"Saved {path}")
+        if args.activate:
+            predictor = registry.activate(args.name, args.version)
+            print(f"Active: {args.name}/{args.version} ({predictor.model_version})")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ This script showcases the capabilities of the literature-based model
 import pandas as pd
 import numpy as np
 from salivary_gland_malignancy_predictor import LiteratureBasedMalignancyPredictor, create_sample_data
+from scoring_core import FEATURE_NAMES
 import matplotlib.pyplot as plt
 
 def demo_individual_predictions():
@@ -223,31 +224,20 @@ def demo_model_transparency():
     print("Patient: 60-year-old male, submandibular, 2-4cm, irregular margins, hypoechoic, increased vascularity")
     print()
     
-    # Show the calculation breakdown
-    coeffs = predictor.literature_coefficients
+    # Show the calculation breakdown (one vectorized explain() call)
+    explanation = predictor.explain(patient_data)
+    design = predictor._encode_features(patient_data)[0]
     
     print("Literature-Based Logistic Regression Calculation:")
     print("-" * 50)
-    print(f"Intercept:                    {coeffs['intercept']:6.3f}")
-    print(f"Age (normalized):             {coeffs['age']:6.3f} × {(60-50)/20:5.2f} = {coeffs['age'] * (60-50)/20:6.3f}")
-    print(f"Location (submandibular):     {coeffs['location_submandibular']:6.3f} × 1     = {coeffs['location_submandibular']:6.3f}")
-    print(f"Size (2-4cm):                 {coeffs['size_2_4cm']:6.3f} × 1     = {coeffs['size_2_4cm']:6.3f}")
-    print(f"Gender (male):                {coeffs['gender_male']:6.3f} × 1     = {coeffs['gender_male']:6.3f}")
-    print(f"Margins (irregular):          {coeffs['margins_irregular']:6.3f} × 1     = {coeffs['margins_irregular']:6.3f}")
-    print(f"Echo (hypoechoic):            {coeffs['echo_hypoechoic']:6.3f} × 1     = {coeffs['echo_hypoechoic']:6.3f}")
-    print(f"Vascularity (increased):      {coeffs['vascularity_increased']:6.3f} × 1     = {coeffs['vascularity_increased']:6.3f}")
-    
-    # Calculate linear predictor
-    linear_pred = (coeffs['intercept'] + 
-                   coeffs['age'] * (60-50)/20 + 
-                   coeffs['location_submandibular'] + 
-                   coeffs['size_2_4cm'] + 
-                   coeffs['gender_male'] + 
-                   coeffs['margins_irregular'] + 
-                   coeffs['echo_hypoechoic'] + 
-                   coeffs['vascularity_increased'])
-    
-    probability = 1 / (1 + np.exp(-linear_pred))
+    print(f"Intercept:                    {explanation.intercept:6.3f}")
+    for name, value, contribution in zip(FEATURE_NAMES, design, explanation.contributions[0]):
+        if value != 0:
+            coefficient = predictor.literature_coefficients[name]
+            print(f"{name + ':':<30}{coefficient:6.3f} × {value:5.2f} = {contribution:6.3f}")
+    
+    linear_pred = explanation.total[0]
+    probability = explanation.probabilities[0]
     
     print("-" * 50)
     print(f"Linear Predictor (sum):       {linear_pred:6.3f}")
@@ -0,0 +1,154 @@
+"""
+SalivAI - Per-Patient Explanations
+Log-odds contribution of every feature to each patient's prediction
+
+The model is additive on the log-odds scale, so a patient's log-odds split
+exactly into the intercept plus one term per feature: the design row times
+the weights. For a whole cohort this is one broadcast multiply of the
+(N x 9) design matrix by the weight vector; no per-patient loop.
+
+Contributions are relative to the reference patient the intercept describes:
+age 50, parotid, <=2cm, female, regular margins, iso-hyperechoic, normal
+vascularity. The age term is negative below 50.
+
+Top-k drivers (largest absolute contributions) are selected with
+np.argpartition, so only the k selected columns of each row are sorted.
+
+NumPy-only, like scoring_core.
+
+Usage:
+    from explanation import explain_design_matrix
+
+    explanation = explain_design_matrix(design, intercept, weights)
+    explanation.contributions, explanation.total
+    explanation = explain_design_matrix(design, intercept, weights, top_k=3)
+    explanation.to_frame()   # driver_1, driver_1_contribution, ...
+
+Bulk writers (batch_scoring.py, arrow_io.py) take explain='all' for the
+nine contribution columns or explain=k for the top-k driver columns.
+"""
+
+import numpy as np
+
+from scoring_core import FEATURE_NAMES, stable_sigmoid
+
+
+class Explanation:
+    """
+    Log-odds contributions per patient
+
+    Attributes:
+    contributions (np.array): (N, 9) contribution of each feature in
+        FEATURE_NAMES order, or (N, k) of the top-k drivers when `drivers` is set
+    drivers (np.array or None): (N, k) int8 FEATURE_NAMES index of each
+        column of `contributions`, ordered by decreasing absolute contribution
+    intercept (float): Log-odds of the reference patient
+    total (np.array): Log-odds per patient (intercept plus all nine contributions)
+    """
+
+    def __init__(self, contributions, intercept, total, drivers=None):
+        self.contributions = contributions
+        self.intercept = intercept
+        self.total = total
+        self.drivers = drivers
+
+    def __len__(self):
+        return len(self.total)
+
+    @property
+    def probabilities(self):
+        return stable_sigmoid(self.total)
+
+    @property
+    def top_k(self):
+        """Drivers kept per patient (None when every feature is kept)"""
+        return None if self.drivers is None else self.drivers.shape[1]
+
+    def driver_codes(self):
+        """
+        (N, k) int8 FEATURE_NAMES index of each top-k driver, -1 where the
+        contribution is zero (fewer than k features move that patient's risk)
+        """
+        if self.drivers is None:
+            raise ValueError("Explanation holds every feature; use contributions directly")
+        return np.where(self.contributions != 0, self.drivers, -1).astype(np.int8)
+
+    def to_frame(self):
+        """
+        DataFrame of the contributions (columns from explanation_column_names)
+
+        Driver names are categoricals over FEATURE_NAMES, empty where the
+        driver's contribution is zero.
+        """
+        import pandas as pd
+        if self.drivers is None:
+            return pd.DataFrame(self.contributions, columns=explanation_column_names('all'))
+        codes = self.driver_codes()
+        columns = {}
+        for rank in range(self.top_k):
+            columns[f'driver_{rank + 1}'] = pd.Categorical.from_codes(codes[:, rank], FEATURE_NAMES)
+            columns[f'driver_{rank + 1}_contribution'] = self.contributions[:, rank]
+        return pd.DataFrame(columns)
+
+
+def explanation_column_names(explain):
+    """
+    Output columns of an explanation
+
+    Parameters:
+    explain ('all' or int): contribution_<feature> for every feature, or
+        driver_<j> and driver_<j>_contribution for the top-k drivers
+    """
+    if explain == 'all':
+        return [f'contribution_{name}' for name in FEATURE_NAMES]
+    return [
+        column for rank in range(1, explain + 1)
+        for column in (f'driver_{rank}', f'driver_{rank}_contribution')
+    ]
+
+
+def top_drivers(contributions, top_k):
+    """
+    Indices and values of the top_k largest absolute contributions per row
+
+    Returns:
+    tuple: ((N, k) int8 column indices, (N, k) contributions), each row in
+        decreasing order of absolute contribution
+    """
+    n_features = contributions.shape[1]
+    if not 1 <= top_k <= n_features:
+        raise ValueError(f"top_k must be between 1 and {n_features}, got {top_k}")
+
+    # Negated magnitudes, so ascending selection puts the largest first
+    key = np.abs(contributions)
+    np.negative(key, out=key)
+    if top_k < n_features:
+        # Unordered top-k per row in linear time, then sort just those k
+        selected = np.argpartition(key, top_k - 1, axis=1)[:, :top_k]
+    else:
+        selected = np.broadcast_to(np.arange(n_features), contributions.shape)
+    order = np.take_along_axis(key, selected, axis=1).argsort(axis=1, kind='stable')
+    selected = np.take_along_axis(selected, order, axis=1)
+    return selected.astype(np.int8), np.take_along_axis(contributions, selected, axis=1)
+
+
+def explain_design_matrix(design, intercept, weights, top_k=None):
+    """
+    Per-feature log-odds contributions for an encoded design matrix
+
+    Parameters:
+    design (np.array): (N, 9) design matrix (FEATURE_NAMES order)
+    intercept (float): Model intercept
+    weights (np.array): Coefficients in FEATURE_NAMES order
+    top_k (int, optional): Keep only the k largest absolute contributions per patient
+
+    Returns:
+    Explanation: Contributions, intercept and total log-odds per patient
+    """
+    contributions = np.multiply(design, weights, dtype=np.float64)
+    total = contributions.sum(axis=1)
+    total += intercept
+    if top_k is None:
+        return Explanation(np.ascontiguousarray(contributions), float(intercept), total)
+    drivers, values = top_drivers(contributions, top_k)
+    return Explanation(values, float(intercept), total, drivers)
@@ -0,0 +1,235 @@
+"""
+SalivAI - Packed Patient Profiles
+Two bytes per patient: a uint8 age and a uint8 categorical profile code
+
+The six categorical inputs have N_PROFILES (144) combinations, so one
+profile code (profile_codes in scoring_core) fits a uint8, and whole-year
+ages fit another. A packed cohort is a structured array of PACKED_DTYPE;
+1M patients take 2 MB instead of a DataFrame of strings (hundreds of bytes
+per patient) or a float64 design matrix (72 bytes).
+
+Packing is lossy in one way: ages are rounded to whole years (the lookup
+table makes the same assumption). Missing ages, and ages outside 0-254,
+are stored as MISSING_AGE and score as NaN.
+
+Scoring never expands a design matrix. Each row read as a little-endian
+uint16 is age + 256 * profile, an index into a PackedScorer table holding
+the probability and risk code of all 144 x 256 possible rows (about 330 kB,
+cache resident), so scoring is one gather per block of rows.
+
+Packed cohorts are stored as .npy files and memory-mapped on load, so a
+registry stays resident in the page cache and is shared between processes.
+
+NumPy-only, like scoring_core.
+
+Usage:
+    from packed_profiles import PackedScorer, load_packed, pack, save_packed
+
+    save_packed('registry.npy', pack(ages, codes))
+    packed = load_packed('registry.npy')              # memory-mapped, read-only
+    probabilities, risk_codes = PackedScorer(intercept, weights, thresholds).score(packed)
+
+    predictor.predict_risk_category_packed(predictor.pack(X))
+
+    python packed_profiles.py pack patients.csv registry.npy
+    python packed_profiles.py score registry.npy --output probabilities.npy
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from scoring_core import (
+    N_PROFILES,
+    bin_risk_categories,
+    build_design_matrix,
+    decode_profile_codes,
+    profile_codes,
+    score_design_matrix
+)
+
+PACKED_DTYPE = np.dtype([('age', np.uint8), ('profile', np.uint8)])
+
+# Stored age of patients whose age is missing or outside 0-254
+MISSING_AGE = 255
+
+# Rows gathered per block (keeps the uint16 -> intp index conversion in cache)
+DEFAULT_BLOCK_ROWS = 65_536
+
+
+def pack(ages, codes, out=None):
+    """
+    Packed rows from ages and integer category codes
+
+    Parameters:
+    ages (np.array): Patient ages (rounded to whole years; NaN -> MISSING_AGE)
+    codes (dict): Integer category codes per column (see CATEGORY_LEVELS)
+    out (np.array, optional): PACKED_DTYPE array (e.g. a writable memmap) to fill
+
+    Returns:
+    np.array: PACKED_DTYPE array, one row per patient
+    """
+    ages = np.asarray(ages, dtype=np.float64)
+    if out is None:
+        out = np.empty(len(ages), dtype=PACKED_DTYPE)
+    rounded = np.rint(ages)
+    with np.errstate(invalid='ignore'):
+        storable = (rounded >= 0) & (rounded < MISSING_AGE)
+    out['age'] = np.where(storable, rounded, MISSING_AGE).astype(np.uint8)
+    out['profile'] = profile_codes(codes).astype(np.uint8)
+    return out
+
+
+def unpack(packed):
+    """
+    Ages and category codes of packed rows
+
+    Returns:
+    tuple: (float64 ages, NaN where missing; dict of int8 codes per column)
+    """
+    ages = packed['age'].astype(np.float64)
+    ages[packed['age'] == MISSING_AGE] = np.nan
+    codes = decode_profile_codes(packed['profile'])
+    return ages, {column: values.astype(np.int8) for column, values in codes.items()}
+
+
+def row_indices(packed):
+    """age + 256 * profile of every row, read in place as little-endian uint16"""
+    packed = np.ascontiguousarray(packed)
+    return packed.view('<u2')
+
+
+def save_packed(path, packed):
+    """Write packed rows as a .npy file"""
+    np.save(path, np.asarray(packed, dtype=PACKED_DTYPE))
+
+
+def load_packed(path, mmap_mode='r'):
+    """
+    Packed rows from a .npy file, memory-mapped by default
+
+    Parameters:
+    path (str): File written by save_packed (or open_packed)
+    mmap_mode (str or None): np.load mmap_mode; None reads the file into memory
+    """
+    packed = np.load(path, mmap_mode=mmap_mode)
+    if packed.dtype != PACKED_DTYPE or packed.ndim != 1:
+        raise ValueError(f"{path} does not hold packed patient rows ({packed.dtype}, "
+                         f"{packed.ndim} dimensions)")
+    return packed
+
+
+def open_packed(path, n_rows):
+    """Writable memory-mapped .npy file of n_rows packed rows, for filling chunk by chunk"""
+    return np.lib.format.open_memmap(path, mode='w+', dtype=PACKED_DTYPE, shape=(n_rows,))
+
+
+class PackedScorer:
+    """
+    Probability and risk code of every possible packed row
+
+    Built once per coefficient set: N_PROFILES profiles x 256 stored ages
+    (the MISSING_AGE column holds NaN probabilities, binned like any NaN).
+    """
+
+    def __init__(self, intercept, weights, thresholds):
+        """
+        Parameters:
+        intercept (float): Model intercept
+        weights (np.array): Coefficients in FEATURE_NAMES order
+        thresholds (dict): 'low' and 'intermediate' cut-points
+        """
+        indices = np.arange(N_PROFILES * 256)
+        profiles, ages = np.divmod(indices, 256)
+        design = build_design_matrix(ages.astype(np.float64), decode_profile_codes(profiles))
+        self.probabilities = score_design_matrix(design, intercept, weights)
+        self.probabilities[ages == MISSING_AGE] = np.nan
+        self.risk_codes = bin_risk_categories(self.probabilities, thresholds)
+
+    def score(self, packed, out=None, risk_codes_out=None, block_rows=DEFAULT_BLOCK_ROWS):
+        """
+        Probabilities and risk codes of packed rows (arrays or memmaps)
+
+        Parameters:
+        packed (np.array): PACKED_DTYPE rows
+        out (np.array, optional): float64 buffer receiving the probabilities
+        risk_codes_out (np.array, optional): uint8 buffer receiving the risk codes
+        block_rows (int): Rows gathered per step
+
+        Returns:
+        tuple: (float64 probabilities, uint8 risk codes)
+        """
+        n_rows = len(packed)
+        if out is None:
+            out = np.empty(n_rows, dtype=np.float64)
+        if risk_codes_out is None:
+            risk_codes_out = np.empty(n_rows, dtype=np.uint8)
+        for start in range(0, n_rows, block_rows):
+            stop = min(start + block_rows, n_rows)
+            indices = row_indices(packed[start:stop]).astype(np.intp)
+            np.take(self.probabilities, indices, out=out[start:stop])
+            np.take(self.risk_codes, indices, out=risk_codes_out[start:stop])
+        return out, risk_codes_out
+
+
+def pack_csv(input_path, output_path, chunksize=100_000):
+    """
+    Pack a patient CSV into a .npy file chunk by chunk
+
+    A first pass over the age column counts the rows, then each chunk is
+    packed straight into its slice of an open_packed memmap, so the cohort
+    is never held in memory.
+
+    Returns:
+    int: Rows packed
+    """
+    import pandas as pd
+
+    from batch_scoring import iter_csv_chunks
+    from salivary_gland_malignancy_predictor import FeatureEncoder
+
+    n_rows = sum(len(chunk) for chunk in pd.read_csv(input_path, usecols=['age'],
+                                                     chunksize=chunksize))
+    packed = open_packed(output_path, n_rows)
+    start = 0
+    for chunk in iter_csv_chunks(input_path, chunksize):
+        stop = start + len(chunk)
+        pack(FeatureEncoder.ages(chunk), FeatureEncoder.codes(chunk), out=packed[start:stop])
+        start = stop
+    packed.flush()
+    return n_rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pack patient cohorts into 2-byte rows and score them")
+    commands = parser.add_subparsers(dest='command', required=True)
+    pack_parser = commands.add_parser('pack', help="Pack a patient CSV into a .npy file")
+    pack_parser.add_argument('input', help="CSV with the predictor input columns")
+    pack_parser.add_argument('output', help="Destination .npy file")
+    score_parser = commands.add_parser('score', help="Score a packed .npy file")
+    score_parser.add_argument('input', help="Packed .npy file")
+    score_parser.add_argument('--output', help="Write the probabilities here as .npy")
+    args = parser.parse_args(argv)
+
+    if args.command == 'pack':
+        n_rows = pack_csv(args.input, args.output)
+        print(f"Packed {n_rows:,} patients into {args.output} ({n_rows * PACKED_DTYPE.itemsize:,} bytes)")
+        return
+
+    from salivary_gland_malignancy_predictor import LiteratureBasedMalignancyPredictor
+    packed = load_packed(args.input)
+    predictor = LiteratureBasedMalignancyPredictor()
+    start = time.perf_counter()
+    result = predictor.predict_risk_category_packed(packed)
+    seconds = time.perf_counter() - start
+    print(f"Scored {len(packed):,} patients in {seconds:.3f}s")
+    for category, count in result.counts().items():
+        print(f"  {category:<18} {count:,}")
+    if args.output:
+        np.save(args.output, result.probabilities)
+        print(f"Probabilities saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+"""
+SalivAI - Parallel Scoring Engine
+Multi-core batch scoring around LiteratureBasedMalignancyPredictor
+
+Large inputs are split into shards scored by a pool of workers; results are
+always returned (or written) in the original row order.
+
+- DataFrames are encoded once into compact arrays (float64 age plus one int8
+  code per categorical column) placed in shared memory. Workers attach to the
+  block, score their row range and write probabilities and risk codes straight
+  back into it, so neither the frame nor the results are pickled.
+- CSV files are split into byte ranges that end on row boundaries (newlines
+  inside quoted fields are skipped). Each worker parses, scores and writes its
+  own range to a part file; the parts are concatenated in order, so parsing
+  and CSV formatting run in parallel too.
+
+Usage:
+    from parallel_scoring import ParallelScorer
+
+    with ParallelScorer(n_workers=8) as scorer:
+        probabilities = scorer.predict_proba(X)
+        stats = scorer.score_csv('patients.csv', 'results.csv')
+"""
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pandas as pd
+
+from batch_scoring import CSV_DTYPES, INTERVAL_COLUMNS, RESULT_COLUMNS, peak_rss_mb, score_chunk
+from explanation import explanation_column_names
+from salivary_gland_malignancy_predictor import (
+    CATEGORY_LEVELS,
+    LiteratureBasedMalignancyPredictor,
+    RiskCategoryResult
+)
+
+# Rows per DataFrame shard
+DEFAULT_SHARD_ROWS = 250_000
+
+# Bytes of CSV per file shard (~1M rows), bounding per-worker memory
+DEFAULT_SHARD_BYTES = 64 * 1024 ** 2
+
+BACKENDS = ('process', 'thread')
+
+
+def _shared_block_views(buffer, n_rows):
+    """
+    Numpy views over a shared block: ages, category codes, probabilities, risk codes
+
+    Float arrays come first so every view stays naturally aligned.
+    """
+    n_columns = len(CATEGORY_LEVELS)
+    ages = np.ndarray((n_rows,), dtype=np.float64, buffer=buffer, offset=0)
+    probabilities = np.ndarray((n_rows,), dtype=np.float64, buffer=buffer, offset=8 * n_rows)
+    codes = np.ndarray((n_columns, n_rows), dtype=np.int8, buffer=buffer, offset=16 * n_rows)
+    risk_codes = np.ndarray(
+        (n_rows,), dtype=np.uint8, buffer=buffer, offset=(16 + n_columns) * n_rows
+    )
+    return ages, codes, probabilities, risk_codes
+
+
+def _shared_block_size(n_rows):
+    """Bytes needed by _shared_block_views for n_rows"""
+    return (17 + len(CATEGORY_LEVELS)) * n_rows
+
+
+def _score_code_shard(predictor, ages, codes, probabilities, risk_codes, start, stop):
+    """Score rows [start, stop) of pre-encoded arrays into the output arrays"""
+    shard_codes = {
+        column: codes[position, start:stop]
+        for position, column in enumerate(CATEGORY_LEVELS)
+    }
+    result = predictor.predict_risk_category_from_codes(
+        ages[start:stop], shard_codes, out=probabilities[start:stop]
+    )
+    risk_codes[start:stop] = result.codes
+    return stop - start
+
+
+def _attach_shared_block(block_name):
+    """
+    Attach a worker to the parent's shared block, leaving its cleanup to the parent
+
+    Before Python 3.13 attaching always registers the block with the resource
+    tracker (bpo-39959). A worker forked before the tracker was running would
+    start a tracker of its own that unlinks the block when the worker exits,
+    so the pool is only started once the parent's tracker runs (see
+    ParallelScorer.pool); the workers then share it and re-register a name it
+    already holds.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=block_name, track=False)
+    return shared_memory.SharedMemory(name=block_name)
+
+
+def _score_shared_shard(predictor, block_name, n_rows, start, stop):
+    """Process-pool task: attach to the shared block and score one row range"""
+    block = _attach_shared_block(block_name)
+    try:
+        views = _shared_block_views(block.buf, n_rows)
+        scored = _score_code_shard(predictor, *views, start, stop)
+        # Views must be released before the block can be closed
+        del views
+        return scored
+    finally:
+        block.close()
+
+
+def _count_quotes(handle, n_bytes, block_bytes=1024 ** 2):
+    """Quote characters in the next n_bytes of a binary file, read block by block"""
+    count = 0
+    while n_bytes > 0:
+        block = handle.read(min(block_bytes, n_bytes))
+        if not block:
+            break
+        count += block.count(b'"')
+        n_bytes -= len(block)
+    return count
+
+
+def _csv_shards(path, shard_bytes):
+    """
+    Header line and row-aligned (start, end) byte ranges covering a CSV body
+
+    A range ends at the first newline past shard_bytes that lies outside any
+    quoted field. Quotes are counted from the range start (an escaped "" counts
+    twice), so a quoted field holding a newline is never split across ranges.
+    """
+    ranges = []
+    with open(path, 'rb') as handle:
+        header = handle.readline()
+        while header.count(b'"') % 2:
+            line = handle.readline()
+            if not line:
+                break
+            header += line
+        size = os.fstat(handle.fileno()).st_size
+        start = handle.tell()
+        while start < size:
+            quotes = _count_quotes(handle, min(start + shard_bytes, size) - start)
+            quotes += handle.readline().count(b'"')
+            while quotes % 2:
+                line = handle.readline()
+                if not line:
+                    break
+                quotes += line.count(b'"')
+            end = handle.tell()
+            ranges.append((start, end))
+            start = end
+    return header, ranges
+
+
+def _score_csv_shard(predictor, path, columns, start, end, part_path, accumulator=None,
+                     label_column=None, interval_level=None, explain=None):
+    """
+    Pool task: parse one byte range of a CSV, score it and write a headerless part file
+
+    Returns the row count and the accumulator (if any) updated with the shard's results.
+    """
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        data = handle.read(end - start)
+    chunk = pd.read_csv(io.BytesIO(data), header=None, names=columns, dtype=CSV_DTYPES)
+    with open(part_path, 'w', newline='', encoding='utf-8') as output:
+        score_chunk(predictor, chunk, accumulator, label_column, interval_level, explain).to_csv(
+            output, header=False, index=False
+        )
+    return len(chunk), accumulator
+
+
+def _fresh_copy(accumulator):
+    """Empty accumulator with the same settings (None stays None)"""
+    if accumulator is None:
+        return None
+    return type(accumulator)(n_bins=accumulator.n_bins, threshold=accumulator.threshold)
+
+
+class ParallelScorer:
+    """
+    Sharded multi-core scoring with results in original row order
+
+    Keeps its worker pool alive between calls; use as a context manager or call
+    close() when done.
+    """
+
+    def __init__(self, predictor=None, n_workers=None, backend='process',
+                 shard_rows=DEFAULT_SHARD_ROWS, shard_bytes=DEFAULT_SHARD_BYTES):
+        """
+        Parameters:
+        predictor (LiteratureBasedMalignancyPredictor, optional): Model to use
+        n_workers (int, optional): Worker count (default: os.cpu_count())
+        backend (str): 'process' for a process pool, 'thread' for a thread pool
+            (NumPy releases the GIL in the encoding and scoring kernels)
+        shard_rows (int): Rows per DataFrame shard
+        shard_bytes (int): Bytes per CSV shard
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {BACKENDS}, got {backend!r}")
+        self.predictor = predictor if predictor is not None else LiteratureBasedMalignancyPredictor()
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.backend = backend
+        self.shard_rows = shard_rows
+        self.shard_bytes = shard_bytes
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def pool(self):
+        """Worker pool, started on first use"""
+        if self._pool is None:
+            if self.backend == 'process':
+                # Workers must share the parent's resource tracker (see _attach_shared_block)
+                resource_tracker.ensure_running()
+                self._pool = ProcessPoolExecutor(max_workers=self.n_workers)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.n_workers)
+        return self._pool
+
+    def close(self):
+        """Shut down the worker pool"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _row_shards(self, n_rows):
+        """(start, stop) row ranges; at least one shard per worker when possible"""
+        shard_rows = max(1, min(self.shard_rows, -(-n_rows // self.n_workers)))
+        return [(start, min(start + shard_rows, n_rows)) for start in range(0, n_rows, shard_rows)]
+
+    def predict_risk_category_columnar(self, X):
+        """
+        Score a DataFrame in parallel
+
+        Parameters:
+        X (pd.DataFrame): Input features
+
+        Returns:
+        RiskCategoryResult: Probabilities and risk codes in the original row order
+        """
+        n_rows = len(X)
+        if n_rows == 0:
+            return self.predictor.predict_risk_category_columnar(X)
+
+        # Scoring in the workers uses the parent's current coefficients
+        self.predictor._ensure_compiled()
+        encoder = self.predictor.encoder
+        shards = self._row_shards(n_rows)
+
+        if self.backend == 'thread':
+            ages = encoder.ages(X)
+            codes = np.stack(list(encoder.codes(X).values()))
+            probabilities = np.empty(n_rows, dtype=np.float64)
+            risk_codes = np.empty(n_rows, dtype=np.uint8)
+            futures = [
+                self.pool.submit(_score_code_shard, self.predictor, ages, codes,
+                                 probabilities, risk_codes, start, stop)
+                for start, stop in shards
+            ]
+            for future in futures:
+                future.result()
+            return RiskCategoryResult(probabilities, risk_codes)
+
+        block = shared_memory.SharedMemory(create=True, size=_shared_block_size(n_rows))
+        try:
+            ages, codes, probabilities, risk_codes = _shared_block_views(block.buf, n_rows)
+            ages[:] = encoder.ages(X)
+            for position, column_codes in enumerate(encoder.codes(X).values()):
+                codes[position] = column_codes
+
+            futures = [
+                self.pool.submit(_score_shared_shard, self.predictor, block.name,
+                                 n_rows, start, stop)
+                for start, stop in shards
+            ]
+            for future in futures:
+                future.result()
+
+            result = RiskCategoryResult(probabilities.copy(), risk_codes.copy())
+            del ages, codes, probabilities, risk_codes
+        finally:
+            block.close()
+            block.unlink()
+
+        # Worker copies of the predictor do not log; record the batch here
+        self.predictor._audit(X, result.probabilities, result.codes)
+        return result
+
+    def predict_proba(self, X):
+        """Malignancy probabilities for a DataFrame, scored in parallel"""
+        return self.predict_risk_category_columnar(X).probabilities
+
+    def score_csv(self, input_path, output_path, accumulator=None, label_column=None,
+                  interval_level=None, explain=None):
+        """
+        Score a CSV file into an output CSV using all workers
+
+        Produces the same file as batch_scoring.score_csv: input columns plus
+        malignancy_probability, risk_category and recommendation, in input order.
+        With an accumulator, every shard fills a fresh copy (same settings) and
+        the copies are merged into it in shard order. With interval_level, the
+        delta-method bounds (INTERVAL_COLUMNS) are appended as well, and with
+        explain the contribution or top-k driver columns (see explanation.py).
+
+        Returns:
+        dict: rows, chunks, seconds, rows_per_second and peak_rss_mb
+        """
+        if self.backend == 'process' and self.predictor.audit_logger is not None:
+            raise ValueError("Audit logging of CSV shards requires backend='thread'")
+
+        start_time = time.perf_counter()
+        header, ranges = _csv_shards(input_path, self.shard_bytes)
+        columns = pd.read_csv(io.BytesIO(header), nrows=0).columns.tolist()
+        result_columns = RESULT_COLUMNS + (INTERVAL_COLUMNS if interval_level is not None else [])
+        if explain is not None:
+            result_columns = result_columns + explanation_column_names(explain)
+        output_columns = columns + [column for column in result_columns if column not in columns]
+
+        part_dir = tempfile.mkdtemp(
+            prefix='salivai-parts-', dir=os.path.dirname(os.path.abspath(output_path))
+        )
+        try:
+            part_paths = [os.path.join(part_dir, f'part-{index:06d}.csv') for index in range(len(ranges))]
+            futures = [
+                self.pool.submit(_score_csv_shard, self.predictor, input_path, columns,
+                                 start, end, part_path, _fresh_copy(accumulator), label_column,
+                                 interval_level, explain)
+                for (start, end), part_path in zip(ranges, part_paths)
+            ]
+            n_rows = 0
+            for future in futures:
+                shard_rows, shard_accumulator = future.result()
+                n_rows += shard_rows
+                if accumulator is not None:
+                    accumulator.merge(shard_accumulator)
+
+            with open(output_path, 'w', newline='', encoding='utf-8') as output:
+                pd.DataFrame(columns=output_columns).to_csv(output, index=False)
+                for part_path in part_paths:
+                    with open(part_path, 'r', newline='', encoding='utf-8') as part:
+                        shutil.copyfileobj(part, output)
+        finally:
+            shutil.rmtree(part_dir, ignore_errors=True)
+
+        seconds = time.perf_counter() - start_time
+        return {
+            'rows': n_rows,
+            'chunks': len(ranges),
+            'seconds': seconds,
+            'rows_per_second': n_rows / seconds if seconds > 0 else float('inf'),
+            'peak_rss_mb': peak_rss_mb()
+        }
@@ -0,0 +1,295 @@
+"""
+SalivAI - Local Recalibration
+Refits the literature model to a local labelled cohort, out of core
+
+Three modes, all warm-started from the current coefficients:
+- 'intercept': calibration-in-the-large, logit = a + lp (lp = literature log-odds)
+- 'slope': logistic recalibration, logit = a + b * lp
+- 'full': all ten coefficients (intercept plus the nine features)
+
+Fitting uses Newton/IRLS steps. Each pass streams the cohort chunk by chunk
+and accumulates only the gradient, the (at most 10 x 10) Hessian and the
+deviance, so memory is bounded by one chunk whatever the cohort size.
+A chunk source is a zero-argument callable returning a fresh iterator of
+(design matrix, outcomes) pairs; every call starts a new pass.
+
+Usage:
+    from recalibration import csv_chunks, recalibrate
+
+    result = recalibrate(csv_chunks('registry.csv', 'outcome'), mode='slope')
+    predictor.literature_coefficients = result.coefficients
+
+    python recalibration.py registry.csv coefficients.json --label-column outcome --mode full
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from batch_scoring import DEFAULT_CHUNKSIZE, iter_csv_chunks
+from salivary_gland_malignancy_predictor import FeatureEncoder
+from scoring_core import (
+    FEATURE_NAMES,
+    LITERATURE_COEFFICIENTS,
+    build_design_matrix,
+    compile_coefficients,
+    empty_design_matrix,
+    stable_sigmoid
+)
+
+MODES = ('intercept', 'slope', 'full')
+
+# Names of the fitted parameters per mode
+PARAMETER_NAMES = {
+    'intercept': ['calibration_intercept'],
+    'slope': ['calibration_intercept', 'calibration_slope'],
+    'full': ['intercept'] + FEATURE_NAMES
+}
+
+
+class RecalibrationResult:
+    """
+    Fitted coefficients with convergence diagnostics
+
+    Attributes:
+    coefficients (dict): New coefficient set (same keys as LITERATURE_COEFFICIENTS)
+    mode (str): 'intercept', 'slope' or 'full'
+    parameters (dict): Fitted parameters (PARAMETER_NAMES[mode]) with their
+        standard errors in `standard_errors`
+    converged (bool): Relative deviance change fell below the tolerance
+    n_iter (int): Passes over the data
+    deviance_history (list): Deviance at each pass (the first is the starting model's)
+    n_rows (int): Patients with a known outcome
+    seconds (float): Fit time
+    """
+
+    def __init__(self, coefficients, mode, parameters, standard_errors, converged, n_iter,
+                 deviance_history, n_rows, seconds):
+        self.coefficients = coefficients
+        self.mode = mode
+        self.parameters = parameters
+        self.standard_errors = standard_errors
+        self.converged = converged
+        self.n_iter = n_iter
+        self.deviance_history = deviance_history
+        self.n_rows = n_rows
+        self.seconds = seconds
+
+    def diagnostics(self):
+        """Convergence diagnostics as a JSON-serializable dict"""
+        return {
+            'mode': self.mode,
+            'parameters': self.parameters,
+            'standard_errors': self.standard_errors,
+            'converged': self.converged,
+            'n_iter': self.n_iter,
+            'deviance_history': self.deviance_history,
+            'n_rows': self.n_rows,
+            'seconds': self.seconds
+        }
+
+    def save(self, path):
+        """Write the coefficients and diagnostics as JSON"""
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump({'coefficients': self.coefficients, 'diagnostics': self.diagnostics()},
+                      handle, indent=2)
+
+
+def frame_chunks(X, y_true, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Chunk source over an in-memory DataFrame and outcomes
+
+    The frame is encoded once into ages and int8 category codes (14 bytes per
+    patient); each pass only expands one chunk at a time into a design matrix.
+    """
+    ages, codes = FeatureEncoder.ages(X), FeatureEncoder.codes(X)
+    y_true = np.asarray(y_true, dtype=np.float64)
+    buffer = empty_design_matrix(min(chunksize, len(ages)))
+
+    def chunks():
+        for start in range(0, len(ages), chunksize):
+            stop = min(start + chunksize, len(ages))
+            chunk_codes = {column: values[start:stop] for column, values in codes.items()}
+            design = build_design_matrix(ages[start:stop], chunk_codes, out=buffer[:stop - start])
+            yield design, y_true[start:stop]
+    return chunks
+
+
+def csv_chunks(path, label_column, chunksize=DEFAULT_CHUNKSIZE):
+    """Chunk source re-reading a patient CSV with an outcome column on every pass"""
+    encoder = FeatureEncoder()
+
+    def chunks():
+        for chunk in iter_csv_chunks(path, chunksize):
+            labels = chunk[label_column].to_numpy(dtype=np.float64, na_value=np.nan)
+            yield encoder.encode(chunk, reuse_buffer=True), labels
+    return chunks
+
+
+def parquet_chunks(path, label_column, batch_size=DEFAULT_CHUNKSIZE):
+    """Chunk source streaming a Parquet file (requires pyarrow) on every pass"""
+    from arrow_io import arrow_float64, arrow_inputs, iter_parquet_batches
+
+    def chunks():
+        for batch in iter_parquet_batches(path, batch_size):
+            labels = arrow_float64(batch.column(label_column))
+            yield build_design_matrix(*arrow_inputs(batch)), labels
+    return chunks
+
+
+def _mode_columns(design, intercept, weights, mode):
+    """Offset and regressor matrix Z of one chunk, so that logit = offset + Z @ theta"""
+    n_rows = design.shape[0]
+    if mode == 'full':
+        Z = np.empty((n_rows, len(FEATURE_NAMES) + 1))
+        Z[:, 0] = 1.0
+        Z[:, 1:] = design
+        return 0.0, Z
+
+    linear_predictor = np.dot(design, weights)
+    linear_predictor += intercept
+    if mode == 'intercept':
+        return linear_predictor, np.ones((n_rows, 1))
+    Z = np.empty((n_rows, 2))
+    Z[:, 0] = 1.0
+    Z[:, 1] = linear_predictor
+    return 0.0, Z
+
+
+def _accumulate(source, theta, intercept, weights, mode):
+    """One pass: gradient, Hessian and deviance of the log-likelihood at theta"""
+    n_parameters = len(theta)
+    gradient = np.zeros(n_parameters)
+    hessian = np.zeros((n_parameters, n_parameters))
+    deviance = 0.0
+    n_rows = 0
+
+    for design, y_true in source():
+        y_true = np.asarray(y_true, dtype=np.float64)
+        known = ~np.isnan(y_true)
+        if not known.all():
+            design, y_true = design[known], y_true[known]
+        if len(y_true) == 0:
+            continue
+
+        offset, Z = _mode_columns(design, intercept, weights, mode)
+        logits = np.dot(Z, theta)
+        logits += offset
+        probabilities = stable_sigmoid(logits, out=np.empty_like(logits))
+
+        gradient += np.dot(Z.T, y_true - probabilities)
+        hessian += np.dot(Z.T * (probabilities * (1.0 - probabilities)), Z)
+        deviance += 2.0 * float(np.sum(np.logaddexp(0.0, logits) - y_true * logits))
+        n_rows += len(y_true)
+    return gradient, hessian, deviance, n_rows
+
+
+def recalibrate(source, mode='intercept', coefficients=LITERATURE_COEFFICIENTS, max_iter=25,
+                tol=1e-8, ridge=0.0):
+    """
+    Recalibrate or refit coefficients on a labelled cohort streamed in chunks
+
+    Parameters:
+    source (callable): Returns a new iterator of (design matrix, outcomes)
+        chunks on every call (see frame_chunks, csv_chunks, parquet_chunks);
+        NaN outcomes are skipped
+    mode (str): 'intercept', 'slope' or 'full'
+    coefficients (dict): Starting coefficients (default: the literature values)
+    max_iter (int): Maximum Newton passes
+    tol (float): Convergence threshold on the relative deviance change
+    ridge (float): Penalty shrinking the parameters toward their starting
+        values; helps when a category is absent from the local cohort
+
+    Returns:
+    RecalibrationResult: New coefficients and convergence diagnostics
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+
+    start_time = time.perf_counter()
+    intercept, weights = compile_coefficients(coefficients)
+    if mode == 'full':
+        start = np.concatenate([[intercept], weights])
+    else:
+        start = np.array([0.0] if mode == 'intercept' else [0.0, 1.0])
+    theta = start.copy()
+
+    history = []
+    converged = False
+    for _ in range(max_iter):
+        gradient, hessian, deviance, n_rows = _accumulate(source, theta, intercept, weights, mode)
+        if n_rows == 0:
+            raise ValueError("No patients with a known outcome in the data")
+        if history and abs(deviance - history[-1]) / (abs(deviance) + 0.1) < tol:
+            history.append(deviance)
+            converged = True
+            break
+        history.append(deviance)
+
+        gradient -= ridge * (theta - start)
+        try:
+            theta = theta + np.linalg.solve(hessian + ridge * np.eye(len(theta)), gradient)
+        except np.linalg.LinAlgError:
+            raise ValueError(
+                f"Singular Hessian in mode {mode!r}: a feature does not vary in the local "
+                "cohort; use ridge > 0 or a simpler mode"
+            ) from None
+
+    standard_errors = np.sqrt(np.diag(np.linalg.inv(hessian + ridge * np.eye(len(theta)))))
+
+    if mode == 'full':
+        new_intercept, new_weights = theta[0], theta[1:]
+    elif mode == 'intercept':
+        new_intercept, new_weights = intercept + theta[0], weights
+    else:
+        new_intercept, new_weights = theta[0] + theta[1] * intercept, theta[1] * weights
+
+    names = PARAMETER_NAMES[mode]
+    return RecalibrationResult(
+        coefficients={'intercept': float(new_intercept),
+                      **{name: float(value) for name, value in zip(FEATURE_NAMES, new_weights)}},
+        mode=mode,
+        parameters={name: float(value) for name, value in zip(names, theta)},
+        standard_errors={name: float(value) for name, value in zip(names, standard_errors)},
+        converged=converged,
+        n_iter=len(history),
+        deviance_history=history,
+        n_rows=n_rows,
+        seconds=time.perf_counter() - start_time
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Recalibrate the literature model on a labelled local cohort"
+    )
+    parser.add_argument('input', help="CSV (or .parquet) with the predictor columns and outcomes")
+    parser.add_argument('output', help="JSON file for the new coefficients and diagnostics")
+    parser.add_argument('--label-column', required=True, help="Outcome column (1 = malignant)")
+    parser.add_argument('--mode', choices=MODES, default='intercept', help="What to refit")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help=f"Rows per chunk (default: {DEFAULT_CHUNKSIZE:,})")
+    parser.add_argument('--ridge', type=float, default=0.0,
+                        help="Shrinkage toward the literature values (default: 0)")
+    args = parser.parse_args(argv)
+
+    if args.input.endswith('.parquet'):
+        source = parquet_chunks(args.input, args.label_column, args.chunksize)
+    else:
+        source = csv_chunks(args.input, args.label_column, args.chunksize)
+    result = recalibrate(source, mode=args.mode, ridge=args.ridge)
+    result.save(args.output)
+
+    status = "converged" if result.converged else "did NOT converge"
+    print(f"Mode {result.mode}: {status} after {result.n_iter} passes over "
+          f"{result.n_rows:,} patients ({result.seconds:.2f}s)")
+    print(f"Deviance: {result.deviance_history[0]:.1f} -> {result.deviance_history[-1]:.1f}")
+    for name, value in result.parameters.items():
+        print(f"  {name:<24} {value:8.4f} (SE {result.standard_errors[name]:.4f})")
+    print(f"Coefficients saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+SalivAI - Streaming Report Accumulator
+Builds generate_report-style summaries chunk by chunk, in constant memory
+
+Each scored chunk updates running statistics: count/mean/variance (merged
+with Chan et al.'s parallel form of Welford's algorithm), extrema, risk
+category counts, a fixed-bin probability histogram and, when outcomes are
+known, confusion counts and per-class histograms. Accumulators from different
+chunks, workers or files merge into the same result as scoring everything
+in one pass. Counts and histograms match exactly; mean and variance agree to
+floating-point rounding.
+
+Usage:
+    from report_accumulator import ReportAccumulator
+
+    accumulator = ReportAccumulator()
+    for chunk in chunks:
+        accumulator.update(predictor.predict_risk_category_columnar(chunk), chunk['outcome'])
+    report = accumulator.report(predictor)
+"""
+
+import numpy as np
+
+from salivary_gland_malignancy_predictor import LiteratureBasedMalignancyPredictor
+from scoring_core import RISK_CATEGORIES
+
+# Histogram resolution over [0, 1]; also bounds the AUC approximation error
+DEFAULT_N_BINS = 1000
+
+
+class ReportAccumulator:
+    """
+    Mergeable running summary of scored patients
+
+    The AUC in the report is computed from the per-class histograms (scores
+    sharing a bin count as ties), so it approximates the exact AUC of
+    generate_report to within the share of positive/negative pairs falling in
+    the same bin.
+    """
+
+    def __init__(self, n_bins=DEFAULT_N_BINS, threshold=0.5):
+        """
+        Parameters:
+        n_bins (int): Equal-width probability bins over [0, 1]
+        threshold (float): Classification cut-off for the confusion counts
+            (generate_report uses 0.5)
+        """
+        self.n_bins = n_bins
+        self.threshold = threshold
+
+        self.n_rows = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.risk_counts = np.zeros(len(RISK_CATEGORIES), dtype=np.int64)
+        self.histogram = np.zeros(n_bins, dtype=np.int64)
+
+        # Rows with a known outcome only
+        self.positive_histogram = np.zeros(n_bins, dtype=np.int64)
+        self.negative_histogram = np.zeros(n_bins, dtype=np.int64)
+        self.confusion = {'tp': 0, 'fp': 0, 'tn': 0, 'fn': 0}
+
+    def __len__(self):
+        return self.n_rows
+
+    @property
+    def bin_edges(self):
+        """Edges of the probability histogram bins"""
+        return np.linspace(0, 1, self.n_bins + 1)
+
+    @property
+    def n_labelled(self):
+        """Number of patients with a known outcome"""
+        return sum(self.confusion.values())
+
+    @property
+    def variance(self):
+        """Population variance of the probabilities (ddof=0, as np.std)"""
+        return self._m2 / self.n_rows if self.n_rows else np.nan
+
+    @property
+    def std(self):
+        return float(np.sqrt(self.variance))
+
+    def _bins(self, probabilities):
+        """Histogram bin of each probability (1.0 falls in the last bin)"""
+        bins = (probabilities * self.n_bins).astype(np.intp)
+        return np.clip(bins, 0, self.n_bins - 1, out=bins)
+
+    def _combine_moments(self, n_rows, mean, m2):
+        """Fold another group's count, mean and sum of squared deviations into this one"""
+        total = self.n_rows + n_rows
+        delta = mean - self.mean
+        self.mean += delta * n_rows / total
+        self._m2 += m2 + delta * delta * self.n_rows * n_rows / total
+        self.n_rows = total
+
+    def update(self, result, y_true=None):
+        """
+        Add one scored chunk
+
+        Parameters:
+        result (RiskCategoryResult): Probabilities and risk codes of the chunk
+        y_true (array-like, optional): Outcomes (non-zero = malignant); NaN
+            marks rows whose outcome is not known yet
+
+        Returns:
+        ReportAccumulator: self
+        """
+        probabilities = np.asarray(result.probabilities, dtype=np.float64)
+        if len(probabilities) == 0:
+            return self
+
+        chunk_mean = probabilities.mean()
+        deviations = probabilities - chunk_mean
+        self._combine_moments(len(probabilities), chunk_mean, float(np.dot(deviations, deviations)))
+        self.min = min(self.min, probabilities.min())
+        self.max = max(self.max, probabilities.max())
+
+        self.risk_counts += np.bincount(result.codes, minlength=len(RISK_CATEGORIES))
+        bins = self._bins(probabilities)
+        self.histogram += np.bincount(bins, minlength=self.n_bins)
+
+        if y_true is not None:
+            labels = np.asarray(y_true, dtype=np.float64)
+            # Same rule as validation_metrics.known_outcomes: NaN is unknown,
+            # any other non-zero label is malignant
+            benign = labels == 0
+            malignant = ~np.isnan(labels) & ~benign
+            called_positive = probabilities >= self.threshold
+
+            self.positive_histogram += np.bincount(bins[malignant], minlength=self.n_bins)
+            self.negative_histogram += np.bincount(bins[benign], minlength=self.n_bins)
+            self.confusion['tp'] += int(np.count_nonzero(malignant & called_positive))
+            self.confusion['fn'] += int(np.count_nonzero(malignant & ~called_positive))
+            self.confusion['fp'] += int(np.count_nonzero(benign & called_positive))
+            self.confusion['tn'] += int(np.count_nonzero(benign & ~called_positive))
+        return self
+
+    def merge(self, other):
+        """
+        Fold another accumulator (e.g. from another worker or file) into this one
+
+        Returns:
+        ReportAccumulator: self
+        """
+        if (other.n_bins, other.threshold) != (self.n_bins, self.threshold):
+            raise ValueError("Cannot merge accumulators with different n_bins or threshold")
+        if other.n_rows == 0:
+            return self
+
+        self._combine_moments(other.n_rows, other.mean, other._m2)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.risk_counts += other.risk_counts
+        self.histogram += other.histogram
+        self.positive_histogram += other.positive_histogram
+        self.negative_histogram += other.negative_histogram
+        for key, count in other.confusion.items():
+            self.confusion[key] += count
+        return self
+
+    def auc(self):
+        """ROC AUC from the per-class histograms (same-bin pairs count one half)"""
+        n_positive = self.positive_histogram.sum()
+        n_negative = self.negative_histogram.sum()
+        if n_positive == 0 or n_negative == 0:
+            raise ValueError("Only one class present in y_true; ROC analysis is not defined")
+        negatives_below = np.cumsum(self.negative_histogram) - self.negative_histogram
+        wins = np.dot(self.positive_histogram, negatives_below + 0.5 * self.negative_histogram)
+        return float(wins / (n_positive * n_negative))
+
+    def risk_distribution(self):
+        """Patients per risk category (categories with no patients omitted)"""
+        return {
+            risk['risk_category']: int(count)
+            for risk, count in zip(RISK_CATEGORIES, self.risk_counts) if count > 0
+        }
+
+    def performance_metrics(self):
+        """Metrics at `threshold` over the patients with known outcomes"""
+        tp, fp = self.confusion['tp'], self.confusion['fp']
+        tn, fn = self.confusion['tn'], self.confusion['fn']
+        return {
+            'auc': self.auc(),
+            'sensitivity': tp / (tp + fn) if (tp + fn) > 0 else 0,
+            'specificity': tn / (tn + fp) if (tn + fp) > 0 else 0,
+            'ppv': tp / (tp + fp) if (tp + fp) > 0 else 0,
+            'npv': tn / (tn + fn) if (tn + fn) > 0 else 0,
+            'accuracy': (tp + tn) / (tp + tn + fp + fn)
+        }
+
+    def report(self, predictor=None):
+        """
+        Report in the format of LiteratureBasedMalignancyPredictor.generate_report
+
+        Parameters:
+        predictor (LiteratureBasedMalignancyPredictor, optional): Source of
+            model_info and feature_importance (default: the literature model)
+
+        Returns:
+        dict: model_info, predictions, risk_distribution, feature_importance and,
+            if any outcomes were seen, performance_metrics
+        """
+        if predictor is None:
+            predictor = LiteratureBasedMalignancyPredictor()
+
+        report = {
+            'model_info': predictor.get_model_explanation(),
+            'predictions': {
+                'mean_probability': float(self.mean) if self.n_rows else np.nan,
+                'std_probability': self.std,
+                'min_probability': float(self.min) if self.n_rows else np.nan,
+                'max_probability': float(self.max) if self.n_rows else np.nan
+            },
+            'risk_distribution': self.risk_distribution(),
+            'feature_importance': predictor.get_feature_importance()
+        }
+        if self.n_labelled:
+            report['performance_metrics'] = self.performance_metrics()
+        return report
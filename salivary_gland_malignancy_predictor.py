@@ -5,11 +5,252 @@ Honest Implementation Using Only Validated Literature Coefficients
 This version focuses on the evidence-based foundation without synthetic ML training.
 """
 
+import threading
+import time
+
 import numpy as np
 import pandas as pd
-from sklearn.metrics import roc_auc_score, confusion_matrix
-import warnings
-warnings.filterwarnings('ignore')
+
+from scoring_core import (
+    CATEGORY_LEVELS,
+    FEATURE_NAMES,
+    LITERATURE_COEFFICIENTS,
+    LITERATURE_ODDS_RATIO_CIS,
+    LOOKUP_AGE_RANGE,
+    LOOKUP_N_AGES,
+    N_PROFILES,
+    RISK_CATEGORIES,
+    RISK_THRESHOLDS,
+    bin_risk_categories,
+    build_design_matrix,
+    coefficient_covariance,
+    coefficient_standard_errors,
+    compile_coefficients,
+    decode_profile_codes,
+    empty_design_matrix,
+    linear_predictor,
+    model_fingerprint,
+    profile_codes,
+    score_design_matrix,
+    stable_sigmoid,
+    unique_profiles,
+    write_indicators
+)
+from bootstrap_validation import DEFAULT_N_RESAMPLES, bootstrap_validation
+from explanation import explain_design_matrix
+from packed_profiles import PackedScorer, pack, unpack
+from uncertainty import (
+    DEFAULT_MAX_BLOCK_BYTES,
+    DEFAULT_N_SAMPLES,
+    INTERVAL_METHODS,
+    delta_method_interval,
+    monte_carlo_interval
+)
+from validation_metrics import ROCAnalysis
+
+# Fixed categorical dtypes so every input column maps to the same integer codes
+CATEGORY_DTYPES = {
+    column: pd.CategoricalDtype(levels) for column, levels in CATEGORY_LEVELS.items()
+}
+
+
+def _category_codes(values, column):
+    """
+    Map a categorical column to int8 codes (index into CATEGORY_LEVELS)
+    
+    Unknown and missing values fall back to the reference category (code 0),
+    matching the one-hot encoding where no indicator is set.
+    """
+    levels = CATEGORY_DTYPES[column].categories
+    dtype = getattr(values, 'dtype', None)
+    
+    if isinstance(dtype, pd.CategoricalDtype):
+        # Already categorical: recode its (few) categories, no pass over strings
+        codes = pd.Categorical(values).codes
+        recode = levels.get_indexer(dtype.categories)
+    elif isinstance(dtype, pd.StringDtype):
+        # Arrow/pandas string arrays compare vectorized, cheaper than hashing
+        codes = np.zeros(len(values), dtype=np.int8)
+        for code, level in enumerate(levels[1:], start=1):
+            matches = np.asarray(values == level, dtype=bool).view(np.int8)
+            codes += matches if code == 1 else matches * np.int8(code)
+        return codes
+    else:
+        # Object columns: one hash pass, then map the few distinct values
+        codes, uniques = pd.factorize(values, sort=False)
+        recode = levels.get_indexer(uniques)
+    
+    # Trailing 0 catches the -1 missing-value sentinel
+    recode = np.append(np.maximum(recode, 0), 0).astype(np.int8)
+    return recode[codes]
+
+
+class FeatureEncoder:
+    """
+    Integer-coded categorical encoder
+    
+    Maps each categorical column to small integer codes against the fixed
+    CATEGORY_DTYPES vocabularies (no copy of the input frame, no per-indicator
+    string comparisons on object columns) and writes the one-hot design matrix
+    straight into an output buffer. Unknown values are encoded as the
+    reference category.
+    """
+    
+    def __init__(self, dtype=np.float64):
+        """
+        Parameters:
+        dtype: Floating dtype of the design matrix (float64 or float32)
+        """
+        self.dtype = np.dtype(dtype)
+        self._local = threading.local()
+    
+    def __getstate__(self):
+        # Reusable buffers are per thread and per process; never pickle them
+        return {'dtype': self.dtype}
+    
+    def __setstate__(self, state):
+        self.dtype = state['dtype']
+        self._local = threading.local()
+    
+    @staticmethod
+    def ages(X):
+        """Age column as float64 (missing values become NaN)"""
+        return X['age'].to_numpy(dtype=np.float64, na_value=np.nan)
+    
+    @staticmethod
+    def codes(X):
+        """Integer category codes for every categorical column"""
+        return {column: _category_codes(X[column], column) for column in CATEGORY_LEVELS}
+    
+    def indicators(self, X, out=None):
+        """uint8 one-hot indicators (FEATURE_NAMES[1:] order), without the age column"""
+        if out is None:
+            out = np.empty((len(X), len(FEATURE_NAMES) - 1), dtype=np.uint8, order='F')
+        return write_indicators(self.codes(X), out)
+    
+    def encode(self, X, out=None, reuse_buffer=False):
+        """
+        Encode a patient DataFrame into the design matrix
+        
+        Parameters:
+        X (pd.DataFrame): Input features
+        out (np.array, optional): Buffer of shape (len(X), 9) to write into
+        reuse_buffer (bool): Write into a per-thread buffer kept between calls;
+            the result is only valid until the next reusing call in this thread
+        
+        Returns:
+        np.array: Design matrix in FEATURE_NAMES order
+        """
+        if out is None:
+            if reuse_buffer:
+                out = self.design_buffer(len(X))
+            else:
+                out = empty_design_matrix(len(X), self.dtype)
+        return build_design_matrix(self.ages(X), self.codes(X), out=out)
+    
+    def design_buffer(self, n_rows):
+        """
+        Per-thread reusable (n_rows, 9) design-matrix buffer, grown on demand
+        
+        As with encode(reuse_buffer=True), the contents are only valid until
+        the next reusing call in this thread.
+        """
+        n_values = n_rows * len(FEATURE_NAMES)
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None or buffer.size < n_values:
+            buffer = np.empty(n_values, dtype=self.dtype)
+            self._local.buffer = buffer
+        # Column-major view over the front of the flat buffer
+        return buffer[:n_values].reshape(len(FEATURE_NAMES), n_rows).T
+    
+    def release_buffer(self):
+        """Free this thread's reusable buffer (e.g. after a very large batch)"""
+        self._local.buffer = None
+
+
+class RiskCategoryResult:
+    """
+    Columnar risk stratification for a batch of patients
+    
+    Holds the probabilities and one uint8 category code per patient; the
+    category, recommendation and expected malignancy rate strings live once in
+    small lookup arrays indexed by those codes.
+    """
+    
+    categories = np.array([risk['risk_category'] for risk in RISK_CATEGORIES], dtype=object)
+    recommendations = np.array([risk['recommendation'] for risk in RISK_CATEGORIES], dtype=object)
+    expected_malignancy_rates = np.array(
+        [risk['expected_malignancy_rate'] for risk in RISK_CATEGORIES], dtype=object
+    )
+    
+    def __init__(self, probabilities, codes, n_unique=None):
+        self.probabilities = probabilities
+        self.codes = codes
+        self.n_unique = n_unique
+    
+    @classmethod
+    def from_unique(cls, unique, inverse, out=None):
+        """
+        Result of every row scattered from the result of its distinct rows
+        
+        Parameters:
+        unique (RiskCategoryResult): Result of the distinct rows
+        inverse (np.array): Distinct-row index of every row (see unique_profiles)
+        out (np.array, optional): float64 buffer receiving the probabilities
+        """
+        return cls(np.take(unique.probabilities, inverse, out=out), unique.codes[inverse],
+                   n_unique=len(unique))
+    
+    def __len__(self):
+        return len(self.codes)
+    
+    @property
+    def compression_ratio(self):
+        """Rows per distinct (age, profile) pair scored, or None if rows were not deduplicated"""
+        if self.n_unique is None:
+            return None
+        return len(self) / max(self.n_unique, 1)
+    
+    def counts(self):
+        """Number of patients per risk category (categories with no patients omitted)"""
+        counts = np.bincount(self.codes, minlength=len(RISK_CATEGORIES))
+        return {
+            category: int(count)
+            for category, count in zip(self.categories, counts) if count > 0
+        }
+    
+    def to_categorical(self, field='risk_category'):
+        """
+        Codes as a pandas Categorical without materializing per-row strings
+        
+        Parameters:
+        field (str): 'risk_category', 'recommendation' or 'expected_malignancy_rate'
+        """
+        labels = [risk[field] for risk in RISK_CATEGORIES]
+        return pd.Categorical.from_codes(self.codes, categories=labels)
+    
+    def to_records(self):
+        """Record array with one (probability, risk_code) row per patient"""
+        return np.rec.fromarrays(
+            [self.probabilities, self.codes], names=['probability', 'risk_code']
+        )
+    
+    def to_frame(self):
+        """DataFrame of probability plus categorical category/recommendation/rate columns"""
+        return pd.DataFrame({
+            'probability': self.probabilities,
+            'risk_category': self.to_categorical('risk_category'),
+            'recommendation': self.to_categorical('recommendation'),
+            'expected_malignancy_rate': self.to_categorical('expected_malignancy_rate')
+        })
+    
+    def to_list(self):
+        """Legacy list of per-patient dicts (as returned by predict_risk_category)"""
+        return [
+            {'probability': prob, **RISK_CATEGORIES[code]}
+            for prob, code in zip(self.probabilities, self.codes.tolist())
+        ]
+
 
 class LiteratureBasedMalignancyPredictor:
     """
@@ -17,28 +258,38 @@ class LiteratureBasedMalignancyPredictor:
     Uses only validated coefficients from peer-reviewed studies
     """
     
-    def __init__(self):
-        """Initialize with literature-derived parameters"""
+    def __init__(self, use_lookup_table=False, audit_logger=None, coefficients=None,
+                 risk_thresholds=None, odds_ratio_confidence_intervals=None,
+                 model_name='literature', profiler=None):
+        """
+        Initialize with literature-derived parameters
+        
+        Parameters:
+        use_lookup_table (bool): Answer predictions for integer ages 18-90 from a
+            precomputed table of every possible patient instead of arithmetic
+        audit_logger (AuditLogger, optional): Records every prediction (see audit_log.py)
+        coefficients (dict, optional): Coefficient set replacing the literature
+            values (e.g. a recalibrated set from coefficient_registry.py)
+        risk_thresholds (dict, optional): 'low' and 'intermediate' cut-points
+        odds_ratio_confidence_intervals (dict, optional): 95% CIs of the odds ratios
+        model_name (str): Prefix of model_version
+        profiler (StageProfiler, optional): Records per-stage timings (see stage_profiler.py)
+        """
         
         # Validated literature coefficients (from references_bibliography.md)
-        self.literature_coefficients = {
-            'intercept': -3.2,
-            'age': 0.049,  # ln(1.05) per year - Zhang et al. (2022)
-            'location_submandibular': 0.833,  # ln(2.3) - Stenner et al. (2012)
-            'location_minor': 1.131,  # ln(3.1) - Stenner et al. (2012)
-            'size_2_4cm': 0.588,  # ln(1.8) - Tian et al. (2010)
-            'size_gt_4cm': 1.163,  # ln(3.2) - Tian et al. (2010)
-            'gender_male': 0.336,  # ln(1.4) - Speight & Barrett (2002)
-            'margins_irregular': 1.435,  # ln(4.2) - Bialek et al. (2006)
-            'echo_hypoechoic': 0.742,  # ln(2.1) - Zajkowski et al. (2000)
-            'vascularity_increased': 1.030  # ln(2.8) - Martinoli et al. (1996)
-        }
+        self.literature_coefficients = dict(
+            LITERATURE_COEFFICIENTS if coefficients is None else coefficients
+        )
+        
+        # Published 95% CIs of the odds ratios (intercept has none)
+        self.odds_ratio_confidence_intervals = dict(
+            LITERATURE_ODDS_RATIO_CIS if odds_ratio_confidence_intervals is None
+            else odds_ratio_confidence_intervals
+        )
         
         # Risk thresholds from clinical literature
-        self.risk_thresholds = {
-            'low': 0.3,      # <30% probability
-            'intermediate': 0.7  # 30-70% probability, >70% = high
-        }
+        self.risk_thresholds = dict(RISK_THRESHOLDS if risk_thresholds is None else risk_thresholds)
+        self.model_name = model_name
         
         # Expected performance from literature validation
         self.expected_performance = {
@@ -59,127 +310,435 @@ class LiteratureBasedMalignancyPredictor:
             'echo': 'Zajkowski, P., et al. (2000). Eur J Ultrasound, 11(3), 195-198.',
             'vascularity': 'Martinoli, C., et al. (1996). RadioGraphics, 16(6), 1439-1455.'
         }
+        
+        # Optional per-stage timings (lookup table builds are recorded too)
+        self.profiler = profiler
+        
+        # Integer-coded categorical encoder
+        self.encoder = FeatureEncoder()
+        
+        # Freeze coefficients into the fast scoring representation
+        self.compile_coefficients()
+        
+        # Optional exhaustive lookup table (rebuilt when coefficients/thresholds change)
+        self.use_lookup_table = use_lookup_table
+        self._lookup_signature = None
+        if use_lookup_table:
+            self.build_lookup_table()
+        
+        # Optional prediction audit trail
+        self.audit_logger = audit_logger
     
-    def _encode_features(self, X):
-        """Encode categorical features based on literature definitions"""
-        X_encoded = X.copy()
+    def __getstate__(self):
+        # The audit logger owns a file and a thread; worker copies do not log
+        # (nor profile: their timings would stay in the worker process)
+        state = self.__dict__.copy()
+        state['audit_logger'] = None
+        state['profiler'] = None
+        return state
+    
+    def profiled(self, stage, rows, func, *args):
+        """
+        Call func(*args), recording it as `stage` when a profiler is attached
         
-        # Age normalization (centered at 50, scaled by 20)
-        X_encoded['age_norm'] = (X_encoded['age'] - 50) / 20
+        Callers that build their own output from the results (batch_scoring,
+        arrow_io) time it with this too, e.g. as the 'output' stage.
         
-        # Location encoding (parotid = reference)
-        X_encoded['location_submandibular'] = (X_encoded['location'] == 'submandibular').astype(int)
-        X_encoded['location_minor'] = (X_encoded['location'] == 'minor').astype(int)
+        Parameters:
+        stage (str): Stage name (see stage_profiler.STAGES)
+        rows (int): Rows processed by the call
         
-        # Size encoding (≤2cm = reference)
-        X_encoded['size_2_4cm'] = (X_encoded['size'] == '2-4cm').astype(int)
-        X_encoded['size_gt_4cm'] = (X_encoded['size'] == '>4cm').astype(int)
+        Returns:
+        The result of func(*args)
+        """
+        profiler = self.profiler
+        if profiler is None:
+            return func(*args)
+        start = time.perf_counter()
+        result = func(*args)
+        profiler.record(stage, time.perf_counter() - start, rows)
+        return result
+    
+    @property
+    def model_version(self):
+        """Identifier of the current coefficients and risk thresholds"""
+        signature = self._lookup_table_signature()
+        cached = getattr(self, '_model_version', None)
+        if cached is None or cached[0] != signature:
+            version = f"{self.model_name}-" + model_fingerprint(self.literature_coefficients,
+                                                                self.risk_thresholds)
+            self._model_version = cached = (signature, version)
+        return cached[1]
+    
+    def _audit(self, inputs, probabilities, risk_codes=None):
+        """Send a scored batch to the audit logger, if one is attached"""
+        if self.audit_logger is None:
+            return
+        if risk_codes is None:
+            risk_codes = self._risk_codes(probabilities)
+        self.audit_logger.log(inputs, probabilities, risk_codes, self.model_version)
+    
+    def _coefficient_signature(self):
+        """Cheap snapshot of the coefficients used to detect changes"""
+        return tuple(self.literature_coefficients.items())
+    
+    def compile_coefficients(self):
+        """
+        Freeze literature coefficients into an intercept and a contiguous weight vector
         
-        # Gender encoding (female = reference)
-        X_encoded['gender_male'] = (X_encoded['gender'] == 'male').astype(int)
+        Called automatically at construction and whenever `literature_coefficients`
+        is modified (replaced or edited in place) before the next prediction.
+        """
+        self._intercept, self._weights = compile_coefficients(self.literature_coefficients)
+        self._compiled_signature = self._coefficient_signature()
+    
+    def _ensure_compiled(self):
+        """Recompile if coefficients changed since the last compilation"""
+        if self._compiled_signature != self._coefficient_signature():
+            self.compile_coefficients()
+    
+    def _score_encoded(self, X_encoded, out=None):
+        """
+        Score an encoded design matrix with the compiled coefficients
         
-        # Margins encoding (regular = reference)
-        X_encoded['margins_irregular'] = (X_encoded['margins'] == 'irregular').astype(int)
+        One matrix-vector product into the output buffer followed by an
+        in-place, numerically stable sigmoid.
+        """
+        self._ensure_compiled()
+        if self.profiler is None:
+            return score_design_matrix(X_encoded, self._intercept, self._weights, out=out)
         
-        # Echo encoding (iso-hyperechoic = reference)
-        X_encoded['echo_hypoechoic'] = (X_encoded['echo'] == 'hypoechoic').astype(int)
+        # Same two steps, timed separately
+        n_rows = len(X_encoded)
+        logits = self.profiled('linear', n_rows, linear_predictor, X_encoded, self._intercept,
+                               self._weights, out)
+        return self.profiled('sigmoid', n_rows, stable_sigmoid, logits, logits)
+    
+    def _lookup_table_signature(self):
+        """Snapshot of everything the lookup table depends on"""
+        return (self._coefficient_signature(), tuple(self.risk_thresholds.items()))
+    
+    def build_lookup_table(self):
+        """
+        Precompute probability and risk category for every possible patient
         
-        # Vascularity encoding (normal = reference)
-        X_encoded['vascularity_increased'] = (X_encoded['vascularity'] == 'increased').astype(int)
+        Covers all N_PROFILES categorical profiles for each integer age in
+        LOOKUP_AGE_RANGE (about 10.5k patients), stored flat as
+        profile_code * LOOKUP_N_AGES + (age - min_age).
+        """
+        min_age, max_age = LOOKUP_AGE_RANGE
+        profiles = np.repeat(np.arange(N_PROFILES), LOOKUP_N_AGES)
+        ages = np.tile(np.arange(min_age, max_age + 1), N_PROFILES)
         
-        # Select final features for modeling
-        feature_columns = [
-            'age_norm', 'location_submandibular', 'location_minor',
-            'size_2_4cm', 'size_gt_4cm', 'gender_male',
-            'margins_irregular', 'echo_hypoechoic', 'vascularity_increased'
-        ]
+        design = build_design_matrix(ages, decode_profile_codes(profiles))
+        self._lookup_probabilities = self._score_encoded(design)
+        self._lookup_risk_codes = self._risk_codes(self._lookup_probabilities)
+        self._lookup_signature = self._lookup_table_signature()
+    
+    def _ensure_lookup_table(self):
+        """Rebuild the lookup table if coefficients or thresholds changed"""
+        if self._lookup_signature != self._lookup_table_signature():
+            self.build_lookup_table()
+    
+    def _lookup_indices(self, X):
+        """
+        Flat lookup-table index for each row and the mask of rows the table covers
+        
+        Fractional, missing or out-of-range ages are not covered and must be
+        scored arithmetically.
+        """
+        min_age, max_age = LOOKUP_AGE_RANGE
+        ages = self.encoder.ages(X)
+        covered = (ages >= min_age) & (ages <= max_age) & (ages == np.floor(ages))
+        age_index = np.where(covered, ages - min_age, 0).astype(np.intp)
+        
+        return profile_codes(self.encoder.codes(X)) * LOOKUP_N_AGES + age_index, covered
+    
+    def _risk_codes(self, probabilities):
+        """Bin probabilities into RISK_CATEGORIES indices using risk_thresholds"""
+        return self.profiled('categorize', len(probabilities), bin_risk_categories,
+                             probabilities, self.risk_thresholds)
+    
+    def _gather_lookup(self, X):
+        """Lookup-table probabilities and risk codes of X, and the mask of rows the table covers"""
+        indices, covered = self._lookup_indices(X)
+        return self._lookup_probabilities[indices], self._lookup_risk_codes[indices], covered
+    
+    def _predict_with_lookup(self, X):
+        """Probabilities and risk codes gathered from the lookup table"""
+        self._ensure_lookup_table()
+        probabilities, risk_codes, covered = self.profiled('lookup', len(X), self._gather_lookup, X)
+        if not covered.any():
+            probabilities = self._score_encoded(self._encode_features(X, reuse_buffer=True))
+            return probabilities, self._risk_codes(probabilities)
         
-        return X_encoded[feature_columns].values
+        # Fall back to arithmetic for fractional or out-of-range ages
+        if not covered.all():
+            uncovered = ~covered
+            probabilities[uncovered] = self._score_encoded(self._encode_features(X[uncovered]))
+            risk_codes[uncovered] = self._risk_codes(probabilities[uncovered])
+        return probabilities, risk_codes
+    
+    def _encode_features(self, X, reuse_buffer=False):
+        """Encode categorical features based on literature definitions"""
+        # Reference categories: parotid, ≤2cm, female, regular margins,
+        # iso-hyperechoic, normal vascularity (see CATEGORY_LEVELS)
+        return self.profiled('encode', len(X), self.encoder.encode, X, None, reuse_buffer)
+    
+    def _predict_deduplicated(self, ages, codes, out=None):
+        """
+        Score each distinct (age, profile) pair once and scatter the results back
+        
+        Encoding and scoring shrink to the distinct rows; the returned result
+        reports the achieved compression_ratio.
+        """
+        unique_ages, unique_codes, inverse = self.profiled('dedup', len(ages), unique_profiles,
+                                                           ages, codes)
+        design = self.profiled('encode', len(unique_ages), build_design_matrix, unique_ages,
+                               unique_codes, self.encoder.design_buffer(len(unique_ages)))
+        probabilities = self._score_encoded(design)
+        unique = RiskCategoryResult(probabilities, self._risk_codes(probabilities))
+        return RiskCategoryResult.from_unique(unique, inverse, out=out)
     
-    def predict_proba(self, X):
+    def _predict_frame_deduplicated(self, X, out=None):
+        """_predict_deduplicated of a DataFrame"""
+        codes = self.profiled('encode', len(X), self.encoder.codes, X)
+        return self._predict_deduplicated(self.encoder.ages(X), codes, out=out)
+    
+    def predict_proba(self, X, out=None, dedup=False):
         """
         Predict malignancy probabilities using literature coefficients
         
         Parameters:
         X (pd.DataFrame): Input features
+        out (np.array, optional): Preallocated float64 buffer of length len(X)
+            that receives the probabilities (reused across batches)
+        dedup (bool): Score each distinct (age, profile) pair once (see
+            predict_risk_category_columnar for the compression ratio)
         
         Returns:
         np.array: Malignancy probabilities
         """
-        # Encode features
-        X_encoded = self._encode_features(X)
-        
-        # Linear predictor based on literature coefficients
-        linear_pred = (
-            self.literature_coefficients['intercept'] +
-            self.literature_coefficients['age'] * X_encoded[:, 0] +
-            self.literature_coefficients['location_submandibular'] * X_encoded[:, 1] +
-            self.literature_coefficients['location_minor'] * X_encoded[:, 2] +
-            self.literature_coefficients['size_2_4cm'] * X_encoded[:, 3] +
-            self.literature_coefficients['size_gt_4cm'] * X_encoded[:, 4] +
-            self.literature_coefficients['gender_male'] * X_encoded[:, 5] +
-            self.literature_coefficients['margins_irregular'] * X_encoded[:, 6] +
-            self.literature_coefficients['echo_hypoechoic'] * X_encoded[:, 7] +
-            self.literature_coefficients['vascularity_increased'] * X_encoded[:, 8]
+        if dedup:
+            result = self._predict_frame_deduplicated(X, out=out)
+            self._audit(X, result.probabilities, result.codes)
+            return result.probabilities
+        probabilities = self._predict_proba(X, out=out)
+        self._audit(X, probabilities)
+        return probabilities
+    
+    def _predict_proba(self, X, out=None):
+        """predict_proba without audit logging"""
+        if self.use_lookup_table:
+            probabilities, _ = self._predict_with_lookup(X)
+            if out is None:
+                return probabilities
+            out[:] = probabilities
+            return out
+        
+        # Encode features into the reusable per-thread buffer
+        X_encoded = self._encode_features(X, reuse_buffer=True)
+        
+        # Linear predictor and logistic function in one compiled pass
+        return self._score_encoded(X_encoded, out=out)
+    
+    def predict_proba_interval(self, X, level=0.95, n_samples=DEFAULT_N_SAMPLES, random_state=None,
+                               max_block_bytes=DEFAULT_MAX_BLOCK_BYTES, method='monte_carlo'):
+        """
+        Malignancy probabilities with uncertainty intervals
+        
+        Both methods propagate odds_ratio_confidence_intervals (intercept fixed):
+        'monte_carlo' samples coefficient vectors on the log-odds scale and takes
+        per-patient percentiles of the resulting probabilities; 'delta' maps
+        logit +/- z * se through the sigmoid, with se from the diagonal
+        coefficient covariance, at about the cost of a point prediction.
+        See uncertainty.py.
+        
+        Parameters:
+        X (pd.DataFrame): Input features
+        level (float): Central coverage of the interval
+        n_samples (int): Number of sampled coefficient vectors (Monte Carlo only)
+        random_state (int or np.random.Generator, optional): Seed for reproducible
+            intervals (Monte Carlo only)
+        max_block_bytes (int): Memory budget for one block of patients x samples
+            (Monte Carlo only)
+        method (str): 'monte_carlo' or 'delta'
+        
+        Returns:
+        ProbabilityInterval: Probabilities with lower and upper bounds
+        """
+        return self.predict_proba_interval_from_codes(
+            self.encoder.ages(X), self.encoder.codes(X), level=level, n_samples=n_samples,
+            random_state=random_state, max_block_bytes=max_block_bytes, method=method
         )
+    
+    def predict_proba_interval_from_codes(self, ages, codes, level=0.95, n_samples=DEFAULT_N_SAMPLES,
+                                          random_state=None, max_block_bytes=DEFAULT_MAX_BLOCK_BYTES,
+                                          method='monte_carlo'):
+        """
+        predict_proba_interval from pre-encoded inputs, without a DataFrame
         
-        # Convert to probabilities using logistic function
-        probabilities = 1 / (1 + np.exp(-linear_pred))
-        return probabilities
+        Parameters:
+        ages (np.array): Patient ages (float)
+        codes (dict): Integer category codes per column (see CATEGORY_LEVELS)
+        (other parameters as in predict_proba_interval)
+        
+        Returns:
+        ProbabilityInterval: Probabilities with lower and upper bounds
+        """
+        if method not in INTERVAL_METHODS:
+            raise ValueError(f"method must be one of {INTERVAL_METHODS}, got {method!r}")
+        self._ensure_compiled()
+        if method == 'delta':
+            covariance = coefficient_covariance(self.odds_ratio_confidence_intervals)
+            return delta_method_interval(ages, codes, self._intercept, self._weights, covariance,
+                                         level=level)
+        return monte_carlo_interval(
+            ages, codes, self._intercept, self._weights,
+            coefficient_standard_errors(self.odds_ratio_confidence_intervals), level=level,
+            n_samples=n_samples, random_state=random_state, max_block_bytes=max_block_bytes
+        )
+    
+    def explain(self, X, top_k=None):
+        """
+        Per-patient log-odds contribution of every feature
+        
+        Contributions are relative to the reference patient (age 50 and the
+        reference categories) and sum with the intercept to each patient's
+        log-odds. Computed in one vectorized pass over the encoded features.
+        
+        Parameters:
+        X (pd.DataFrame): Input features
+        top_k (int, optional): Keep only the k largest absolute contributions
+            (the main risk drivers) per patient
+        
+        Returns:
+        Explanation: (N x 9) contributions (or top-k drivers), intercept and
+            total log-odds; see explanation.py
+        """
+        self._ensure_compiled()
+        return explain_design_matrix(self._encode_features(X), self._intercept, self._weights,
+                                     top_k=top_k)
+    
+    def explain_from_codes(self, ages, codes, top_k=None):
+        """explain from pre-encoded inputs (ages and category codes), without a DataFrame"""
+        self._ensure_compiled()
+        return explain_design_matrix(build_design_matrix(ages, codes), self._intercept,
+                                     self._weights, top_k=top_k)
     
     def predict(self, X, threshold=0.5):
         """Predict malignancy classes"""
         probabilities = self.predict_proba(X)
         return (probabilities >= threshold).astype(int)
     
-    def predict_risk_category(self, X):
-        """Predict risk categories with clinical recommendations"""
-        probabilities = self.predict_proba(X)
-        results = []
-        
-        for prob in probabilities:
-            if prob < self.risk_thresholds['low']:
-                category = "Low Risk"
-                recommendation = "Clinical follow-up"
-                malignancy_rate = "5-15%"
-            elif prob < self.risk_thresholds['intermediate']:
-                category = "Intermediate Risk"
-                recommendation = "Consider biopsy/FNA"
-                malignancy_rate = "30-70%"
-            else:
-                category = "High Risk"
-                recommendation = "Surgical evaluation"
-                malignancy_rate = "70-90%"
-            
-            results.append({
-                'probability': prob,
-                'risk_category': category,
-                'recommendation': recommendation,
-                'expected_malignancy_rate': malignancy_rate
-            })
+    def predict_risk_category_columnar(self, X, dedup=False):
+        """
+        Predict risk categories as columnar arrays
+        
+        Probabilities are binned against risk_thresholds in one vectorized step.
         
-        return results
+        Parameters:
+        X (pd.DataFrame): Input features
+        dedup (bool): Score each distinct (age, profile) pair once and report
+            the achieved compression_ratio on the result
+        
+        Returns:
+        RiskCategoryResult: Probabilities, category codes and lookup arrays
+        """
+        if dedup:
+            result = self._predict_frame_deduplicated(X)
+            self._audit(X, result.probabilities, result.codes)
+            return result
+        if self.use_lookup_table:
+            probabilities, risk_codes = self._predict_with_lookup(X)
+        else:
+            probabilities = self._predict_proba(X)
+            risk_codes = self._risk_codes(probabilities)
+        self._audit(X, probabilities, risk_codes)
+        return RiskCategoryResult(probabilities, risk_codes)
+    
+    def predict_risk_category_from_codes(self, ages, codes, out=None, dedup=False):
+        """
+        Predict risk categories from pre-encoded inputs, without a DataFrame
+        
+        Parameters:
+        ages (np.array): Patient ages (float)
+        codes (dict): Integer category codes per column (see CATEGORY_LEVELS)
+        out (np.array, optional): float64 buffer receiving the probabilities
+        dedup (bool): Score each distinct (age, profile) pair once
+        
+        Returns:
+        RiskCategoryResult: Probabilities and risk category codes
+        """
+        if dedup:
+            result = self._predict_deduplicated(ages, codes, out=out)
+            if self.audit_logger is not None:
+                self._audit({'age': ages, **codes}, result.probabilities, result.codes)
+            return result
+        design = self.profiled('encode', len(ages), build_design_matrix, ages, codes,
+                               self.encoder.design_buffer(len(ages)))
+        probabilities = self._score_encoded(design, out=out)
+        risk_codes = self._risk_codes(probabilities)
+        if self.audit_logger is not None:
+            self._audit({'age': ages, **codes}, probabilities, risk_codes)
+        return RiskCategoryResult(probabilities, risk_codes)
+    
+    def pack(self, X):
+        """
+        Pack a patient DataFrame into 2-byte rows (see packed_profiles.py)
+        
+        Ages are rounded to whole years; missing ages score as NaN.
+        """
+        return self.profiled('encode', len(X), pack, self.encoder.ages(X), self.encoder.codes(X))
+    
+    def _ensure_packed_scorer(self):
+        """Rebuild the packed-row table if coefficients or thresholds changed"""
+        signature = self._lookup_table_signature()
+        if getattr(self, '_packed_signature', None) != signature:
+            self._ensure_compiled()
+            self._packed_scorer = PackedScorer(self._intercept, self._weights, self.risk_thresholds)
+            self._packed_signature = signature
+        return self._packed_scorer
+    
+    def predict_risk_category_packed(self, packed, out=None):
+        """
+        Predict risk categories of packed rows with one table gather per block
+        
+        Parameters:
+        packed (np.array): PACKED_DTYPE rows, e.g. a memmap from load_packed
+        out (np.array, optional): float64 buffer receiving the probabilities
+        
+        Returns:
+        RiskCategoryResult: Probabilities and risk category codes
+        """
+        scorer = self._ensure_packed_scorer()
+        probabilities, risk_codes = self.profiled('lookup', len(packed), scorer.score, packed, out)
+        if self.audit_logger is not None:
+            ages, codes = unpack(packed)
+            self._audit({'age': ages, **codes}, probabilities, risk_codes)
+        return RiskCategoryResult(probabilities, risk_codes)
+    
+    def predict_proba_packed(self, packed, out=None):
+        """Malignancy probabilities of packed rows (see predict_risk_category_packed)"""
+        return self.predict_risk_category_packed(packed, out=out).probabilities
+    
+    def predict_risk_category(self, X, dedup=False):
+        """
+        Predict risk categories with clinical recommendations
+        
+        With dedup=True each distinct (age, profile) pair is scored once;
+        every patient still gets a dict of its own.
+        """
+        result = self.predict_risk_category_columnar(X, dedup=dedup)
+        return self.profiled('output', len(result), result.to_list)
     
     def get_feature_importance(self):
         """Get feature importance based on literature coefficients"""
-        feature_names = [
-            'age', 'location_submandibular', 'location_minor',
-            'size_2_4cm', 'size_gt_4cm', 'gender_male',
-            'margins_irregular', 'echo_hypoechoic', 'vascularity_increased'
-        ]
+        self._ensure_compiled()
+        feature_names = list(FEATURE_NAMES)
         
         # Importance based on absolute coefficient values
-        importance = np.array([
-            abs(self.literature_coefficients['age']),
-            abs(self.literature_coefficients['location_submandibular']),
-            abs(self.literature_coefficients['location_minor']),
-            abs(self.literature_coefficients['size_2_4cm']),
-            abs(self.literature_coefficients['size_gt_4cm']),
-            abs(self.literature_coefficients['gender_male']),
-            abs(self.literature_coefficients['margins_irregular']),
-            abs(self.literature_coefficients['echo_hypoechoic']),
-            abs(self.literature_coefficients['vascularity_increased'])
-        ])
+        importance = np.abs(self._weights)
         
         # Normalize to sum to 1
         importance = importance / importance.sum()
@@ -190,6 +749,7 @@ class LiteratureBasedMalignancyPredictor:
         """Get detailed explanation of the model"""
         return {
             'model_type': 'Literature-Based Logistic Regression',
+            'model_version': self.model_version,
             'evidence_base': '25+ peer-reviewed studies (2020-2024)',
             'validation': 'Cross-validated on multiple independent datasets',
             'coefficients': self.literature_coefficients,
@@ -212,14 +772,11 @@ class LiteratureBasedMalignancyPredictor:
     
     def generate_report(self, X, y_true=None):
         """Generate model report"""
-        probabilities = self.predict_proba(X)
-        risk_results = self.predict_risk_category(X)
+        risk_results = self.predict_risk_category_columnar(X)
+        probabilities = risk_results.probabilities
         
         # Risk distribution
-        risk_distribution = {}
-        for result in risk_results:
-            category = result['risk_category']
-            risk_distribution[category] = risk_distribution.get(category, 0) + 1
+        risk_distribution = risk_results.counts()
         
         report = {
             'model_info': self.get_model_explanation(),
@@ -235,20 +792,100 @@ class LiteratureBasedMalignancyPredictor:
         
         # Add performance metrics if true labels provided
         if y_true is not None:
-            y_pred = self.predict(X)
-            cm = confusion_matrix(y_true, y_pred)
-            tn, fp, fn, tp = cm.ravel()
+            # Reuses the probabilities above; AUC and the 0.5 cut-off share one sort
+            roc = ROCAnalysis(y_true, probabilities)
+            metrics = roc.metrics_at(0.5)
             
             report['performance_metrics'] = {
-                'auc': roc_auc_score(y_true, probabilities),
-                'sensitivity': tp / (tp + fn) if (tp + fn) > 0 else 0,
-                'specificity': tn / (tn + fp) if (tn + fp) > 0 else 0,
-                'ppv': tp / (tp + fp) if (tp + fp) > 0 else 0,
-                'npv': tn / (tn + fn) if (tn + fn) > 0 else 0,
-                'accuracy': (tp + tn) / (tp + tn + fp + fn)
+                'auc': roc.auc(),
+                'sensitivity': metrics['sensitivity'],
+                'specificity': metrics['specificity'],
+                'ppv': metrics['ppv'],
+                'npv': metrics['npv'],
+                'accuracy': metrics['accuracy']
             }
         
         return report
+    
+    def roc_analysis(self, X, y_true):
+        """
+        ROC analysis of the predictions against known outcomes
+        
+        Parameters:
+        X (pd.DataFrame): Input features
+        y_true (array-like): Binary outcomes (1 = malignant)
+        
+        Returns:
+        ROCAnalysis: AUC, ROC curve and metrics at any thresholds (see validation_metrics.py)
+        """
+        return ROCAnalysis(y_true, self.predict_proba(X))
+    
+    def bootstrap_validation(self, X, y_true, n_resamples=DEFAULT_N_RESAMPLES, threshold=0.5,
+                             n_workers=None, random_state=None):
+        """
+        Bootstrap confidence intervals of the validation metrics on local data
+        
+        Scores the cohort once, then resamples it; see bootstrap_validation.py.
+        Compare with the literature ranges via
+        result.compare(predictor.expected_performance).
+        
+        Parameters:
+        X (pd.DataFrame): Input features
+        y_true (array-like): Binary outcomes (1 = malignant)
+        n_resamples (int): Number of bootstrap resamples
+        threshold (float): Cut-off for sensitivity, specificity, PPV, NPV and accuracy
+        n_workers (int, optional): Worker processes (default: all cores)
+        random_state (int, optional): Seed for reproducible resamples
+        
+        Returns:
+        BootstrapResult: Estimates, per-resample metrics and confidence intervals
+        """
+        return bootstrap_validation(y_true, self._predict_proba(X), n_resamples=n_resamples,
+                                    threshold=threshold, n_workers=n_workers,
+                                    random_state=random_state)
+    
+    def recalibrate(self, source, mode='intercept', apply=False, **options):
+        """
+        Fit the coefficients to a local labelled cohort, starting from the current ones
+        
+        Parameters:
+        source (callable): Chunk source from recalibration.py, e.g.
+            frame_chunks(X, y_true) or csv_chunks('registry.csv', 'outcome')
+        mode (str): 'intercept', 'slope' or 'full'
+        apply (bool): Replace literature_coefficients with the fitted set
+        **options: max_iter, tol and ridge (see recalibration.recalibrate)
+        
+        Returns:
+        RecalibrationResult: New coefficients and convergence diagnostics
+        """
+        from recalibration import recalibrate
+        
+        result = recalibrate(source, mode=mode, coefficients=self.literature_coefficients, **options)
+        if apply:
+            # Recompiled (and the lookup table rebuilt) before the next prediction
+            self.literature_coefficients = dict(result.coefficients)
+        return result
+    
+    def optimize_risk_thresholds(self, X, y_true, target_sensitivity=0.95, apply=False):
+        """
+        Find risk_thresholds cut-points from labelled data
+        
+        'low' keeps sensitivity at target_sensitivity; 'intermediate' maximizes
+        Youden's J. The cohort is scored once for both.
+        
+        Parameters:
+        X (pd.DataFrame): Input features
+        y_true (array-like): Binary outcomes (1 = malignant)
+        target_sensitivity (float): Minimum sensitivity of the low-risk cut-off
+        apply (bool): Also replace self.risk_thresholds with the result
+        
+        Returns:
+        dict: {'low': float, 'intermediate': float}
+        """
+        thresholds = self.roc_analysis(X, y_true).optimal_risk_thresholds(target_sensitivity)
+        if apply:
+            self.risk_thresholds = dict(thresholds)
+        return thresholds
 
 
 def create_sample_data(n_samples=1000, random_state=42):
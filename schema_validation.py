@@ -0,0 +1,368 @@
+"""
+SalivAI - Input Schema Validation
+Vectorized checks of a patient cohort against the model's input schema
+
+The encoder maps unknown and missing categorical values to the reference
+category (e.g. "Parotid", "<2cm" or a missing echo value score as
+parotid/≤2cm/iso-hyperechoic) and passes any age to the sigmoid. Validation
+finds those rows first:
+- 'missing': NaN/None in any input column
+- 'unknown_value': a categorical value outside CATEGORY_LEVELS
+- 'not_numeric': an age that is not a number
+- 'out_of_range': an age outside AGE_RANGE (18-90, as in the web form) or infinite
+
+Each categorical column is factorized once (or its categories recoded, for
+categorical dtypes) and only the few distinct values are checked against the
+vocabulary; rows are then flagged by indexing with the integer codes, so no
+Python runs per row.
+
+Modes:
+- 'strict': raise SchemaValidationError if any row is invalid
+- 'coerce': repair case, whitespace and the COERCE_ALIASES spellings
+  ("Parotid", " male", "<2cm", "2 - 4 cm") and numeric age strings, and
+  clip ages into AGE_RANGE. Other unknown values become missing (scored as
+  the reference category, as before) and non-numeric ages NaN; these and
+  the clipped ages stay in the report
+- 'drop': return only the valid rows
+
+A missing column always raises SchemaValidationError.
+
+Usage:
+    from schema_validation import validate_cohort
+
+    X_valid, report = validate_cohort(X, mode='drop')
+    report.counts()            # {'size': {'unknown_value': 12}, 'age': {'missing': 3}}
+    report.to_frame()          # one row per problem: row, index, column, reason, value
+    report.invalid_rows        # positions of the invalid rows in X
+
+    python batch_scoring.py patients.csv results.csv --validate drop --validation-report issues.csv
+"""
+
+import numpy as np
+import pandas as pd
+
+from scoring_core import CATEGORY_LEVELS, LOOKUP_AGE_RANGE
+
+MODES = ('strict', 'coerce', 'drop')
+
+REASONS = ('missing_column', 'missing', 'unknown_value', 'not_numeric', 'out_of_range')
+
+# Plausible patient ages; the same bounds as the web form and the lookup table
+AGE_RANGE = LOOKUP_AGE_RANGE
+
+# Extra spellings repaired by mode='coerce', after lowercasing, removing
+# whitespace and writing '<' or '<=' as '≤'
+COERCE_ALIASES = {
+    'location': {'submandibulargland': 'submandibular', 'minorsalivary': 'minor',
+                 'minorsalivarygland': 'minor', 'parotidgland': 'parotid'},
+    'size': {'≤2': '≤2cm', '2-4': '2-4cm', '>4': '>4cm'},
+    'gender': {'f': 'female', 'm': 'male', 'woman': 'female', 'man': 'male'},
+    'margins': {},
+    'echo': {'isoechoic': 'iso-hyperechoic', 'hyperechoic': 'iso-hyperechoic',
+             'iso/hyperechoic': 'iso-hyperechoic', 'isohyperechoic': 'iso-hyperechoic',
+             'hypo-echoic': 'hypoechoic'},
+    'vascularity': {}
+}
+
+# Offending values kept per column and reason in summary()
+MAX_EXAMPLES = 5
+
+
+class SchemaValidationError(ValueError):
+    """Cohort rejected by validate_cohort; `report` holds every problem found"""
+
+    def __init__(self, report):
+        super().__init__(report.message())
+        self.report = report
+
+
+class ValidationReport:
+    """
+    Problems found in a cohort, by column and reason
+
+    Attributes:
+    n_rows (int): Rows checked
+    mode (str): 'strict', 'coerce' or 'drop'
+    issues (dict): (column, reason) -> (int64 row positions, offending values)
+    coerced (dict): column -> int64 positions of values repaired by mode='coerce'
+    index (pd.Index): Index labels of the checked rows (positions map onto it)
+    """
+
+    def __init__(self, n_rows, mode, issues, coerced, index):
+        self.n_rows = n_rows
+        self.mode = mode
+        self.issues = issues
+        self.coerced = coerced
+        self.index = index
+
+    @property
+    def invalid_mask(self):
+        """Boolean mask of rows with at least one problem"""
+        mask = np.zeros(self.n_rows, dtype=bool)
+        for (column, reason), (positions, _) in self.issues.items():
+            if reason == 'missing_column':
+                mask[:] = True
+            else:
+                mask[positions] = True
+        return mask
+
+    @property
+    def invalid_rows(self):
+        """Sorted positions of the rows with at least one problem"""
+        return np.flatnonzero(self.invalid_mask)
+
+    @property
+    def n_invalid(self):
+        return int(self.invalid_mask.sum())
+
+    @property
+    def is_valid(self):
+        return not self.issues
+
+    def counts(self):
+        """{column: {reason: rows}} of every problem found"""
+        counts = {}
+        for (column, reason), (positions, _) in self.issues.items():
+            n_problems = self.n_rows if reason == 'missing_column' else len(positions)
+            counts.setdefault(column, {})[reason] = n_problems
+        return counts
+
+    def summary(self, max_examples=MAX_EXAMPLES):
+        """
+        JSON-serializable overview
+
+        Returns:
+        dict: rows checked, invalid rows, per-column counts, up to
+            max_examples distinct offending values per column and reason, and
+            the number of repaired values per column (mode='coerce')
+        """
+        examples = {}
+        for (column, reason), (_, values) in self.issues.items():
+            if len(values) and reason != 'missing':
+                distinct = pd.unique(np.asarray(values, dtype=object))[:max_examples]
+                examples.setdefault(column, {})[reason] = [str(value) for value in distinct]
+        return {
+            'mode': self.mode,
+            'rows': self.n_rows,
+            'invalid_rows': self.n_invalid,
+            'counts': self.counts(),
+            'examples': examples,
+            'coerced': {column: len(positions) for column, positions in self.coerced.items()}
+        }
+
+    def message(self, max_examples=3):
+        """One-line description of the problems, for errors and logs"""
+        if self.is_valid:
+            return f"All {self.n_rows:,} rows valid"
+        summary = self.summary(max_examples)
+        parts = []
+        for column, reasons in summary['counts'].items():
+            for reason, count in reasons.items():
+                values = summary['examples'].get(column, {}).get(reason)
+                shown = f" (e.g. {', '.join(repr(value) for value in values)})" if values else ''
+                parts.append(f"{column}: {count:,} {reason.replace('_', ' ')}{shown}")
+        return f"{self.n_invalid:,} of {self.n_rows:,} rows invalid; " + '; '.join(parts)
+
+    def to_frame(self):
+        """
+        One row per problem: row (position), index (label), column, reason, value
+
+        A missing column is reported once, with row and index empty.
+        """
+        frames = []
+        for (column, reason), (positions, values) in self.issues.items():
+            if reason == 'missing_column':
+                frames.append(pd.DataFrame({'row': [pd.NA], 'index': [None], 'column': [column],
+                                            'reason': [reason], 'value': [None]}))
+                continue
+            frames.append(pd.DataFrame({
+                'row': positions,
+                'index': self.index[positions],
+                'column': column,
+                'reason': reason,
+                'value': pd.Series(values, dtype=object)
+            }))
+        if not frames:
+            return pd.DataFrame(columns=['row', 'index', 'column', 'reason', 'value'])
+        return pd.concat(frames, ignore_index=True).sort_values('row', kind='stable',
+                                                                ignore_index=True)
+
+    @classmethod
+    def concat(cls, reports):
+        """
+        One report over consecutive chunks (e.g. the chunks of a CSV)
+
+        Positions are offset by the rows of the preceding chunks.
+        """
+        issues = {}
+        coerced = {}
+        offset = 0
+        for report in reports:
+            for key, (positions, values) in report.issues.items():
+                merged = issues.setdefault(key, ([], []))
+                merged[0].append(positions + offset)
+                merged[1].append(np.asarray(values, dtype=object))
+            for column, positions in report.coerced.items():
+                coerced.setdefault(column, []).append(positions + offset)
+            offset += report.n_rows
+        issues = {
+            key: (np.concatenate(positions), np.concatenate(values))
+            for key, (positions, values) in issues.items()
+        }
+        coerced = {column: np.concatenate(positions) for column, positions in coerced.items()}
+        # Consecutive RangeIndexes (CSV chunks) stay a RangeIndex
+        index = reports[0].index.append([report.index for report in reports[1:]]) \
+            if reports else pd.RangeIndex(0)
+        mode = reports[0].mode if reports else None
+        return cls(offset, mode, issues, coerced, index)
+
+
+def _coerce_level(value, column):
+    """Level a messy categorical value stands for, or None"""
+    if not isinstance(value, str):
+        return None
+    key = ''.join(value.lower().split())
+    key = key.replace('<=', '≤').replace('=<', '≤').replace('<', '≤')
+    key = COERCE_ALIASES[column].get(key, key)
+    return key if key in CATEGORY_LEVELS[column] else None
+
+
+def _check_categorical(values, column, coerce):
+    """
+    Invalid rows of one categorical column
+
+    Returns:
+    tuple: (issues {reason: (positions, values)}, repaired positions or None,
+        repaired column or None)
+    """
+    levels = pd.Index(CATEGORY_LEVELS[column])
+    dtype = values.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        # Already categorical: only its categories need checking
+        codes = np.asarray(values.cat.codes)
+        uniques = dtype.categories
+    else:
+        # One hash pass over the rows; everything below works on the uniques
+        codes, uniques = pd.factorize(values, sort=False)
+    recode = levels.get_indexer(uniques)
+
+    repaired_uniques = np.zeros(len(uniques), dtype=bool)
+    if coerce and (recode < 0).any():
+        for position in np.flatnonzero(recode < 0):
+            level = _coerce_level(uniques[position], column)
+            if level is not None:
+                recode[position] = levels.get_loc(level)
+                repaired_uniques[position] = True
+
+    issues = {}
+    missing = codes < 0
+    if missing.any():
+        positions = np.flatnonzero(missing)
+        issues['missing'] = (positions, np.full(len(positions), None, dtype=object))
+    # Trailing False for the -1 missing-value sentinel
+    unknown_uniques = np.append(recode < 0, False)
+    unknown = unknown_uniques[codes]
+    if unknown.any():
+        positions = np.flatnonzero(unknown)
+        issues['unknown_value'] = (positions, np.asarray(uniques, dtype=object)[codes[positions]])
+
+    if not repaired_uniques.any() and not (coerce and unknown.any()):
+        return issues, None, None
+    # Repaired or unrepairable (now missing) values: rebuild the column from codes
+    repaired = np.append(repaired_uniques, False)[codes]
+    new_codes = np.append(recode, -1)[codes]
+    column_values = pd.Categorical.from_codes(new_codes, categories=CATEGORY_LEVELS[column])
+    return issues, np.flatnonzero(repaired), column_values
+
+
+def _check_age(values, coerce):
+    """
+    Invalid rows of the age column
+
+    Returns:
+    tuple: (issues {reason: (positions, values)}, positions of ages parsed
+        from text or None, repaired column or None)
+    """
+    numeric = pd.api.types.is_numeric_dtype(values.dtype)
+    if numeric:
+        ages = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    else:
+        ages = pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    present = values.notna().to_numpy()
+    nan = np.isnan(ages)
+    with np.errstate(invalid='ignore'):
+        out_of_range = (ages < AGE_RANGE[0]) | (ages > AGE_RANGE[1])
+
+    issues = {}
+    raw = None
+    for reason, mask in (('missing', ~present), ('not_numeric', nan & present),
+                         ('out_of_range', out_of_range)):
+        if mask.any():
+            positions = np.flatnonzero(mask)
+            if reason == 'missing':
+                issue_values = np.full(len(positions), None, dtype=object)
+            else:
+                raw = values.to_numpy(dtype=object) if raw is None else raw
+                issue_values = raw[positions]
+            issues[reason] = (positions, issue_values)
+
+    if not coerce or (numeric and not out_of_range.any()):
+        return issues, None, None
+    parsed = None if numeric else np.flatnonzero(~nan & ~out_of_range)
+    return issues, parsed, np.clip(ages, *AGE_RANGE)
+
+
+def validate_cohort(X, mode='strict'):
+    """
+    Check a patient DataFrame against the input schema
+
+    Parameters:
+    X (pd.DataFrame): Input features (age plus the CATEGORY_LEVELS columns)
+    mode (str): 'strict' raises on any problem; 'coerce' repairs spellings,
+        clips ages and turns the rest into missing values; 'drop' removes
+        invalid rows
+
+    Returns:
+    tuple: (DataFrame, ValidationReport). The DataFrame is X itself when
+        nothing changed, a shallow copy with repaired columns ('coerce') or
+        the valid rows ('drop'); the report lists the problems of the input.
+
+    Raises:
+    SchemaValidationError: A required column is missing, or mode='strict'
+        and some row is invalid
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+    coerce = mode == 'coerce'
+    n_rows = len(X)
+
+    issues = {}
+    coerced = {}
+    replacements = {}
+    for column in ('age',) + tuple(CATEGORY_LEVELS):
+        if column not in X.columns:
+            issues[(column, 'missing_column')] = (np.empty(0, dtype=np.int64),
+                                                  np.empty(0, dtype=object))
+            continue
+        if column == 'age':
+            column_issues, repaired, values = _check_age(X[column], coerce)
+        else:
+            column_issues, repaired, values = _check_categorical(X[column], column, coerce)
+        for reason, issue in column_issues.items():
+            issues[(column, reason)] = issue
+        if repaired is not None and len(repaired):
+            coerced[column] = repaired
+        if values is not None:
+            replacements[column] = values
+
+    report = ValidationReport(n_rows, mode, issues, coerced, X.index)
+    if any(reason == 'missing_column' for _, reason in issues) or (mode == 'strict' and issues):
+        raise SchemaValidationError(report)
+
+    if mode == 'drop' and issues:
+        return X.iloc[np.flatnonzero(~report.invalid_mask)], report
+    if replacements:
+        X = X.copy(deep=False)
+        for column, values in replacements.items():
+            X[column] = values
+    return X, report
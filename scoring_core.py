@@ -0,0 +1,323 @@
+"""
+SalivAI - Scoring Core
+NumPy-only building blocks of the literature-based malignancy model
+
+Everything needed to turn encoded patients into probabilities and risk
+strata, importable without pandas or plotting libraries, so workers,
+serverless functions and the web app start fast.
+LiteratureBasedMalignancyPredictor (salivary_gland_malignancy_predictor.py)
+builds on these functions and adds DataFrame encoding and reporting.
+
+Usage:
+    from scoring_core import score_records
+
+    probabilities, risk_codes = score_records([
+        {'age': 55, 'gender': 'male', 'location': 'submandibular', 'size': '2-4cm',
+         'margins': 'irregular', 'echo': 'hypoechoic', 'vascularity': 'increased'}
+    ])
+"""
+
+import hashlib
+import json
+from statistics import NormalDist
+
+import numpy as np
+
+# Validated literature coefficients (from references_bibliography.md)
+LITERATURE_COEFFICIENTS = {
+    'intercept': -3.2,
+    'age': 0.049,  # ln(1.05) per year - Zhang et al. (2022)
+    'location_submandibular': 0.833,  # ln(2.3) - Stenner et al. (2012)
+    'location_minor': 1.131,  # ln(3.1) - Stenner et al. (2012)
+    'size_2_4cm': 0.588,  # ln(1.8) - Tian et al. (2010)
+    'size_gt_4cm': 1.163,  # ln(3.2) - Tian et al. (2010)
+    'gender_male': 0.336,  # ln(1.4) - Speight & Barrett (2002)
+    'margins_irregular': 1.435,  # ln(4.2) - Bialek et al. (2006)
+    'echo_hypoechoic': 0.742,  # ln(2.1) - Zajkowski et al. (2000)
+    'vascularity_increased': 1.030  # ln(2.8) - Martinoli et al. (1996)
+}
+
+# Published 95% confidence intervals of the odds ratios (numerical_risk_values_algorithm.md);
+# the intercept has no published interval
+LITERATURE_ODDS_RATIO_CIS = {
+    'age': (1.02, 1.08),
+    'location_submandibular': (1.4, 3.8),
+    'location_minor': (1.8, 5.3),
+    'size_2_4cm': (1.2, 2.7),
+    'size_gt_4cm': (2.1, 4.9),
+    'gender_male': (1.1, 1.8),
+    'margins_irregular': (2.8, 6.3),
+    'echo_hypoechoic': (1.4, 3.1),
+    'vascularity_increased': (1.9, 4.1)
+}
+
+# Risk thresholds from clinical literature
+RISK_THRESHOLDS = {
+    'low': 0.3,      # <30% probability
+    'intermediate': 0.7  # 30-70% probability, >70% = high
+}
+
+# Order of the design-matrix columns (and of the compiled weight vector)
+FEATURE_NAMES = [
+    'age', 'location_submandibular', 'location_minor',
+    'size_2_4cm', 'size_gt_4cm', 'gender_male',
+    'margins_irregular', 'echo_hypoechoic', 'vascularity_increased'
+]
+
+# Allowed values of each categorical input; the first level is the reference category
+CATEGORY_LEVELS = {
+    'location': ['parotid', 'submandibular', 'minor'],
+    'size': ['≤2cm', '2-4cm', '>4cm'],
+    'gender': ['female', 'male'],
+    'margins': ['regular', 'irregular'],
+    'echo': ['iso-hyperechoic', 'hypoechoic'],
+    'vascularity': ['normal', 'increased']
+}
+
+# Number of distinct categorical profiles (3 x 3 x 2 x 2 x 2 x 2 = 144)
+N_PROFILES = int(np.prod([len(levels) for levels in CATEGORY_LEVELS.values()]))
+
+# Integer ages accepted by the web interface, covered by the lookup table
+LOOKUP_AGE_RANGE = (18, 90)
+LOOKUP_N_AGES = LOOKUP_AGE_RANGE[1] - LOOKUP_AGE_RANGE[0] + 1
+
+# Risk strata in threshold order (below 'low', below 'intermediate', above)
+RISK_CATEGORIES = [
+    {
+        'risk_category': "Low Risk",
+        'recommendation': "Clinical follow-up",
+        'expected_malignancy_rate': "5-15%"
+    },
+    {
+        'risk_category': "Intermediate Risk",
+        'recommendation': "Consider biopsy/FNA",
+        'expected_malignancy_rate': "30-70%"
+    },
+    {
+        'risk_category': "High Risk",
+        'recommendation': "Surgical evaluation",
+        'expected_malignancy_rate': "70-90%"
+    }
+]
+
+# Level -> code lookups for encoding plain Python records
+_LEVEL_CODES = {
+    column: {level: code for code, level in enumerate(levels)}
+    for column, levels in CATEGORY_LEVELS.items()
+}
+
+
+def profile_codes(codes):
+    """Combine per-column category codes into a single profile code in [0, N_PROFILES)"""
+    profile = None
+    for column, levels in CATEGORY_LEVELS.items():
+        column_codes = np.asarray(codes[column], dtype=np.intp)
+        profile = column_codes.copy() if profile is None else profile * len(levels) + column_codes
+    return profile
+
+
+def decode_profile_codes(profile):
+    """Split profile codes back into per-column category codes"""
+    profile = np.asarray(profile, dtype=np.intp)
+    codes = {}
+    for column, levels in reversed(list(CATEGORY_LEVELS.items())):
+        profile, codes[column] = np.divmod(profile, len(levels))
+    return {column: codes[column] for column in CATEGORY_LEVELS}
+
+
+def unique_profiles(ages, codes):
+    """
+    Distinct (age, profile) pairs of a batch and the inverse mapping back to every row
+
+    Each row is keyed as age index * N_PROFILES + profile code, the age index
+    being the whole age itself (0-255) or its rank among the distinct ages
+    (fractional or missing ages). Keys are collapsed with a bincount while
+    the key space is small, otherwise with np.unique.
+
+    Returns:
+    tuple: (float64 unique ages, dict of unique category codes per column,
+        intp inverse such that unique[inverse] restores the rows)
+    """
+    ages = np.asarray(ages, dtype=np.float64)
+    with np.errstate(invalid='ignore'):
+        whole = ages.astype(np.intp)
+    if len(ages) and (whole == ages).all() and whole.min() >= 0 and whole.max() < 256:
+        age_values, age_index = np.arange(256, dtype=np.float64), whole
+    else:
+        # Sorted distinct ages (one NaN, last) and the rank of each row's age
+        age_values = np.unique(ages)
+        age_index = np.searchsorted(age_values, ages)
+
+    keys = age_index * N_PROFILES + profile_codes(codes)
+    n_keys = len(age_values) * N_PROFILES
+    if n_keys <= max(4 * len(keys), 256 * N_PROFILES):
+        present = np.bincount(keys, minlength=n_keys) > 0
+        unique_keys = np.flatnonzero(present)
+        inverse = (np.cumsum(present) - 1)[keys]
+    else:
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+    unique_age_index, unique_profile = np.divmod(unique_keys, N_PROFILES)
+    return age_values[unique_age_index], decode_profile_codes(unique_profile), inverse
+
+
+def encode_records(records):
+    """
+    Ages and category codes for a small list of patient dicts (no pandas)
+
+    Unknown or missing categorical values map to the reference category.
+
+    Returns:
+    tuple: (float64 ages, dict of int8 codes per column)
+    """
+    n_rows = len(records)
+    # np.array (unlike np.fromiter) turns missing ages (None) into NaN
+    ages = np.array([record.get('age') for record in records], dtype=np.float64)
+    codes = {
+        column: np.fromiter((level_codes.get(record.get(column), 0) for record in records),
+                            dtype=np.int8, count=n_rows)
+        for column, level_codes in _LEVEL_CODES.items()
+    }
+    return ages, codes
+
+
+def write_indicators(codes, out):
+    """Write one indicator column per non-reference level into `out`"""
+    position = 0
+    for column, levels in CATEGORY_LEVELS.items():
+        for level in range(1, len(levels)):
+            np.equal(codes[column], level, out=out[:, position])
+            position += 1
+    return out
+
+
+def empty_design_matrix(n_rows, dtype=np.float64):
+    """
+    Uninitialized design matrix in column-major order
+
+    Each feature column is contiguous, so the per-column writes below and the
+    matrix-vector product in scoring stream through memory.
+    """
+    return np.empty((n_rows, len(FEATURE_NAMES)), dtype=dtype, order='F')
+
+
+def build_design_matrix(ages, codes, out=None):
+    """One-hot design matrix in FEATURE_NAMES order from ages and category codes"""
+    ages = np.asarray(ages)
+    if out is None:
+        out = empty_design_matrix(len(ages))
+
+    # Age normalization (centered at 50, scaled by 20)
+    np.subtract(ages, 50, out=out[:, 0])
+    out[:, 0] /= 20
+
+    write_indicators(codes, out[:, 1:])
+    return out
+
+
+def stable_sigmoid(z, out=None):
+    """
+    Logistic function that never overflows np.exp, even on extreme log-odds
+
+    Uses 1/(1+e) for z >= 0 and e/(1+e) for z < 0 with e = exp(-|z|) <= 1.
+    Writes into `out` (which may be `z` itself) to avoid extra temporaries.
+    """
+    positive = z >= 0
+    out = np.abs(z, out=out)
+    np.negative(out, out=out)
+    np.exp(out, out=out)
+    denominator = out + 1.0
+    np.divide(1.0, denominator, out=out, where=positive)
+    np.divide(out, denominator, out=out, where=~positive)
+    return out
+
+
+def compile_coefficients(coefficients):
+    """Intercept and contiguous float64 weight vector (FEATURE_NAMES order)"""
+    weights = np.ascontiguousarray(
+        [coefficients[name] for name in FEATURE_NAMES], dtype=np.float64
+    )
+    return float(coefficients['intercept']), weights
+
+
+def linear_predictor(design, intercept, weights, out=None):
+    """Log-odds for an encoded design matrix (one matrix-vector product into `out`)"""
+    design = np.asarray(design, dtype=np.float64)
+    if out is None:
+        out = np.empty(design.shape[0], dtype=np.float64)
+    np.dot(design, weights, out=out)
+    out += intercept
+    return out
+
+
+def score_design_matrix(design, intercept, weights, out=None):
+    """
+    Probabilities for an encoded design matrix
+
+    One matrix-vector product into the output buffer followed by an in-place,
+    numerically stable sigmoid.
+    """
+    out = linear_predictor(design, intercept, weights, out=out)
+    return stable_sigmoid(out, out=out)
+
+
+def coefficient_standard_errors(confidence_intervals=LITERATURE_ODDS_RATIO_CIS, level=0.95):
+    """
+    Log-odds standard errors (FEATURE_NAMES order) implied by odds-ratio confidence intervals
+
+    Each interval is taken as symmetric on the log scale:
+    se = (ln(upper) - ln(lower)) / (2 * z), with z = 1.96 for 95% intervals.
+    """
+    z = NormalDist().inv_cdf(0.5 + level / 2)
+    bounds = np.log([confidence_intervals[name] for name in FEATURE_NAMES])
+    return (bounds[:, 1] - bounds[:, 0]) / (2 * z)
+
+
+def coefficient_covariance(confidence_intervals=LITERATURE_ODDS_RATIO_CIS, level=0.95):
+    """
+    Log-odds covariance matrix (FEATURE_NAMES order) implied by odds-ratio confidence intervals
+
+    The odds ratios come from independent studies that publish no
+    correlations, so the matrix is diagonal (the squared standard errors).
+    """
+    return np.diag(coefficient_standard_errors(confidence_intervals, level) ** 2)
+
+
+def bin_risk_categories(probabilities, thresholds):
+    """Bin probabilities into RISK_CATEGORIES indices (uint8)"""
+    bounds = [thresholds['low'], thresholds['intermediate']]
+    return np.searchsorted(bounds, probabilities, side='right').astype(np.uint8)
+
+
+def score_records(records, coefficients=LITERATURE_COEFFICIENTS, thresholds=RISK_THRESHOLDS):
+    """
+    Score a list of patient dicts without pandas
+
+    Returns:
+    tuple: (probabilities, risk codes indexing RISK_CATEGORIES)
+    """
+    ages, codes = encode_records(records)
+    intercept, weights = compile_coefficients(coefficients)
+    probabilities = score_design_matrix(build_design_matrix(ages, codes), intercept, weights)
+    return probabilities, bin_risk_categories(probabilities, thresholds)
+
+
+def coefficient_checksum(coefficients, thresholds, odds_ratio_confidence_intervals=None):
+    """
+    SHA-256 of a coefficient set and its risk thresholds (canonical JSON)
+
+    The odds-ratio confidence intervals, when given, are covered too (as
+    feature -> [lower, upper] floats), so editing them invalidates the sum.
+    """
+    contents = {'coefficients': coefficients, 'thresholds': thresholds}
+    if odds_ratio_confidence_intervals is not None:
+        contents['odds_ratio_confidence_intervals'] = {
+            feature: [float(lower), float(upper)]
+            for feature, (lower, upper) in odds_ratio_confidence_intervals.items()
+        }
+    payload = json.dumps(contents, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def model_fingerprint(coefficients, thresholds):
+    """Short stable hash of a coefficient set and its risk thresholds (the model_version suffix)"""
+    return coefficient_checksum(coefficients, thresholds)[:12]
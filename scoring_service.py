@@ -0,0 +1,451 @@
+"""
+SalivAI - HTTP Scoring Service
+Asyncio JSON-over-HTTP API around LiteratureBasedMalignancyPredictor
+
+Standard library only (no web framework). Concurrent requests are coalesced
+by a MicroBatcher: patients arriving within a short latency window (2 ms by
+default) or up to a maximum batch size are encoded and scored as one
+vectorized batch, then each request gets its own slice of the result.
+
+Endpoints:
+    GET  /health                  {"status": "ok"}
+    GET  /model                   Model explanation (coefficients, sources, ...)
+    GET  /model/versions          Stored coefficient sets and the active one
+                                  (only with a coefficient registry)
+    GET  /metrics                 Prometheus text: micro-batch counters, plus
+                                  per-stage scoring timings with a profiler
+    POST /predict_proba           Patient object -> {"probability": p}
+                                  Array of patients -> [{"probability": p}, ...]
+    POST /predict_risk_category   Patient object -> {"probability", "risk_category",
+                                  "recommendation", "expected_malignancy_rate"}
+                                  Array of patients -> array of the same
+
+A patient is {"age": 55, "gender": "male", "location": "submandibular",
+"size": "2-4cm", "margins": "irregular", "echo": "hypoechoic",
+"vascularity": "increased"}; see CATEGORY_LEVELS for the allowed values.
+Ages must lie in LOOKUP_AGE_RANGE (18-90, the range the model and the
+web form cover); anything else is rejected with 422.
+
+Usage:
+    python scoring_service.py --port 8080 --max-latency-ms 2
+    python scoring_service.py --port 8080 --audit-log audit_logs/predictions.jsonl
+    python scoring_service.py --port 8080 --profile
+
+    # Hot-swap the running service (see coefficient_registry.py)
+    python coefficient_registry.py activate local 2
+
+    # In-process (no sockets), e.g. from tests or notebooks
+    client = InProcessClient(ScoringService())
+    status, body = await client.post('/predict_risk_category', patient)
+"""
+
+import argparse
+import asyncio
+import json
+from http import HTTPStatus
+
+import numpy as np
+
+from coefficient_registry import DEFAULT_DIRECTORY, CoefficientRegistry
+from salivary_gland_malignancy_predictor import LiteratureBasedMalignancyPredictor, RiskCategoryResult
+from scoring_core import CATEGORY_LEVELS, LOOKUP_AGE_RANGE, RISK_CATEGORIES, encode_records
+from stage_profiler import PROMETHEUS_CONTENT_TYPE, StageProfiler
+
+# Flush a micro-batch once it holds this many patients...
+DEFAULT_MAX_BATCH_SIZE = 256
+
+# ...or once its first request has waited this long (seconds)
+DEFAULT_MAX_LATENCY = 0.002
+
+# Reject batch payloads above this many patients (use batch_scoring.py instead)
+MAX_BATCH_PATIENTS = 100_000
+
+# Largest accepted request body: a full batch at up to 320 bytes per patient
+# (a compact record is ~160 bytes, an indented one about twice that)
+MAX_BODY_BYTES = MAX_BATCH_PATIENTS * 320
+
+REQUIRED_FIELDS = ('age',) + tuple(CATEGORY_LEVELS)
+
+
+class ServiceError(Exception):
+    """Request error reported to the client with an HTTP status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def validate_patient(record, index=None):
+    """Raise ServiceError (422) unless `record` is a complete, valid patient object"""
+    where = '' if index is None else f" (patient {index})"
+    if not isinstance(record, dict):
+        raise ServiceError(HTTPStatus.UNPROCESSABLE_ENTITY, f"Patient must be a JSON object{where}")
+    missing = [field for field in REQUIRED_FIELDS if field not in record]
+    if missing:
+        raise ServiceError(HTTPStatus.UNPROCESSABLE_ENTITY,
+                           f"Missing field(s) {', '.join(missing)}{where}")
+    age = record['age']
+    if isinstance(age, bool) or not isinstance(age, (int, float)) or not np.isfinite(age):
+        raise ServiceError(HTTPStatus.UNPROCESSABLE_ENTITY, f"age must be a number{where}")
+    min_age, max_age = LOOKUP_AGE_RANGE
+    if not min_age <= age <= max_age:
+        raise ServiceError(HTTPStatus.UNPROCESSABLE_ENTITY,
+                           f"age must be between {min_age} and {max_age}; got {age!r}{where}")
+    for column, levels in CATEGORY_LEVELS.items():
+        if record[column] not in levels:
+            raise ServiceError(
+                HTTPStatus.UNPROCESSABLE_ENTITY,
+                f"{column} must be one of {', '.join(levels)}; got {record[column]!r}{where}"
+            )
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent scoring requests into vectorized batches
+
+    Must be used from a single event loop. Scoring runs inline on the loop:
+    a few hundred patients take tens of microseconds, less than a thread hop.
+    """
+
+    def __init__(self, predictor, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_latency=DEFAULT_MAX_LATENCY, registry=None):
+        """
+        Parameters:
+        predictor (LiteratureBasedMalignancyPredictor): Model used for scoring
+        max_batch_size (int): Patients that trigger an immediate flush
+        max_latency (float): Seconds the oldest pending request may wait
+        registry (CoefficientRegistry, optional): Score with its active
+            version instead of `predictor`, resolved once per batch
+        """
+        self._predictor = predictor
+        self.registry = registry
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self._pending = []
+        self._n_pending = 0
+        self._timer = None
+
+        # Running totals for monitoring
+        self.n_batches = 0
+        self.n_patients = 0
+
+    @property
+    def predictor(self):
+        """Model for the next batch"""
+        return self._predictor if self.registry is None else self.registry.active()
+
+    def score(self, records):
+        """Score a list of validated patient dicts synchronously"""
+        ages, codes = encode_records(records)
+        # One predictor per batch: a hot-swap applies from the next batch on
+        return self.predictor.predict_risk_category_from_codes(ages, codes)
+
+    async def submit(self, records):
+        """
+        Score a list of patient dicts as part of the next micro-batch
+
+        Returns:
+        RiskCategoryResult: Results for `records`, in order
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((records, future))
+        self._n_pending += len(records)
+        if self._n_pending >= self.max_batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_latency, self.flush)
+        return await future
+
+    def flush(self):
+        """Score every pending request now"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending, self._n_pending = self._pending, [], 0
+        if not pending:
+            return
+
+        try:
+            result = self.score([record for records, _ in pending for record in records])
+        except Exception as error:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        self.n_batches += 1
+        self.n_patients += len(result)
+        start = 0
+        for records, future in pending:
+            stop = start + len(records)
+            if not future.done():
+                future.set_result(
+                    RiskCategoryResult(result.probabilities[start:stop], result.codes[start:stop])
+                )
+            start = stop
+
+
+class ScoringService:
+    """
+    Request routing and JSON handling, independent of the transport
+
+    handle() serves the HTTP server below and InProcessClient alike.
+    """
+
+    def __init__(self, predictor=None, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_latency=DEFAULT_MAX_LATENCY, registry=None, profiler=None):
+        """
+        Parameters:
+        predictor (LiteratureBasedMalignancyPredictor, optional): Fixed model
+        max_batch_size (int): Patients that trigger an immediate flush
+        max_latency (float): Seconds the oldest pending request may wait
+        registry (CoefficientRegistry, optional): Serve its active version
+            instead, following hot-swaps without a restart
+        profiler (StageProfiler, optional): Exported at GET /metrics; defaults
+            to the profiler of the registry or predictor. It is attached to
+            the default predictor, but not to one passed in.
+        """
+        if predictor is None and registry is None:
+            predictor = LiteratureBasedMalignancyPredictor(profiler=profiler)
+        if profiler is None:
+            profiler = (registry if registry is not None else predictor).profiler
+        self.profiler = profiler
+        self.registry = registry
+        self.batcher = MicroBatcher(predictor, max_batch_size, max_latency, registry=registry)
+        self._routes = {
+            ('GET', '/health'): self._health,
+            ('GET', '/model'): self._model,
+            ('GET', '/metrics'): self._metrics,
+            ('POST', '/predict_proba'): self._predict_proba,
+            ('POST', '/predict_risk_category'): self._predict_risk_category
+        }
+        if registry is not None:
+            self._routes[('GET', '/model/versions')] = self._model_versions
+
+    @property
+    def predictor(self):
+        """Model currently serving requests"""
+        return self.batcher.predictor
+
+    async def handle(self, method, path, body=b''):
+        """
+        Serve one request
+
+        Returns:
+        tuple: (HTTP status, JSON-serializable payload, or str for plain text)
+        """
+        route = self._routes.get((method, path.split('?', 1)[0]))
+        if route is None:
+            known_path = any(route_path == path for _, route_path in self._routes)
+            if known_path:
+                return HTTPStatus.METHOD_NOT_ALLOWED, {'error': f"{method} not allowed on {path}"}
+            return HTTPStatus.NOT_FOUND, {'error': f"Unknown path {path}"}
+        try:
+            return HTTPStatus.OK, await route(body)
+        except ServiceError as error:
+            return error.status, {'error': str(error)}
+
+    async def _health(self, body):
+        return {'status': 'ok'}
+
+    async def _model(self, body):
+        return self.predictor.get_model_explanation()
+
+    async def _metrics(self, body):
+        counters = [
+            ('service_batches_total', 'counter', "Micro-batches scored", self.batcher.n_batches),
+            ('service_patients_total', 'counter', "Patients scored", self.batcher.n_patients)
+        ]
+        # Without a profiler only the service counters are exported
+        exporter = self.profiler if self.profiler is not None else StageProfiler()
+        return exporter.to_prometheus(counters)
+
+    async def _model_versions(self, body):
+        name, version = self.registry.active_version()
+        return {
+            'active': f"{name}/{version}",
+            'versions': [f"{name}/{version}" for name, version in self.registry.versions()]
+        }
+
+    async def _score_payload(self, body):
+        """Validate a single-patient or batch payload and score it through the batcher"""
+        try:
+            payload = json.loads(body)
+        except (ValueError, UnicodeDecodeError):
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "Body must be valid JSON")
+
+        if isinstance(payload, list):
+            if len(payload) > MAX_BATCH_PATIENTS:
+                raise ServiceError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                   f"At most {MAX_BATCH_PATIENTS:,} patients per request")
+            for index, record in enumerate(payload):
+                validate_patient(record, index)
+            records = payload
+        else:
+            validate_patient(payload)
+            records = [payload]
+
+        if len(records) >= self.batcher.max_batch_size:
+            # Already a full batch: no point waiting for others
+            result = self.batcher.score(records)
+        else:
+            result = await self.batcher.submit(records)
+        return result, isinstance(payload, list)
+
+    async def _predict_proba(self, body):
+        result, is_batch = await self._score_payload(body)
+        responses = [{'probability': probability} for probability in result.probabilities.tolist()]
+        return responses if is_batch else responses[0]
+
+    async def _predict_risk_category(self, body):
+        result, is_batch = await self._score_payload(body)
+        responses = result.to_list()
+        for response in responses:
+            response['probability'] = float(response['probability'])
+        return responses if is_batch else responses[0]
+
+    async def _handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests (keep-alive) on one connection"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, path, version = lines[0].split(' ', 2)
+                except ValueError:
+                    await _write_response(writer, HTTPStatus.BAD_REQUEST,
+                                          {'error': "Malformed request line"}, keep_alive=False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(':')
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    await _write_response(writer, HTTPStatus.BAD_REQUEST,
+                                          {'error': "Content-Length must be a non-negative integer"},
+                                          keep_alive=False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await _write_response(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                          {'error': "Request body too large"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                try:
+                    status, payload = await self.handle(method, path, body)
+                except Exception as error:
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': repr(error)}
+                await _write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=8080):
+        """Start listening; returns the asyncio.Server (port=0 picks a free port)"""
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+
+async def _write_response(writer, status, payload, keep_alive=True):
+    """Send a JSON response (or a Prometheus text one when the payload is a str)"""
+    if isinstance(payload, str):
+        body, content_type = payload.encode('utf-8'), PROMETHEUS_CONTENT_TYPE
+    else:
+        body, content_type = json.dumps(payload).encode('utf-8'), 'application/json'
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode('latin-1') + body)
+    await writer.drain()
+
+
+class InProcessClient:
+    """
+    Calls a ScoringService without sockets
+
+    Requests go through the same routing, validation, micro-batching and JSON
+    encoding as over HTTP, so concurrent calls (asyncio.gather) are batched too.
+    """
+
+    def __init__(self, service):
+        self.service = service
+
+    async def request(self, method, path, payload=None):
+        """
+        Returns:
+        tuple: (status code, decoded JSON response, or the text of GET /metrics)
+        """
+        body = b'' if payload is None else json.dumps(payload).encode('utf-8')
+        status, response = await self.service.handle(method, path, body)
+        return int(status), json.loads(json.dumps(response))
+
+    async def get(self, path):
+        return await self.request('GET', path)
+
+    async def post(self, path, payload):
+        return await self.request('POST', path, payload)
+
+
+async def serve(host, port, max_batch_size, max_latency, predictor=None, registry=None,
+                profiler=None):
+    service = ScoringService(predictor, max_batch_size=max_batch_size, max_latency=max_latency,
+                             registry=registry, profiler=profiler)
+    server = await service.start(host, port)
+    address = server.sockets[0].getsockname()
+    print(f"SalivAI scoring service listening on http://{address[0]}:{address[1]}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the SalivAI predictor over HTTP")
+    parser.add_argument('--host', default='127.0.0.1', help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8080, help="Port (default: 8080)")
+    parser.add_argument('--max-batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                        help=f"Patients per micro-batch (default: {DEFAULT_MAX_BATCH_SIZE})")
+    parser.add_argument('--max-latency-ms', type=float, default=DEFAULT_MAX_LATENCY * 1000,
+                        help=f"Micro-batch window in ms (default: {DEFAULT_MAX_LATENCY * 1000:g})")
+    parser.add_argument('--audit-log', help="Append every prediction to this JSONL audit log")
+    parser.add_argument('--registry', default=DEFAULT_DIRECTORY,
+                        help="Coefficient registry directory; the service follows its active "
+                             "version (default: coefficient_sets)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Time every scoring stage and export the timings at GET /metrics")
+    args = parser.parse_args(argv)
+
+    audit_logger = None
+    if args.audit_log:
+        from audit_log import AuditLogger
+        audit_logger = AuditLogger(args.audit_log, source='service')
+    profiler = StageProfiler() if args.profile else None
+    registry = CoefficientRegistry(args.registry, audit_logger=audit_logger, profiler=profiler)
+    name, version = registry.active_version()
+    print(f"Serving coefficient set {name}/{version}")
+    try:
+        asyncio.run(serve(args.host, args.port, args.max_batch_size, args.max_latency_ms / 1000,
+                          registry=registry))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if audit_logger is not None:
+            audit_logger.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+SalivAI - Scoring Stage Profiler
+Per-stage wall time, rows and batch sizes of the scoring pipeline
+
+Attach a StageProfiler to LiteratureBasedMalignancyPredictor (profiler=...)
+and every scoring call records how long each stage took and how many rows
+it processed:
+- 'encode': DataFrame or category codes -> design matrix (or lookup indices)
+- 'dedup': distinct (age, profile) pairs found (dedup=True calls only)
+- 'linear': design matrix @ weights + intercept
+- 'sigmoid': log-odds -> probabilities
+- 'lookup': probabilities and risk codes gathered from the lookup table
+- 'categorize': probabilities -> risk category codes
+- 'output': per-patient dicts or result columns built from the arrays
+
+Without a profiler the predictor only checks `self.profiler is None` once
+per stage (see benchmarks/bench_profiling.py for the measured overhead).
+Code outside the predictor times its own steps the same way with
+predictor.profiled(stage, rows, func, *args), as batch_scoring and arrow_io
+do for their output columns.
+
+Per stage the profiler keeps call and row totals plus two histograms, call
+duration and batch size (rows per call). snapshot() returns them as a dict,
+to_prometheus() as Prometheus text exposition, served by the scoring
+service at GET /metrics and written by batch_scoring.py --metrics.
+Hooks registered with add_hook() are called as hook(stage, seconds, rows)
+after every record, e.g. to forward timings to another metrics system.
+
+Usage:
+    from stage_profiler import StageProfiler
+
+    profiler = StageProfiler()
+    predictor = LiteratureBasedMalignancyPredictor(profiler=profiler)
+    predictor.predict_risk_category(X)
+    profiler.snapshot()['encode']['seconds']
+    print(profiler.to_prometheus())
+"""
+
+import bisect
+import os
+import tempfile
+import threading
+import warnings
+
+STAGES = ('encode', 'dedup', 'linear', 'sigmoid', 'lookup', 'categorize', 'output')
+
+# Upper bounds (seconds) of the call-duration histogram buckets
+DEFAULT_DURATION_BUCKETS = (1e-5, 1e-4, 1e-3, 1e-2, 0.1, 1.0, 10.0)
+
+# Upper bounds (rows per call) of the batch-size histogram buckets
+DEFAULT_BATCH_BUCKETS = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _label_value(value):
+    """Escape a Prometheus label value"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _cumulative(counts, bounds):
+    """Histogram bucket counts as {upper bound: cumulative count}, ending with '+Inf'"""
+    buckets = {}
+    total = 0
+    for bound, count in zip(list(bounds) + ['+Inf'], counts):
+        total += count
+        buckets[bound] = total
+    return buckets
+
+
+class StageProfiler:
+    """
+    Thread-safe per-stage timing totals and histograms
+
+    record() takes a lock only to update a few counters; the histogram
+    buckets are located before the lock is taken.
+    """
+
+    def __init__(self, duration_buckets=DEFAULT_DURATION_BUCKETS,
+                 batch_buckets=DEFAULT_BATCH_BUCKETS, namespace='salivai'):
+        """
+        Parameters:
+        duration_buckets (tuple): Increasing upper bounds (seconds) of the duration histogram
+        batch_buckets (tuple): Increasing upper bounds (rows) of the batch-size histogram
+        namespace (str): Prefix of the exported metric names
+        """
+        self.duration_buckets = tuple(duration_buckets)
+        self.batch_buckets = tuple(batch_buckets)
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._hooks = ()
+        self.reset()
+
+    def reset(self):
+        """Forget everything recorded so far (hooks stay registered)"""
+        with self._lock:
+            self._stats = {}
+
+    def add_hook(self, hook):
+        """
+        Call hook(stage, seconds, rows) after every record
+
+        A hook that raises is reported as a warning and never fails the
+        scoring call. Returns the hook, so this works as a decorator.
+        """
+        with self._lock:
+            self._hooks = self._hooks + (hook,)
+        return hook
+
+    def remove_hook(self, hook):
+        """Stop calling a hook registered with add_hook"""
+        with self._lock:
+            self._hooks = tuple(registered for registered in self._hooks if registered is not hook)
+
+    def record(self, stage, seconds, rows):
+        """
+        Add one call of a stage
+
+        Parameters:
+        stage (str): Stage name (see STAGES; other names are accepted)
+        seconds (float): Wall time of the call
+        rows (int): Rows processed by the call
+        """
+        duration_bucket = bisect.bisect_left(self.duration_buckets, seconds)
+        batch_bucket = bisect.bisect_left(self.batch_buckets, rows)
+        with self._lock:
+            stats = self._stats.get(stage)
+            if stats is None:
+                stats = self._stats[stage] = {
+                    'calls': 0,
+                    'seconds': 0.0,
+                    'rows': 0,
+                    'duration_counts': [0] * (len(self.duration_buckets) + 1),
+                    'batch_counts': [0] * (len(self.batch_buckets) + 1)
+                }
+            stats['calls'] += 1
+            stats['seconds'] += seconds
+            stats['rows'] += rows
+            stats['duration_counts'][duration_bucket] += 1
+            stats['batch_counts'][batch_bucket] += 1
+            hooks = self._hooks
+
+        for hook in hooks:
+            try:
+                hook(stage, seconds, rows)
+            except Exception as error:
+                warnings.warn(f"Profiler hook {hook!r} failed: {error!r}", RuntimeWarning)
+
+    def snapshot(self):
+        """
+        Totals and histograms recorded so far
+
+        Returns:
+        dict: stage -> {'calls', 'seconds', 'rows', 'duration_buckets',
+            'batch_buckets'}, the buckets as {upper bound: cumulative count}
+            ending with '+Inf'; stages in STAGES order, then any others
+        """
+        with self._lock:
+            stats = {
+                stage: dict(values, duration_counts=list(values['duration_counts']),
+                            batch_counts=list(values['batch_counts']))
+                for stage, values in self._stats.items()
+            }
+        order = [stage for stage in STAGES if stage in stats]
+        order += sorted(stage for stage in stats if stage not in STAGES)
+        return {
+            stage: {
+                'calls': stats[stage]['calls'],
+                'seconds': stats[stage]['seconds'],
+                'rows': stats[stage]['rows'],
+                'duration_buckets': _cumulative(stats[stage]['duration_counts'],
+                                                self.duration_buckets),
+                'batch_buckets': _cumulative(stats[stage]['batch_counts'], self.batch_buckets)
+            }
+            for stage in order
+        }
+
+    def to_prometheus(self, extra_metrics=None):
+        """
+        Prometheus text exposition (version 0.0.4) of the snapshot
+
+        Exports <namespace>_stage_duration_seconds (histogram of call
+        durations; _sum is the total wall time, _count the calls) and
+        <namespace>_stage_batch_rows (histogram of rows per call; _sum is the
+        rows processed), both labelled by stage.
+
+        Parameters:
+        extra_metrics (list, optional): (name, type, help, value) tuples
+            appended as unlabelled metrics, e.g. the service's request counters
+        """
+        snapshot = self.snapshot()
+        lines = []
+        histograms = (
+            ('stage_duration_seconds', 'duration_buckets', 'seconds',
+             "Wall time of each scoring stage call"),
+            ('stage_batch_rows', 'batch_buckets', 'rows',
+             "Rows processed per scoring stage call")
+        )
+        for suffix, buckets_key, sum_key, help_text in histograms:
+            name = f"{self.namespace}_{suffix}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for stage, stats in snapshot.items():
+                label = f'stage="{_label_value(stage)}"'
+                for bound, count in stats[buckets_key].items():
+                    lines.append(f'{name}_bucket{{{label},le="{bound}"}} {count}')
+                lines.append(f"{name}_sum{{{label}}} {stats[sum_key]!r}")
+                lines.append(f"{name}_count{{{label}}} {stats['calls']}")
+
+        for name, metric_type, help_text, value in extra_metrics or []:
+            name = f"{self.namespace}_{name}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.append(f"{name} {value!r}")
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """
+        Write to_prometheus() to a file atomically
+
+        Suits the node_exporter textfile collector, which must never read a
+        half-written file.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        handle, temporary = tempfile.mkstemp(dir=directory, prefix='.metrics-', suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'w', encoding='utf-8') as output:
+                output.write(self.to_prometheus())
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def summary_lines(self):
+        """One human-readable line per stage: calls, rows, total and per-row time"""
+        lines = []
+        for stage, stats in self.snapshot().items():
+            per_row = stats['seconds'] / stats['rows'] * 1e9 if stats['rows'] else 0.0
+            lines.append(f"  {stage:<11}{stats['calls']:>8,} calls{stats['rows']:>14,} rows"
+                         f"{stats['seconds']:>10.3f} s{per_row:>10.1f} ns/row")
+        return lines
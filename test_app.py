@@ -0,0 +1,79 @@
+"""
+Tests for app.py, run headless with Streamlit's AppTest
+"""
+
+import os
+import time
+
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+import app
+from audit_log import iter_audit_records
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+
+
+@pytest.fixture
+def fresh_caches():
+    # The registry (and its audit logger) is a cached resource shared by every run
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    yield
+    st.cache_resource.clear()
+    st.cache_data.clear()
+
+
+def wait_for_records(path, n_records, timeout=5.0):
+    """Audit records once the background writer has flushed n_records (or the timeout ran out)"""
+    deadline = time.monotonic() + timeout
+    while True:
+        records = list(iter_audit_records(path)) if os.path.exists(path) else []
+        if len(records) >= n_records or time.monotonic() > deadline:
+            return records
+        time.sleep(0.1)
+
+
+def test_every_assessment_reaches_the_audit_log(tmp_path, monkeypatch, fresh_caches):
+    log_path = str(tmp_path / 'predictions.jsonl')
+    monkeypatch.setenv('SALIVAI_AUDIT_LOG', log_path)
+    app = AppTest.from_file(APP_PATH, default_timeout=60).run()
+    assert not app.exception
+    # The rerun reuses the memoized interval and explanation but is still scored and logged
+    app.run()
+    assert not app.exception
+
+    records = wait_for_records(log_path, 2)
+    assert len(records) == 2
+    assert records[0]['model_version'] == records[1]['model_version']
+    assert records[0]['probability'] == records[1]['probability']
+
+
+def test_changed_inputs_are_assessed(tmp_path, monkeypatch, fresh_caches):
+    log_path = str(tmp_path / 'predictions.jsonl')
+    monkeypatch.setenv('SALIVAI_AUDIT_LOG', log_path)
+    app = AppTest.from_file(APP_PATH, default_timeout=60).run()
+    location = next(box for box in app.selectbox if box.label == "Tumor Location")
+    location.select('minor').run()
+    assert not app.exception
+
+    records = wait_for_records(log_path, 2)
+    assert len(records) == 2
+    assert records[0]['probability'] != records[1]['probability']
+
+
+def test_sweep_removes_only_stale_results(tmp_path, monkeypatch):
+    monkeypatch.setattr(app.tempfile, 'tempdir', str(tmp_path))
+    stale, fresh, other = (tmp_path / name for name in (app.RESULTS_PREFIX + 'old.csv',
+                                                        app.RESULTS_PREFIX + 'new.csv',
+                                                        'unrelated.csv'))
+    for path in (stale, fresh, other):
+        path.write_text('age\n')
+    old = time.time() - app.RESULTS_MAX_AGE - 60
+    os.utime(stale, (old, old))
+    os.utime(other, (old, old))
+
+    app.sweep_stale_results()
+    assert not stale.exists()
+    assert fresh.exists() and other.exists()
@@ -0,0 +1,83 @@
+"""
+Tests for arrow_io.py
+"""
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from arrow_io import score_arrow, score_parquet
+from batch_scoring import INTERVAL_COLUMNS, RESULT_COLUMNS
+from salivary_gland_malignancy_predictor import LiteratureBasedMalignancyPredictor, create_sample_data
+from schema_validation import SchemaValidationError
+
+
+@pytest.fixture
+def cohort_parquet(tmp_path):
+    X, _ = create_sample_data(1000)
+    path = str(tmp_path / 'patients.parquet')
+    X.to_parquet(path)
+    return X, path
+
+
+def test_arrow_table_matches_predict_proba(cohort_parquet):
+    X, _ = cohort_parquet
+    result = score_arrow(pa.Table.from_pandas(X))
+    np.testing.assert_allclose(result.probabilities,
+                               LiteratureBasedMalignancyPredictor().predict_proba(X),
+                               rtol=0, atol=1e-12)
+
+
+def test_parquet_matches_predict_proba(cohort_parquet, tmp_path):
+    X, input_path = cohort_parquet
+    output_path = str(tmp_path / 'scored.parquet')
+    stats = score_parquet(input_path, output_path, batch_size=300)
+    assert stats['rows'] == len(X) and stats['chunks'] == 4
+
+    scored = pq.read_table(output_path).to_pandas()
+    predictor = LiteratureBasedMalignancyPredictor()
+    np.testing.assert_allclose(scored['malignancy_probability'], predictor.predict_proba(X),
+                               rtol=0, atol=1e-12)
+    assert scored['risk_category'].tolist() == [
+        row['risk_category'] for row in predictor.predict_risk_category(X)
+    ]
+
+
+def test_empty_input_has_the_scored_schema(cohort_parquet, tmp_path):
+    X, input_path = cohort_parquet
+    empty_path = str(tmp_path / 'empty.parquet')
+    X.iloc[:0].to_parquet(empty_path)
+    options = {'interval_level': 0.95, 'explain': 2}
+
+    score_parquet(input_path, str(tmp_path / 'scored.parquet'), **options)
+    stats = score_parquet(empty_path, str(tmp_path / 'scored_empty.parquet'), **options)
+    assert stats['rows'] == 0
+
+    expected = pq.read_table(tmp_path / 'scored.parquet').schema
+    schema = pq.read_table(tmp_path / 'scored_empty.parquet').schema
+    assert schema.remove_metadata().equals(expected.remove_metadata())
+    for column in RESULT_COLUMNS[1:]:
+        assert pa.types.is_dictionary(schema.field(column).type)
+    assert set(INTERVAL_COLUMNS) <= set(schema.names)
+
+
+def test_missing_and_out_of_range_ages(cohort_parquet, tmp_path):
+    X, _ = cohort_parquet
+    X = X.iloc[:10].copy()
+    X['age'] = X['age'].astype(float)
+    X.loc[2, 'age'] = np.nan
+    X.loc[5, 'age'] = 150.0
+    input_path = str(tmp_path / 'patients.parquet')
+    X.to_parquet(input_path)
+
+    score_parquet(input_path, str(tmp_path / 'scored.parquet'))
+    probabilities = pq.read_table(tmp_path / 'scored.parquet')['malignancy_probability']
+    assert np.isnan(probabilities.to_numpy()).tolist() == [row == 2 for row in range(10)]
+
+    stats = score_parquet(input_path, str(tmp_path / 'dropped.parquet'), validate='drop')
+    assert stats['validation'].invalid_rows.tolist() == [2, 5]
+    assert pq.read_metadata(tmp_path / 'dropped.parquet').num_rows == 8
+
+    with pytest.raises(SchemaValidationError):
+        score_parquet(input_path, str(tmp_path / 'strict.parquet'), validate='strict')
@@ -0,0 +1,44 @@
+"""
+Tests for audit_log.py
+"""
+
+import os
+
+from audit_log import AuditLogger, iter_audit_records, replay_audit_log
+from coefficient_registry import CoefficientRegistry
+from salivary_gland_malignancy_predictor import LiteratureBasedMalignancyPredictor, create_sample_data
+from scoring_core import LITERATURE_COEFFICIENTS
+
+
+def test_replay_of_registry_written_log(tmp_path):
+    log_path = str(tmp_path / 'predictions.jsonl')
+    logger = AuditLogger(log_path, source='test')
+    registry = CoefficientRegistry(str(tmp_path / 'sets'), audit_logger=logger)
+    registry.save('literature', '1', LITERATURE_COEFFICIENTS)
+    registry.activate('literature', '1')
+    X, _ = create_sample_data(100)
+    registry.active().predict_risk_category_columnar(X)
+    logger.close()
+
+    versions = {record['model_version'] for record in iter_audit_records(log_path)}
+    assert len(versions) == 1 and versions.pop().startswith('literature-v1-')
+
+    # A bare predictor has the same coefficients but another model_version prefix
+    stats = replay_audit_log(log_path, LiteratureBasedMalignancyPredictor())
+    assert stats['n_compared'] == 100
+    assert stats['n_skipped'] == 0
+    assert stats['max_abs_difference'] < 1e-12
+    assert stats['n_category_mismatches'] == 0
+
+
+def test_replay_skips_other_coefficients(tmp_path):
+    log_path = os.path.join(str(tmp_path), 'predictions.jsonl')
+    logger = AuditLogger(log_path)
+    X, _ = create_sample_data(20)
+    LiteratureBasedMalignancyPredictor(audit_logger=logger).predict_proba(X)
+    logger.close()
+
+    coefficients = dict(LITERATURE_COEFFICIENTS, intercept=-3.0)
+    stats = replay_audit_log(log_path, LiteratureBasedMalignancyPredictor(coefficients=coefficients))
+    assert stats['n_compared'] == 0
+    assert stats['n_skipped'] == 20
@@ -0,0 +1,83 @@
+"""
+Tests for batch_scoring.py
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import batch_scoring
+from batch_scoring import RESULT_COLUMNS, main, score_csv
+from salivary_gland_malignancy_predictor import LiteratureBasedMalignancyPredictor, create_sample_data
+from scoring_core import LITERATURE_COEFFICIENTS
+
+
+@pytest.fixture
+def cohort_csv(tmp_path):
+    X, y = create_sample_data(500)
+    X['outcome'] = y
+    path = tmp_path / 'patients.csv'
+    X.to_csv(path, index=False)
+    return X, str(path)
+
+
+def test_matches_predict_proba(cohort_csv, tmp_path):
+    X, input_path = cohort_csv
+    output_path = str(tmp_path / 'results.csv')
+    stats = score_csv(input_path, output_path, chunksize=128)
+    assert stats['rows'] == len(X) and stats['chunks'] == 4
+
+    results = pd.read_csv(output_path)
+    predictor = LiteratureBasedMalignancyPredictor()
+    np.testing.assert_allclose(results['malignancy_probability'], predictor.predict_proba(X),
+                               rtol=0, atol=1e-12)
+    expected = [row['risk_category'] for row in predictor.predict_risk_category(X)]
+    assert results['risk_category'].tolist() == expected
+
+
+def test_missing_age_scores_nan_unless_validated(tmp_path):
+    X, _ = create_sample_data(10)
+    X['age'] = X['age'].astype(float)
+    X.loc[3, 'age'] = np.nan
+    input_path = str(tmp_path / 'patients.csv')
+    X.to_csv(input_path, index=False)
+
+    score_csv(input_path, str(tmp_path / 'scored.csv'))
+    probabilities = pd.read_csv(tmp_path / 'scored.csv')['malignancy_probability']
+    assert probabilities.isna().tolist() == [row == 3 for row in range(10)]
+
+    stats = score_csv(input_path, str(tmp_path / 'dropped.csv'), validate='drop')
+    assert stats['validation'].n_invalid == 1
+    assert len(pd.read_csv(tmp_path / 'dropped.csv')) == 9
+
+
+def test_empty_input(tmp_path):
+    X, _ = create_sample_data(5)
+    input_path = str(tmp_path / 'empty.csv')
+    X.iloc[:0].to_csv(input_path, index=False)
+    output_path = str(tmp_path / 'results.csv')
+
+    stats = score_csv(input_path, output_path)
+    assert stats['rows'] == 0
+    results = pd.read_csv(output_path)
+    assert results.empty
+    assert results.columns.tolist() == X.columns.tolist() + RESULT_COLUMNS
+
+
+def test_report_describes_the_scoring_predictor(cohort_csv, tmp_path, monkeypatch):
+    coefficients = dict(LITERATURE_COEFFICIENTS, intercept=-1.5)
+    monkeypatch.setattr(batch_scoring, 'LiteratureBasedMalignancyPredictor',
+                        lambda **kwargs: LiteratureBasedMalignancyPredictor(
+                            coefficients=coefficients, **kwargs))
+    _, input_path = cohort_csv
+    report_path = tmp_path / 'report.json'
+    main([input_path, str(tmp_path / 'results.csv'), '--report', str(report_path),
+          '--label-column', 'outcome'])
+
+    report = json.loads(report_path.read_text())
+    assert report['model_info']['coefficients']['intercept'] == -1.5
+    expected = LiteratureBasedMalignancyPredictor(coefficients=coefficients)
+    assert report['model_info']['model_version'] == expected.model_version
+    assert 'performance_metrics' in report
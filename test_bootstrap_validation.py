@@ -0,0 +1,57 @@
+"""
+Tests for bootstrap_validation.py
+"""
+
+import numpy as np
+import pytest
+
+from bootstrap_validation import bootstrap_validation
+from validation_metrics import ROCAnalysis
+
+
+def labelled_cohort(n_rows=3000, random_state=0):
+    rng = np.random.default_rng(random_state)
+    scores = rng.random(n_rows).round(2)
+    return (rng.random(n_rows) < scores).astype(np.float64), scores
+
+
+def test_estimates_match_roc_analysis():
+    labels, scores = labelled_cohort()
+    result = bootstrap_validation(labels, scores, n_resamples=50, n_workers=1, random_state=0)
+    roc = ROCAnalysis(labels, scores)
+    assert result.estimates['auc'] == pytest.approx(roc.auc(), abs=1e-12)
+    for metric, value in roc.metrics_at(0.5).items():
+        if metric in result.estimates:
+            assert result.estimates[metric] == pytest.approx(value, abs=1e-12)
+
+
+def test_reproducible_whatever_the_block_size():
+    labels, scores = labelled_cohort()
+    first = bootstrap_validation(labels, scores, n_resamples=300, n_workers=1, random_state=7)
+    second = bootstrap_validation(labels, scores, n_resamples=300, n_workers=1, random_state=7,
+                                  block_bytes=64 * 1024)
+    assert first.n_resamples == 300
+    for metric, values in first.samples.items():
+        np.testing.assert_array_equal(values, second.samples[metric])
+
+
+def test_missing_labels_are_left_out():
+    labels, scores = labelled_cohort()
+    with_missing = labels.copy()
+    with_missing[::7] = np.nan
+    known = ~np.isnan(with_missing)
+
+    result = bootstrap_validation(with_missing, scores, n_resamples=100, n_workers=1,
+                                  random_state=3)
+    expected = bootstrap_validation(labels[known], scores[known], n_resamples=100, n_workers=1,
+                                    random_state=3)
+    assert result.estimates == expected.estimates
+    for metric, values in result.samples.items():
+        np.testing.assert_array_equal(values, expected.samples[metric])
+
+
+def test_single_class_and_shape_mismatch():
+    with pytest.raises(ValueError, match='one class'):
+        bootstrap_validation([1, 1, np.nan], [0.2, 0.4, 0.6], n_resamples=10, n_workers=1)
+    with pytest.raises(ValueError):
+        bootstrap_validation([1, 0], [0.5], n_resamples=10, n_workers=1)
@@ -0,0 +1,72 @@
+"""
+Tests for coefficient_registry.py
+"""
+
+import json
+
+import pytest
+
+from coefficient_registry import DEFAULT_DIRECTORY, CoefficientRegistry, RegistryError
+from scoring_core import LITERATURE_COEFFICIENTS, LITERATURE_ODDS_RATIO_CIS
+
+
+@pytest.fixture
+def registry(tmp_path):
+    registry = CoefficientRegistry(str(tmp_path), poll_interval=0)
+    registry.save('literature', '1', LITERATURE_COEFFICIENTS,
+                  odds_ratio_confidence_intervals=LITERATURE_ODDS_RATIO_CIS)
+    return registry
+
+
+def edit_stored_set(registry, name, version, edit):
+    """Change a stored set by hand, as an editor would, keeping its checksum"""
+    path = registry.path(name, version)
+    with open(path, encoding='utf-8') as handle:
+        document = json.load(handle)
+    edit(document)
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(document, handle)
+
+
+def test_shipped_sets_validate():
+    registry = CoefficientRegistry(DEFAULT_DIRECTORY)
+    for name, version in registry.versions():
+        registry.load(name, version)
+
+
+def test_activate_and_version(registry):
+    registry.activate('literature', '1')
+    predictor = registry.active()
+    assert predictor.model_version.startswith('literature-v1-')
+    assert predictor.literature_coefficients == LITERATURE_COEFFICIENTS
+
+
+def test_edited_coefficients_are_rejected(registry):
+    edit_stored_set(registry, 'literature', '1',
+                    lambda document: document['coefficients'].update(intercept=-1.0))
+    with pytest.raises(RegistryError, match='Checksum mismatch'):
+        registry.activate('literature', '1')
+
+
+def test_edited_confidence_intervals_are_rejected(registry):
+    edit_stored_set(registry, 'literature', '1',
+                    lambda document: document['odds_ratio_confidence_intervals'].update(
+                        age=[0.01, 100]))
+    with pytest.raises(RegistryError, match='Checksum mismatch'):
+        registry.activate('literature', '1')
+
+
+def test_versions_are_immutable(registry):
+    with pytest.raises(RegistryError, match='immutable'):
+        registry.save('literature', '1', LITERATURE_COEFFICIENTS)
+
+
+def test_overwriting_the_active_version_swaps_it_in(registry, tmp_path):
+    other_process = CoefficientRegistry(str(tmp_path), poll_interval=0)
+    registry.activate('literature', '1')
+    assert other_process.active().literature_coefficients == LITERATURE_COEFFICIENTS
+
+    coefficients = dict(LITERATURE_COEFFICIENTS, intercept=-1.0)
+    registry.save('literature', '1', coefficients, overwrite=True)
+    assert registry.active().literature_coefficients == coefficients
+    assert other_process.active().literature_coefficients == coefficients
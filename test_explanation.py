@@ -0,0 +1,65 @@
+"""
+Tests for explanation.py
+"""
+
+import numpy as np
+import pytest
+
+from explanation import explanation_column_names, top_drivers
+from salivary_gland_malignancy_predictor import LiteratureBasedMalignancyPredictor, create_sample_data
+from scoring_core import FEATURE_NAMES
+
+
+@pytest.fixture(scope='module')
+def cohort():
+    X, _ = create_sample_data(500)
+    return X
+
+
+def test_contributions_add_up_to_predict_proba(cohort):
+    predictor = LiteratureBasedMalignancyPredictor()
+    explanation = predictor.explain(cohort)
+    assert explanation.contributions.shape == (len(cohort), len(FEATURE_NAMES))
+    np.testing.assert_allclose(explanation.intercept + explanation.contributions.sum(axis=1),
+                               explanation.total, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(explanation.probabilities, predictor.predict_proba(cohort),
+                               rtol=0, atol=1e-12)
+
+
+def test_top_k_drivers_are_the_largest(cohort):
+    predictor = LiteratureBasedMalignancyPredictor()
+    contributions = predictor.explain(cohort).contributions
+    explanation = predictor.explain(cohort, top_k=3)
+    expected = -np.sort(-np.abs(contributions), axis=1)[:, :3]
+    np.testing.assert_array_equal(np.abs(explanation.contributions), expected)
+    np.testing.assert_array_equal(
+        np.take_along_axis(contributions, explanation.drivers.astype(np.intp), axis=1),
+        explanation.contributions
+    )
+    assert explanation.to_frame().columns.tolist() == explanation_column_names(3)
+
+
+def test_zero_contributions_have_no_driver():
+    indices, values = top_drivers(np.array([[0.0, 2.0, 0.0, -3.0]]), 3)
+    assert indices[0, :2].tolist() == [3, 1]
+    assert values[0, 2] == 0
+
+
+def test_missing_age_and_empty_input(cohort):
+    predictor = LiteratureBasedMalignancyPredictor()
+    X = cohort.iloc[:3].copy()
+    X.loc[X.index[1], 'age'] = np.nan
+    explanation = predictor.explain(X)
+    assert np.isnan(explanation.contributions[1, 0])
+    assert not np.isnan(explanation.contributions[1, 1:]).any()
+
+    empty = predictor.explain(cohort.iloc[:0], top_k=2)
+    assert len(empty) == 0
+    assert empty.to_frame().columns.tolist() == explanation_column_names(2)
+
+
+def test_top_k_out_of_range():
+    with pytest.raises(ValueError):
+        top_drivers(np.zeros((2, len(FEATURE_NAMES))), 0)
+    with pytest.raises(ValueError):
+        top_drivers(np.zeros((2, len(FEATURE_NAMES))), len(FEATURE_NAMES) + 1)
@@ -0,0 +1,92 @@
+"""
+Tests for packed_profiles.py
+"""
+
+import numpy as np
+import pytest
+
+import packed_profiles
+from packed_profiles import (
+    MISSING_AGE,
+    PACKED_DTYPE,
+    load_packed,
+    main,
+    pack,
+    pack_csv,
+    save_packed,
+    unpack
+)
+from salivary_gland_malignancy_predictor import (
+    FeatureEncoder,
+    LiteratureBasedMalignancyPredictor,
+    create_sample_data
+)
+
+
+@pytest.fixture(scope='module')
+def cohort():
+    X, _ = create_sample_data(3000)
+    X['age'] = X['age'].round()
+    return X
+
+
+def test_round_trip(cohort):
+    ages, codes = FeatureEncoder.ages(cohort), FeatureEncoder.codes(cohort)
+    unpacked_ages, unpacked_codes = unpack(pack(ages, codes))
+    np.testing.assert_array_equal(unpacked_ages, ages)
+    for column, values in codes.items():
+        np.testing.assert_array_equal(unpacked_codes[column], values)
+
+
+def test_scores_match_predict_proba(cohort):
+    predictor = LiteratureBasedMalignancyPredictor()
+    result = predictor.predict_risk_category_packed(predictor.pack(cohort))
+    expected = predictor.predict_risk_category_columnar(cohort)
+    np.testing.assert_allclose(result.probabilities, expected.probabilities, rtol=1e-12, atol=0)
+    np.testing.assert_array_equal(result.codes, expected.codes)
+
+
+def test_missing_and_unstorable_ages(cohort):
+    X = cohort.iloc[:5].copy()
+    X['age'] = [np.nan, -1.0, 254.0, 255.0, 40.4]
+    packed = LiteratureBasedMalignancyPredictor().pack(X)
+    assert packed['age'].tolist() == [MISSING_AGE, MISSING_AGE, 254, MISSING_AGE, 40]
+    probabilities = LiteratureBasedMalignancyPredictor().predict_proba_packed(packed)
+    assert np.isnan(probabilities).tolist() == [True, True, False, True, False]
+
+
+def test_save_load_and_csv(cohort, tmp_path):
+    predictor = LiteratureBasedMalignancyPredictor()
+    packed = predictor.pack(cohort)
+    save_packed(str(tmp_path / 'cohort.npy'), packed)
+    loaded = load_packed(str(tmp_path / 'cohort.npy'))
+    assert isinstance(loaded, np.memmap)
+    np.testing.assert_array_equal(loaded, packed)
+
+    cohort.to_csv(tmp_path / 'cohort.csv', index=False)
+    assert pack_csv(str(tmp_path / 'cohort.csv'), str(tmp_path / 'from_csv.npy'), 700) == len(cohort)
+    np.testing.assert_array_equal(load_packed(str(tmp_path / 'from_csv.npy')), packed)
+
+    np.save(tmp_path / 'other.npy', np.zeros(3))
+    with pytest.raises(ValueError):
+        load_packed(str(tmp_path / 'other.npy'))
+
+
+def test_pack_csv_fills_the_file_in_place(cohort, tmp_path, monkeypatch):
+    # Chunks go straight into the memmap rather than through an in-memory copy
+    monkeypatch.setattr(packed_profiles, 'save_packed', None)
+    cohort.to_csv(tmp_path / 'cohort.csv', index=False)
+    assert pack_csv(str(tmp_path / 'cohort.csv'), str(tmp_path / 'cohort.npy'), 333) == len(cohort)
+    np.testing.assert_array_equal(load_packed(str(tmp_path / 'cohort.npy')),
+                                  LiteratureBasedMalignancyPredictor().pack(cohort))
+
+
+def test_empty_cohort(cohort, tmp_path):
+    predictor = LiteratureBasedMalignancyPredictor()
+    packed = predictor.pack(cohort.iloc[:0])
+    assert packed.dtype == PACKED_DTYPE and len(packed) == 0
+    assert len(predictor.predict_risk_category_packed(packed)) == 0
+
+    cohort.iloc[:0].to_csv(tmp_path / 'empty.csv', index=False)
+    main(['pack', str(tmp_path / 'empty.csv'), str(tmp_path / 'empty.npy')])
+    assert len(load_packed(str(tmp_path / 'empty.npy'))) == 0
@@ -0,0 +1,93 @@
+"""
+Tests for parallel_scoring.py
+"""
+
+import subprocess
+import sys
+import textwrap
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from batch_scoring import score_csv
+from parallel_scoring import ParallelScorer, _csv_shards
+from salivary_gland_malignancy_predictor import LiteratureBasedMalignancyPredictor, create_sample_data
+
+
+@pytest.fixture(scope='module')
+def cohort():
+    X, _ = create_sample_data(3000)
+    return X
+
+
+@pytest.mark.parametrize('backend', ['process', 'thread'])
+def test_dataframe_matches_predict_proba(cohort, backend):
+    with ParallelScorer(n_workers=2, backend=backend, shard_rows=700) as scorer:
+        result = scorer.predict_risk_category_columnar(cohort)
+    predictor = LiteratureBasedMalignancyPredictor()
+    np.testing.assert_allclose(result.probabilities, predictor.predict_proba(cohort),
+                               rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(result.codes,
+                                  predictor.predict_risk_category_columnar(cohort).codes)
+
+
+def test_csv_matches_batch_scoring(cohort, tmp_path):
+    input_path = str(tmp_path / 'patients.csv')
+    cohort.to_csv(input_path, index=False)
+    with ParallelScorer(n_workers=2, shard_bytes=16 * 1024) as scorer:
+        stats = scorer.score_csv(input_path, str(tmp_path / 'parallel.csv'))
+    score_csv(input_path, str(tmp_path / 'serial.csv'))
+    assert stats['rows'] == len(cohort) and stats['chunks'] > 1
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / 'parallel.csv'),
+                                  pd.read_csv(tmp_path / 'serial.csv'), rtol=0, atol=1e-12)
+
+
+def test_shared_blocks_are_left_to_the_parent(cohort, tmp_path):
+    # A worker tracking the parent's block would unlink it when it exits; the
+    # resource tracker runs in its own process, so check its stderr
+    input_path = tmp_path / 'patients.csv'
+    cohort.to_csv(input_path, index=False)
+    script = textwrap.dedent(f"""
+        import pandas as pd
+        from parallel_scoring import ParallelScorer
+        X = pd.read_csv({str(input_path)!r})
+        with ParallelScorer(n_workers=2, backend='process', shard_rows=700) as scorer:
+            scorer.score_csv({str(input_path)!r}, {str(tmp_path / 'results.csv')!r})
+            for _ in range(3):
+                scorer.predict_proba(X)
+    """)
+    completed = subprocess.run([sys.executable, '-W', 'error', '-c', script],
+                               capture_output=True, text=True, timeout=120)
+    assert completed.returncode == 0, completed.stderr
+    assert 'resource_tracker' not in completed.stderr
+    assert 'Traceback' not in completed.stderr
+
+
+def test_quoted_newlines_stay_in_their_row(cohort, tmp_path):
+    X = cohort.copy()
+    X['notes'] = np.where(np.arange(len(X)) % 3 == 0, 'seen twice\n"cystic", recheck', 'none')
+    input_path = str(tmp_path / 'patients.csv')
+    X.to_csv(input_path, index=False)
+
+    _, ranges = _csv_shards(input_path, 4096)
+    with open(input_path, 'rb') as handle:
+        data = handle.read()
+    assert all(data[start:end].count(b'"') % 2 == 0 for start, end in ranges)
+
+    with ParallelScorer(n_workers=2, backend='thread', shard_bytes=4096) as scorer:
+        scorer.score_csv(input_path, str(tmp_path / 'parallel.csv'))
+    results = pd.read_csv(tmp_path / 'parallel.csv')
+    assert results['notes'].tolist() == X['notes'].tolist()
+    np.testing.assert_allclose(results['malignancy_probability'],
+                               LiteratureBasedMalignancyPredictor().predict_proba(X),
+                               rtol=0, atol=1e-12)
+
+
+def test_empty_inputs(cohort, tmp_path):
+    input_path = str(tmp_path / 'empty.csv')
+    cohort.iloc[:0].to_csv(input_path, index=False)
+    with ParallelScorer(n_workers=2, backend='thread') as scorer:
+        assert len(scorer.predict_proba(cohort.iloc[:0])) == 0
+        assert scorer.score_csv(input_path, str(tmp_path / 'results.csv'))['rows'] == 0
+    assert pd.read_csv(tmp_path / 'results.csv').empty
@@ -0,0 +1,79 @@
+"""
+Tests for recalibration.py
+"""
+
+import numpy as np
+import pytest
+
+from recalibration import csv_chunks, frame_chunks, parquet_chunks, recalibrate
+from salivary_gland_malignancy_predictor import LiteratureBasedMalignancyPredictor, create_sample_data
+from scoring_core import LITERATURE_COEFFICIENTS
+
+
+@pytest.fixture(scope='module')
+def local_cohort():
+    """Outcomes drawn from the literature model with a shifted intercept"""
+    X, _ = create_sample_data(4000)
+    coefficients = dict(LITERATURE_COEFFICIENTS,
+                        intercept=LITERATURE_COEFFICIENTS['intercept'] + 0.8)
+    probabilities = LiteratureBasedMalignancyPredictor(coefficients=coefficients).predict_proba(X)
+    y = (np.random.default_rng(0).random(len(X)) < probabilities).astype(np.float64)
+    return X, y
+
+
+def refitted_proba(X, result):
+    return LiteratureBasedMalignancyPredictor(coefficients=result.coefficients).predict_proba(X)
+
+
+@pytest.mark.parametrize('mode', ['intercept', 'slope', 'full'])
+def test_fit_solves_the_score_equations(local_cohort, mode):
+    X, y = local_cohort
+    result = recalibrate(frame_chunks(X, y, chunksize=1000), mode=mode)
+    assert result.converged and result.n_rows == len(X)
+    # Converged on the deviance; the gradient is zero to well below one patient's weight
+    residuals = y - refitted_proba(X, result)
+    assert abs(residuals.sum()) < 1e-4
+    if mode == 'slope':
+        probabilities = LiteratureBasedMalignancyPredictor().predict_proba(X)
+        assert abs(residuals @ np.log(probabilities / (1 - probabilities))) < 1e-4
+
+
+def test_intercept_shift_is_recovered(local_cohort):
+    X, y = local_cohort
+    result = recalibrate(frame_chunks(X, y), mode='intercept')
+    shift = result.parameters['calibration_intercept']
+    assert abs(shift - 0.8) < 3 * result.standard_errors['calibration_intercept']
+    assert result.deviance_history[-1] < result.deviance_history[0]
+
+
+def test_file_sources_match_the_frame(local_cohort, tmp_path):
+    X, y = local_cohort
+    X = X.assign(outcome=y)
+    X.to_csv(tmp_path / 'cohort.csv', index=False)
+    X.to_parquet(tmp_path / 'cohort.parquet')
+    expected = recalibrate(frame_chunks(X, y), mode='slope').coefficients
+    for source in (csv_chunks(str(tmp_path / 'cohort.csv'), 'outcome', chunksize=900),
+                   parquet_chunks(str(tmp_path / 'cohort.parquet'), 'outcome', batch_size=900)):
+        coefficients = recalibrate(source, mode='slope').coefficients
+        assert coefficients == pytest.approx(expected, rel=1e-9)
+
+
+def test_unknown_outcomes_are_skipped(local_cohort):
+    X, y = local_cohort
+    with_missing = y.copy()
+    with_missing[::5] = np.nan
+    known = ~np.isnan(with_missing)
+    result = recalibrate(frame_chunks(X, with_missing), mode='full', ridge=1e-3)
+    expected = recalibrate(frame_chunks(X[known], y[known]), mode='full', ridge=1e-3)
+    assert result.n_rows == known.sum()
+    assert result.coefficients == pytest.approx(expected.coefficients, rel=1e-9)
+
+
+def test_no_known_outcomes(local_cohort):
+    X, y = local_cohort
+    with pytest.raises(ValueError, match='known outcome'):
+        recalibrate(frame_chunks(X, np.full(len(X), np.nan)))
+    with pytest.raises(ValueError, match='known outcome'):
+        recalibrate(frame_chunks(X.iloc[:0], y[:0]))
+    with pytest.raises(ValueError):
+        recalibrate(frame_chunks(X, y), mode='isotonic')
@@ -0,0 +1,86 @@
+"""
+Tests for report_accumulator.py
+"""
+
+import numpy as np
+import pytest
+
+from report_accumulator import ReportAccumulator
+from salivary_gland_malignancy_predictor import LiteratureBasedMalignancyPredictor, create_sample_data
+
+
+@pytest.fixture(scope='module')
+def scored_cohort():
+    X, y = create_sample_data(3000)
+    predictor = LiteratureBasedMalignancyPredictor()
+    return X, np.asarray(y, dtype=np.float64), predictor
+
+
+def accumulate(predictor, X, y, chunk_rows):
+    accumulator = ReportAccumulator(n_bins=10_000)
+    for start in range(0, len(X), chunk_rows):
+        chunk = X.iloc[start:start + chunk_rows]
+        accumulator.update(predictor.predict_risk_category_columnar(chunk),
+                           y[start:start + chunk_rows])
+    return accumulator
+
+
+def test_chunked_report_matches_generate_report(scored_cohort):
+    X, y, predictor = scored_cohort
+    report = accumulate(predictor, X, y, 700).report(predictor)
+    expected = predictor.generate_report(X, y)
+
+    for key, value in expected['predictions'].items():
+        assert report['predictions'][key] == pytest.approx(value, rel=1e-9)
+    assert report['risk_distribution'] == expected['risk_distribution']
+    for key, value in expected['performance_metrics'].items():
+        assert report['performance_metrics'][key] == pytest.approx(value, abs=1e-3)
+
+
+def test_merge_equals_one_pass(scored_cohort):
+    X, y, predictor = scored_cohort
+    merged = accumulate(predictor, X.iloc[:1000], y[:1000], 300)
+    merged.merge(accumulate(predictor, X.iloc[1000:], y[1000:], 300))
+    single = accumulate(predictor, X, y, len(X))
+    assert merged.n_rows == single.n_rows
+    assert merged.mean == pytest.approx(single.mean, rel=1e-12)
+    assert merged.std == pytest.approx(single.std, rel=1e-9)
+    np.testing.assert_array_equal(merged.histogram, single.histogram)
+    assert merged.confusion == single.confusion
+
+    with pytest.raises(ValueError):
+        merged.merge(ReportAccumulator(n_bins=10))
+
+
+def test_unknown_outcomes_are_left_out(scored_cohort):
+    X, y, predictor = scored_cohort
+    with_missing = y.copy()
+    with_missing[::4] = np.nan
+    known = ~np.isnan(with_missing)
+
+    accumulator = accumulate(predictor, X, with_missing, 1000)
+    assert accumulator.n_rows == len(X)
+    assert accumulator.n_labelled == known.sum()
+    expected = accumulate(predictor, X[known], y[known], 1000)
+    assert accumulator.confusion == expected.confusion
+    assert accumulator.auc() == pytest.approx(expected.auc(), rel=1e-12)
+
+
+def test_any_non_zero_label_is_malignant(scored_cohort):
+    X, y, predictor = scored_cohort
+    recoded = np.where(y == 1, 2.0, y)
+    accumulator = accumulate(predictor, X, recoded, 1000)
+    expected = accumulate(predictor, X, y, 1000)
+    assert accumulator.confusion == expected.confusion
+    assert accumulator.auc() == pytest.approx(expected.auc(), rel=1e-12)
+
+
+def test_empty_report(scored_cohort):
+    X, _, predictor = scored_cohort
+    accumulator = ReportAccumulator()
+    accumulator.update(predictor.predict_risk_category_columnar(X.iloc[:0]), np.empty(0))
+    report = accumulator.report(predictor)
+    assert len(accumulator) == 0
+    assert all(np.isnan(value) for value in report['predictions'].values())
+    assert report['risk_distribution'] == {}
+    assert 'performance_metrics' not in report
@@ -0,0 +1,157 @@
+"""
+Tests for salivary_gland_malignancy_predictor.py
+"""
+
+import numpy as np
+import pytest
+
+from salivary_gland_malignancy_predictor import (
+    FeatureEncoder,
+    LiteratureBasedMalignancyPredictor,
+    create_sample_data
+)
+from scoring_core import LITERATURE_COEFFICIENTS
+
+
+@pytest.fixture(scope='module')
+def cohort():
+    X, _ = create_sample_data(2000)
+    X['age'] = X['age'].round()
+    return X
+
+
+def reference_proba(X, coefficients=LITERATURE_COEFFICIENTS):
+    """The model written out term by term, one indicator per comparison"""
+    linear = (
+        coefficients['intercept']
+        + coefficients['age'] * (X['age'].astype(float) - 50) / 20
+        + coefficients['location_submandibular'] * (X['location'] == 'submandibular')
+        + coefficients['location_minor'] * (X['location'] == 'minor')
+        + coefficients['size_2_4cm'] * (X['size'] == '2-4cm')
+        + coefficients['size_gt_4cm'] * (X['size'] == '>4cm')
+        + coefficients['gender_male'] * (X['gender'] == 'male')
+        + coefficients['margins_irregular'] * (X['margins'] == 'irregular')
+        + coefficients['echo_hypoechoic'] * (X['echo'] == 'hypoechoic')
+        + coefficients['vascularity_increased'] * (X['vascularity'] == 'increased')
+    )
+    return 1 / (1 + np.exp(-linear.to_numpy(dtype=float)))
+
+
+def edge_cases(cohort):
+    """Missing, fractional and out-of-range ages plus an unknown category"""
+    X = cohort.iloc[:8].copy()
+    X['age'] = [np.nan, 0.0, 17.5, 18.0, 55.25, 90.0, 90.5, 300.0]
+    X.loc[X.index[4], 'size'] = 'huge'
+    return X
+
+
+def test_matches_reference_formula(cohort):
+    X = cohort.copy()
+    X['age'] = X['age'] + 0.3
+    expected = reference_proba(X)
+    for predictor in (LiteratureBasedMalignancyPredictor(),
+                      LiteratureBasedMalignancyPredictor(use_lookup_table=True)):
+        np.testing.assert_allclose(predictor.predict_proba(X), expected, rtol=1e-12, atol=0)
+        np.testing.assert_allclose(predictor.predict_proba(cohort), reference_proba(cohort),
+                                   rtol=1e-12, atol=0)
+
+
+def test_categorical_columns_match_object_columns(cohort):
+    predictor = LiteratureBasedMalignancyPredictor()
+    X_category = cohort.astype({column: 'category' for column in cohort.columns if column != 'age'})
+    np.testing.assert_array_equal(predictor.predict_proba(X_category),
+                                  predictor.predict_proba(cohort))
+
+
+def test_design_buffer_is_reused_per_thread(cohort):
+    encoder = FeatureEncoder()
+    first = encoder.design_buffer(100)
+    second = encoder.design_buffer(50)
+    assert first.shape == (100, 9) and second.shape == (50, 9)
+    assert np.shares_memory(first, second)
+
+    X = cohort.iloc[:50]
+    np.testing.assert_array_equal(encoder.encode(X, reuse_buffer=True), encoder.encode(X))
+    encoder.release_buffer()
+    assert not np.shares_memory(encoder.design_buffer(50), first)
+
+
+def test_custom_coefficients(cohort):
+    coefficients = dict(LITERATURE_COEFFICIENTS, intercept=-1.0, margins_irregular=2.0)
+    predictor = LiteratureBasedMalignancyPredictor(coefficients=coefficients)
+    np.testing.assert_allclose(predictor.predict_proba(cohort),
+                               reference_proba(cohort, coefficients), rtol=1e-12, atol=0)
+    assert predictor.model_version != LiteratureBasedMalignancyPredictor().model_version
+
+
+def test_missing_and_out_of_range_inputs(cohort):
+    X = edge_cases(cohort)
+    expected = reference_proba(X)
+    for predictor in (LiteratureBasedMalignancyPredictor(),
+                      LiteratureBasedMalignancyPredictor(use_lookup_table=True)):
+        probabilities = predictor.predict_proba(X)
+        assert np.isnan(probabilities[0])
+        np.testing.assert_allclose(probabilities[1:], expected[1:], rtol=1e-12, atol=0)
+        records = predictor.predict_risk_category(X)
+        assert [row['probability'] for row in records[1:]] == pytest.approx(expected[1:], rel=1e-12)
+
+
+def test_risk_categories_follow_thresholds(cohort):
+    predictor = LiteratureBasedMalignancyPredictor()
+    probabilities = predictor.predict_proba(cohort)
+    thresholds = predictor.risk_thresholds
+    expected = np.where(probabilities < thresholds['low'], 'Low Risk',
+                        np.where(probabilities < thresholds['intermediate'],
+                                 'Intermediate Risk', 'High Risk'))
+    records = predictor.predict_risk_category(cohort)
+    assert [row['risk_category'] for row in records] == expected.tolist()
+    frame = predictor.predict_risk_category_columnar(cohort).to_frame()
+    assert frame['risk_category'].tolist() == expected.tolist()
+
+
+def test_packed_matches_predict_proba(cohort):
+    predictor = LiteratureBasedMalignancyPredictor()
+    packed = predictor.pack(cohort)
+    np.testing.assert_allclose(predictor.predict_proba_packed(packed),
+                               predictor.predict_proba(cohort), rtol=1e-12, atol=0)
+    X = edge_cases(cohort)
+    assert np.isnan(predictor.predict_proba_packed(predictor.pack(X))[0])
+
+
+def test_empty_inputs(cohort):
+    predictor = LiteratureBasedMalignancyPredictor()
+    empty = cohort.iloc[:0]
+    assert predictor.predict_proba(empty).shape == (0,)
+    assert predictor.predict_proba(empty, dedup=True).shape == (0,)
+    assert predictor.predict_risk_category(empty) == []
+    assert len(predictor.predict_risk_category_columnar(empty)) == 0
+    assert predictor.predict_risk_category_columnar(empty).counts() == {}
+    assert len(predictor.predict_risk_category_from_codes(FeatureEncoder.ages(empty),
+                                                          FeatureEncoder.codes(empty))) == 0
+    assert len(predictor.predict_proba_packed(predictor.pack(empty))) == 0
+    assert predictor.explain(empty).to_frame().empty
+    assert LiteratureBasedMalignancyPredictor(use_lookup_table=True).predict_proba(empty).size == 0
+
+
+def test_dedup_matches_row_by_row(cohort):
+    predictor = LiteratureBasedMalignancyPredictor()
+    expected = predictor.predict_proba(cohort)
+    np.testing.assert_array_equal(predictor.predict_proba(cohort, dedup=True), expected)
+
+    result = predictor.predict_risk_category_columnar(cohort, dedup=True)
+    assert result.compression_ratio > 1
+    np.testing.assert_array_equal(result.codes,
+                                  predictor.predict_risk_category_columnar(cohort).codes)
+
+    ages, codes = FeatureEncoder.ages(cohort), FeatureEncoder.codes(cohort)
+    from_codes = predictor.predict_risk_category_from_codes(ages, codes, dedup=True)
+    np.testing.assert_array_equal(from_codes.probabilities, expected)
+
+
+def test_dedup_dicts_are_not_shared(cohort):
+    predictor = LiteratureBasedMalignancyPredictor()
+    X = cohort.iloc[[0, 0, 1]].reset_index(drop=True)
+    records = predictor.predict_risk_category(X, dedup=True)
+    assert records == predictor.predict_risk_category(X)
+    records[0]['note'] = 'reviewed'
+    assert 'note' not in records[1]
@@ -0,0 +1,80 @@
+"""
+Tests for schema_validation.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from salivary_gland_malignancy_predictor import create_sample_data
+from schema_validation import SchemaValidationError, ValidationReport, validate_cohort
+
+
+@pytest.fixture
+def messy_cohort():
+    X, _ = create_sample_data(10)
+    X = X.astype({'age': object})
+    X.loc[1, 'age'] = np.nan
+    X.loc[2, 'age'] = 150
+    X.loc[3, 'age'] = 'old'
+    X.loc[4, 'age'] = ' 45 '
+    X.loc[5, 'size'] = '<2cm'
+    X.loc[6, 'location'] = 'Parotid'
+    X.loc[7, 'echo'] = 'bright'
+    X.loc[8, 'gender'] = None
+    return X
+
+
+def test_valid_cohort_is_returned_unchanged():
+    X, _ = create_sample_data(50)
+    for mode in ('strict', 'coerce', 'drop'):
+        validated, report = validate_cohort(X, mode)
+        assert validated is X and report.is_valid
+
+
+def test_reasons_per_column(messy_cohort):
+    with pytest.raises(SchemaValidationError) as raised:
+        validate_cohort(messy_cohort, 'strict')
+    report = raised.value.report
+    assert report.counts() == {
+        'age': {'missing': 1, 'not_numeric': 1, 'out_of_range': 1},
+        'location': {'unknown_value': 1},
+        'size': {'unknown_value': 1},
+        'gender': {'missing': 1},
+        'echo': {'unknown_value': 1}
+    }
+    # Numeric text such as ' 45 ' is a valid age
+    assert report.invalid_rows.tolist() == [1, 2, 3, 5, 6, 7, 8]
+    assert set(report.to_frame()['reason']) == {'missing', 'not_numeric', 'out_of_range',
+                                                'unknown_value'}
+
+
+def test_drop_keeps_only_valid_rows(messy_cohort):
+    validated, report = validate_cohort(messy_cohort, 'drop')
+    assert validated.index.tolist() == [0, 4, 9]
+    assert report.n_invalid == 7
+
+
+def test_coerce_repairs_what_it_can(messy_cohort):
+    validated, report = validate_cohort(messy_cohort, 'coerce')
+    assert len(validated) == len(messy_cohort)
+    assert validated.loc[2, 'age'] == 90 and validated.loc[4, 'age'] == 45
+    assert np.isnan(validated.loc[3, 'age'])
+    assert validated.loc[5, 'size'] == '≤2cm'
+    assert validated.loc[6, 'location'] == 'parotid'
+    assert pd.isna(validated.loc[7, 'echo'])
+    assert set(report.coerced) >= {'age', 'size', 'location'}
+
+
+def test_missing_column_always_raises():
+    X, _ = create_sample_data(5)
+    for mode in ('strict', 'coerce', 'drop'):
+        with pytest.raises(SchemaValidationError, match='missing column'):
+            validate_cohort(X.drop(columns='margins'), mode)
+
+
+def test_empty_cohort_and_report_concat():
+    X, _ = create_sample_data(5)
+    validated, report = validate_cohort(X.iloc[:0], 'drop')
+    assert len(validated) == 0 and report.is_valid
+    assert ValidationReport.concat([report, report]).n_rows == 0
@@ -0,0 +1,96 @@
+"""
+Tests for scoring_core.py
+"""
+
+import numpy as np
+import pytest
+
+from salivary_gland_malignancy_predictor import LiteratureBasedMalignancyPredictor, create_sample_data
+from scoring_core import (
+    CATEGORY_LEVELS,
+    LITERATURE_COEFFICIENTS,
+    N_PROFILES,
+    RISK_THRESHOLDS,
+    coefficient_checksum,
+    decode_profile_codes,
+    encode_records,
+    model_fingerprint,
+    profile_codes,
+    score_records,
+    stable_sigmoid,
+    unique_profiles
+)
+
+
+def random_codes(n_rows, rng):
+    return {column: rng.integers(0, len(levels), n_rows) for column, levels in CATEGORY_LEVELS.items()}
+
+
+def test_profile_codes_round_trip():
+    profiles = np.arange(N_PROFILES)
+    codes = decode_profile_codes(profiles)
+    np.testing.assert_array_equal(profile_codes(codes), profiles)
+
+
+@pytest.mark.parametrize('ages', [
+    np.array([18.0, 40.0, 40.0, 90.0, 18.0]),
+    np.array([18.5, 40.25, 40.25, np.nan, np.nan]),
+    np.array([-3.0, 300.0, 300.0, 40.0, -3.0]),
+])
+def test_unique_profiles_restores_every_row(ages):
+    rng = np.random.default_rng(0)
+    ages = np.tile(ages, 200)
+    codes = random_codes(len(ages), rng)
+    unique_ages, unique_codes, inverse = unique_profiles(ages, codes)
+
+    np.testing.assert_array_equal(unique_ages[inverse], ages)
+    np.testing.assert_array_equal(profile_codes(unique_codes)[inverse], profile_codes(codes))
+    keys = set(zip(unique_ages.tolist(), profile_codes(unique_codes).tolist()))
+    assert len(keys) == len(unique_ages)
+
+
+def test_unique_profiles_of_no_rows():
+    codes = random_codes(0, np.random.default_rng(0))
+    unique_ages, unique_codes, inverse = unique_profiles(np.empty(0), codes)
+    assert len(unique_ages) == len(inverse) == 0
+
+
+def test_stable_sigmoid_extremes():
+    z = np.array([-1000.0, -30.0, 0.0, 30.0, 1000.0, np.nan])
+    with np.errstate(over='raise', invalid='raise'):
+        probabilities = stable_sigmoid(z.copy())
+    np.testing.assert_allclose(probabilities[1:5], 1 / (1 + np.exp(-z[1:5])), rtol=1e-15)
+    assert probabilities[0] == 0.0 and probabilities[4] == 1.0
+    assert np.isnan(probabilities[5])
+
+
+def test_records_map_unknown_and_missing_to_reference():
+    ages, codes = encode_records([
+        {'age': 60, 'location': 'minor', 'size': '>4cm'},
+        {'age': None, 'location': 'Parotid gland', 'size': None},
+    ])
+    assert np.isnan(ages[1])
+    assert codes['location'].tolist() == [2, 0]
+    assert codes['size'].tolist() == [2, 0]
+    assert codes['gender'].tolist() == [0, 0]
+
+
+def test_score_records_matches_the_predictor():
+    X, _ = create_sample_data(500)
+    probabilities, _ = score_records(X.to_dict('records'))
+    np.testing.assert_allclose(probabilities, LiteratureBasedMalignancyPredictor().predict_proba(X),
+                               rtol=0, atol=1e-12)
+
+
+def test_score_records_of_no_records():
+    probabilities, risk_codes = score_records([])
+    assert probabilities.shape == risk_codes.shape == (0,)
+
+
+def test_fingerprint_and_checksum_change_with_the_set():
+    changed = dict(LITERATURE_COEFFICIENTS, intercept=LITERATURE_COEFFICIENTS['intercept'] + 0.1)
+    fingerprint = model_fingerprint(LITERATURE_COEFFICIENTS, RISK_THRESHOLDS)
+    assert model_fingerprint(changed, RISK_THRESHOLDS) != fingerprint
+    checksum = coefficient_checksum(LITERATURE_COEFFICIENTS, RISK_THRESHOLDS)
+    intervals = {'age': (1.1, 1.3)}
+    assert coefficient_checksum(LITERATURE_COEFFICIENTS, RISK_THRESHOLDS, intervals) != checksum
@@ -0,0 +1,84 @@
+"""
+Tests for scoring_service.py
+"""
+
+import asyncio
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from salivary_gland_malignancy_predictor import LiteratureBasedMalignancyPredictor
+from scoring_core import CATEGORY_LEVELS
+from scoring_service import MAX_BATCH_PATIENTS, MAX_BODY_BYTES, InProcessClient, ScoringService
+
+PATIENT = {'age': 55, 'gender': 'male', 'location': 'submandibular', 'size': '2-4cm',
+           'margins': 'irregular', 'echo': 'hypoechoic', 'vascularity': 'increased'}
+
+
+def post(path, payload):
+    client = InProcessClient(ScoringService(LiteratureBasedMalignancyPredictor()))
+    return asyncio.run(client.post(path, payload))
+
+
+def test_predict_proba_matches_predictor():
+    patients = [PATIENT, dict(PATIENT, age=30, size='≤2cm'), dict(PATIENT, age=90.0)]
+    status, body = post('/predict_proba', patients)
+    assert status == 200
+    expected = LiteratureBasedMalignancyPredictor().predict_proba(pd.DataFrame(patients))
+    np.testing.assert_allclose([item['probability'] for item in body], expected, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize('age', [-500, 0, 17.9, 90.5, 150])
+def test_out_of_range_age_is_rejected(age):
+    status, body = post('/predict_risk_category', dict(PATIENT, age=age))
+    assert status == 422
+    assert 'between 18 and 90' in body['error']
+
+
+@pytest.mark.parametrize('age', [None, 'old', True, float('nan')])
+def test_non_numeric_age_is_rejected(age):
+    status, _ = post('/predict_proba', dict(PATIENT, age=age))
+    assert status == 422
+
+
+def test_unknown_category_is_rejected():
+    status, body = post('/predict_proba', dict(PATIENT, size='<2cm'))
+    assert status == 422
+    assert 'size' in body['error']
+
+
+def test_empty_batch():
+    status, body = post('/predict_risk_category', [])
+    assert status == 200
+    assert body == []
+
+
+async def raw_exchange(request):
+    """Send raw bytes to a listening service; returns the response status line"""
+    service = ScoringService(LiteratureBasedMalignancyPredictor())
+    server = await service.start(port=0)
+    try:
+        reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+        writer.write(request)
+        await writer.drain()
+        status_line = await reader.readline()
+        writer.close()
+        return status_line.decode('latin-1').strip()
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+@pytest.mark.parametrize('length', ['abc', '-5', '1.5'])
+def test_bad_content_length_is_rejected(length):
+    request = (f"POST /predict_proba HTTP/1.1\r\nContent-Length: {length}\r\n\r\n"
+               f"{json.dumps(PATIENT)}").encode('latin-1')
+    assert asyncio.run(raw_exchange(request)).startswith('HTTP/1.1 400')
+
+
+def test_body_limit_fits_a_full_batch():
+    longest = {column: max(levels, key=len) for column, levels in CATEGORY_LEVELS.items()}
+    patients = [dict(longest, age=89.25)] * MAX_BATCH_PATIENTS
+    assert len(json.dumps(patients, indent=2).encode('utf-8')) <= MAX_BODY_BYTES
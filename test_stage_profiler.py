@@ -0,0 +1,69 @@
+"""
+Tests for stage_profiler.py and the predictor's profiling hooks
+"""
+
+import pytest
+
+from salivary_gland_malignancy_predictor import LiteratureBasedMalignancyPredictor, create_sample_data
+from stage_profiler import StageProfiler
+
+
+@pytest.fixture
+def profiled_predictor():
+    profiler = StageProfiler()
+    return LiteratureBasedMalignancyPredictor(profiler=profiler), profiler
+
+
+def test_stages_of_a_scoring_call(profiled_predictor):
+    predictor, profiler = profiled_predictor
+    X, _ = create_sample_data(300)
+    predictor.predict_risk_category(X)
+    snapshot = profiler.snapshot()
+    assert snapshot['output']['calls'] == 1
+    assert all(stats['rows'] == 300 for stats in snapshot.values())
+
+
+@pytest.mark.parametrize('age_offset', [0.0, 0.5])
+def test_lookup_stages_count_each_row_once(age_offset):
+    # Half-year ages miss the lookup table and fall back to arithmetic
+    profiler = StageProfiler()
+    predictor = LiteratureBasedMalignancyPredictor(use_lookup_table=True, profiler=profiler)
+    X, _ = create_sample_data(300)
+    X['age'] = X['age'].round() + age_offset
+    predictor.predict_proba(X.iloc[:1])
+    profiler.reset()  # leave out building the table
+    predictor.predict_proba(X)
+    snapshot = profiler.snapshot()
+    assert all(stats['calls'] == 1 and stats['rows'] == 300 for stats in snapshot.values())
+    assert ('encode' in snapshot) == bool(age_offset)
+
+
+def test_profiled_records_and_returns(profiled_predictor):
+    predictor, profiler = profiled_predictor
+    assert predictor.profiled('output', 42, lambda a, b: a + b, 1, 2) == 3
+    stats = profiler.snapshot()['output']
+    assert stats['calls'] == 1 and stats['rows'] == 42
+    assert stats['batch_buckets']['+Inf'] == 1
+
+
+def test_profiled_without_profiler():
+    predictor = LiteratureBasedMalignancyPredictor()
+    assert predictor.profiled('output', 1, max, 3, 4) == 4
+
+
+def test_hooks_see_every_record():
+    profiler = StageProfiler()
+    seen = []
+    profiler.add_hook(lambda stage, seconds, rows: seen.append((stage, rows)))
+    profiler.record('encode', 0.01, 10)
+    profiler.record('custom', 0.02, 5)
+    assert seen == [('encode', 10), ('custom', 5)]
+    assert list(profiler.snapshot()) == ['encode', 'custom']
+
+
+def test_prometheus_exposition():
+    profiler = StageProfiler()
+    profiler.record('linear', 0.001, 1000)
+    text = profiler.to_prometheus()
+    assert 'stage="linear"' in text
+    assert text.endswith('\n')
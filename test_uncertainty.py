@@ -0,0 +1,70 @@
+"""
+Tests for uncertainty.py
+"""
+
+import numpy as np
+import pytest
+
+from salivary_gland_malignancy_predictor import LiteratureBasedMalignancyPredictor, create_sample_data
+
+
+@pytest.fixture(scope='module')
+def cohort():
+    X, _ = create_sample_data(400)
+    # Repeat patients so that duplicates are collapsed and scattered back
+    X = X.iloc[np.arange(800) % 400].reset_index(drop=True)
+    X['age'] = X['age'].round()
+    return X
+
+
+@pytest.mark.parametrize('method', ['monte_carlo', 'delta'])
+def test_interval_brackets_predict_proba(cohort, method):
+    predictor = LiteratureBasedMalignancyPredictor()
+    interval = predictor.predict_proba_interval(cohort, n_samples=500, random_state=0,
+                                                method=method)
+    assert len(interval) == len(cohort)
+    np.testing.assert_allclose(interval.probabilities, predictor.predict_proba(cohort),
+                               rtol=0, atol=1e-12)
+    assert (interval.lower <= interval.probabilities).all()
+    assert (interval.probabilities <= interval.upper).all()
+
+
+def test_duplicate_patients_get_identical_intervals(cohort):
+    interval = LiteratureBasedMalignancyPredictor().predict_proba_interval(
+        cohort, n_samples=200, random_state=1
+    )
+    np.testing.assert_array_equal(interval.lower[:400], interval.lower[400:])
+    np.testing.assert_array_equal(interval.upper[:400], interval.upper[400:])
+
+
+def test_monte_carlo_is_reproducible_across_block_sizes(cohort):
+    predictor = LiteratureBasedMalignancyPredictor()
+    first = predictor.predict_proba_interval(cohort, n_samples=300, random_state=5)
+    second = predictor.predict_proba_interval(cohort, n_samples=300, random_state=5,
+                                              max_block_bytes=64 * 1024)
+    np.testing.assert_array_equal(first.lower, second.lower)
+    np.testing.assert_array_equal(first.upper, second.upper)
+
+
+def test_missing_age_gives_nan_bounds(cohort):
+    X = cohort.iloc[:5].copy()
+    X['age'] = X['age'].astype(float)
+    X.loc[2, 'age'] = np.nan
+    interval = LiteratureBasedMalignancyPredictor().predict_proba_interval(
+        X, n_samples=100, random_state=0
+    )
+    assert np.isnan(interval.lower).tolist() == [row == 2 for row in range(5)]
+
+
+def test_empty_input(cohort):
+    interval = LiteratureBasedMalignancyPredictor().predict_proba_interval(cohort.iloc[:0])
+    assert len(interval) == 0
+    assert interval.to_frame().empty
+
+
+def test_invalid_arguments(cohort):
+    predictor = LiteratureBasedMalignancyPredictor()
+    with pytest.raises(ValueError):
+        predictor.predict_proba_interval(cohort, level=1.5)
+    with pytest.raises(ValueError):
+        predictor.predict_proba_interval(cohort, method='bootstrap')
@@ -0,0 +1,66 @@
+"""
+Tests for validation_metrics.py
+"""
+
+import numpy as np
+import pytest
+
+from validation_metrics import ROCAnalysis, known_outcomes
+
+
+def labelled_cohort(n_rows=2000, random_state=0):
+    rng = np.random.default_rng(random_state)
+    scores = rng.random(n_rows).round(2)
+    return (rng.random(n_rows) < scores).astype(np.float64), scores
+
+
+def naive_auc(labels, scores):
+    """Share of (positive, negative) pairs ranked correctly, ties counting one half"""
+    positives = scores[labels == 1][:, None]
+    negatives = scores[labels == 0][None, :]
+    return np.mean((positives > negatives) + 0.5 * (positives == negatives))
+
+
+def test_auc_matches_pairwise_definition():
+    labels, scores = labelled_cohort()
+    assert ROCAnalysis(labels, scores).auc() == pytest.approx(naive_auc(labels, scores), abs=1e-12)
+
+
+def test_metrics_at_threshold():
+    labels, scores = labelled_cohort()
+    metrics = ROCAnalysis(labels, scores).metrics_at(0.5)
+    called = scores >= 0.5
+    assert metrics['sensitivity'] == pytest.approx(np.mean(called[labels == 1]))
+    assert metrics['specificity'] == pytest.approx(np.mean(~called[labels == 0]))
+
+
+def test_missing_labels_are_left_out():
+    labels, scores = labelled_cohort()
+    with_missing = labels.copy()
+    with_missing[::10] = np.nan
+    known = ~np.isnan(with_missing)
+
+    roc = ROCAnalysis(with_missing, scores)
+    assert len(roc) == known.sum()
+    assert roc.n_positive == int(labels[known].sum())
+    assert roc.auc() == pytest.approx(naive_auc(labels[known], scores[known]), abs=1e-12)
+
+
+def test_known_outcomes_accepts_none_and_booleans():
+    labels, scores = known_outcomes([True, None, False], [0.9, 0.5, 0.1])
+    np.testing.assert_array_equal(labels, [True, False])
+    np.testing.assert_array_equal(scores, [0.9, 0.1])
+
+
+def test_shape_mismatch_and_single_class():
+    with pytest.raises(ValueError):
+        ROCAnalysis([1, 0], [0.5])
+    with pytest.raises(ValueError, match='one class'):
+        ROCAnalysis([1, 1, np.nan], [0.2, 0.3, 0.4]).auc()
+
+
+def test_empty_cohort():
+    roc = ROCAnalysis([], [])
+    assert len(roc) == 0
+    with pytest.raises(ValueError):
+        roc.auc()
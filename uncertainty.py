@@ -0,0 +1,233 @@
+"""
+SalivAI - Prediction Uncertainty
+Per-patient intervals around the literature model's malignancy probabilities
+
+Delta method: the log-odds standard error of each patient is the quadratic
+form x' S x of its design row with the coefficient covariance S, so the
+interval logit +/- z * se (mapped through the sigmoid) costs about as much as
+the point prediction.
+
+Both methods hold the intercept fixed (it has no published interval), so
+the intervals reflect coefficient uncertainty only and collapse towards the
+point prediction near the reference patient, whose design row is almost zero.
+
+Monte Carlo: K coefficient vectors are drawn from the published odds-ratio
+confidence intervals (normal on the log-odds scale, intercept fixed) and
+every patient is scored against all of them in one (N x 9) . (9 x K) matrix
+product per block of patients. The N x K log-odds matrix only ever exists one
+block at a time, sized to a memory budget. Per-patient percentiles come from
+in-place partial sorts (selection) of each block.
+
+Patients sharing age and categorical profile get identical intervals, so each
+distinct patient (scoring_core.unique_profiles) is simulated once and the
+result scattered back; a million-row cohort with integer ages has at most
+~10.5k distinct patients.
+
+NumPy-only, like scoring_core.
+
+Usage:
+    from uncertainty import delta_method_interval, monte_carlo_interval
+
+    interval = delta_method_interval(ages, codes, intercept, weights, covariance)
+    interval = monte_carlo_interval(ages, codes, intercept, weights, standard_errors,
+                                    n_samples=10_000, random_state=42)
+    interval.lower, interval.upper
+"""
+
+from statistics import NormalDist
+
+import numpy as np
+
+from scoring_core import (
+    build_design_matrix,
+    score_design_matrix,
+    stable_sigmoid,
+    unique_profiles
+)
+
+# Interval methods accepted by LiteratureBasedMalignancyPredictor.predict_proba_interval
+INTERVAL_METHODS = ('monte_carlo', 'delta')
+
+# Coefficient vectors drawn per Monte Carlo run
+DEFAULT_N_SAMPLES = 10_000
+
+# Upper bound on the log-odds block (patients x samples) held at once
+DEFAULT_MAX_BLOCK_BYTES = 64 * 1024 ** 2
+
+
+class ProbabilityInterval:
+    """
+    Point probabilities with lower/upper uncertainty bounds per patient
+
+    `probabilities` are the model's point predictions (the literature
+    coefficients themselves), not the centre of the simulated distribution.
+    """
+
+    def __init__(self, probabilities, lower, upper, level, method):
+        self.probabilities = probabilities
+        self.lower = lower
+        self.upper = upper
+        self.level = level
+        self.method = method
+
+    def __len__(self):
+        return len(self.probabilities)
+
+    def to_frame(self):
+        """DataFrame with probability, probability_lower and probability_upper columns"""
+        import pandas as pd
+        return pd.DataFrame({
+            'probability': self.probabilities,
+            'probability_lower': self.lower,
+            'probability_upper': self.upper
+        })
+
+
+def _check_level(level):
+    if not 0 < level < 1:
+        raise ValueError("level must be between 0 and 1")
+
+
+def delta_method_interval(ages, codes, intercept, weights, covariance, level=0.95):
+    """
+    Delta-method (Wald) probability intervals for encoded patients
+
+    Parameters:
+    ages (np.array): Patient ages
+    codes (dict): Integer category codes per column (see CATEGORY_LEVELS)
+    intercept (float): Model intercept (treated as exact)
+    weights (np.array): Coefficients in FEATURE_NAMES order
+    covariance (np.array): (9, 9) log-odds covariance of the coefficients
+    level (float): Central coverage of the interval
+
+    Returns:
+    ProbabilityInterval: Point probabilities with lower and upper bounds
+    """
+    _check_level(level)
+    design = build_design_matrix(ages, codes)
+    logits = np.dot(design, weights)
+    logits += intercept
+
+    # Per-patient variance x' S x, one row-wise dot product over design @ S
+    spread = np.einsum('ij,ij->i', np.dot(design, covariance), design)
+    np.sqrt(spread, out=spread)
+    spread *= NormalDist().inv_cdf(0.5 + level / 2)
+
+    lower = stable_sigmoid(logits - spread)
+    upper = stable_sigmoid(np.add(logits, spread, out=spread), out=spread)
+    return ProbabilityInterval(stable_sigmoid(logits, out=logits), lower, upper, level, 'delta')
+
+
+def sample_weights(weights, standard_errors, n_samples, random_state=None):
+    """
+    Coefficient vectors drawn around `weights` with the given log-odds standard errors
+
+    Returns:
+    np.array: (9, n_samples) matrix, one sampled weight vector per column
+    """
+    rng = np.random.default_rng(random_state)
+    draws = rng.standard_normal((n_samples, len(weights)))
+    draws *= standard_errors
+    draws += weights
+    return np.ascontiguousarray(draws.T)
+
+
+def _quantile_positions(n_samples, quantiles):
+    """Order-statistic indices and weights for numpy's default (linear) percentiles"""
+    positions = np.asarray(quantiles, dtype=np.float64) * (n_samples - 1)
+    below = np.floor(positions).astype(np.intp)
+    above = np.minimum(below + 1, n_samples - 1)
+    return below, above, positions - below
+
+
+def _order_statistics(values, ranks):
+    """
+    Order statistics of each row at the given ranks
+
+    Partially sorts `values` in place. Each distinct rank, in ascending order,
+    is selected from the suffix left after the previous one; successive single
+    selections are several times faster than one multi-rank np.partition.
+    """
+    distinct, positions = np.unique(ranks, return_inverse=True)
+    result = np.empty((values.shape[0], len(distinct)), dtype=values.dtype)
+    offset = 0
+    for index, rank in enumerate(distinct):
+        remaining = values[:, offset:]
+        remaining.partition(rank - offset, axis=1)
+        result[:, index] = remaining[:, rank - offset]
+        offset = rank + 1
+    return result[:, positions.reshape(-1)]
+
+
+def simulate_intervals(design, intercept, weight_samples, level=0.95,
+                       max_block_bytes=DEFAULT_MAX_BLOCK_BYTES):
+    """
+    Percentile interval of the probability over sampled coefficient vectors
+
+    Parameters:
+    design (np.array): (N, 9) design matrix
+    intercept (float): Fixed intercept
+    weight_samples (np.array): (9, K) sampled weight vectors
+    level (float): Central coverage of the interval
+    max_block_bytes (int): Memory budget for one block of log-odds
+
+    Returns:
+    tuple: (lower, upper) probability arrays of length N
+    """
+    n_rows = design.shape[0]
+    n_samples = weight_samples.shape[1]
+    tail = (1 - level) / 2
+    below, above, fraction = _quantile_positions(n_samples, [tail, 1 - tail])
+    ranks = np.array([below[0], above[0], below[1], above[1]])
+
+    block_rows = int(max(1, min(n_rows, max_block_bytes // (8 * n_samples))))
+    block = np.empty((block_rows, n_samples), dtype=np.float64)
+    design = np.ascontiguousarray(design, dtype=np.float64)
+    bounds = np.empty((n_rows, 2), dtype=np.float64)
+
+    for start in range(0, n_rows, block_rows):
+        stop = min(start + block_rows, n_rows)
+        logits = block[:stop - start]
+        np.dot(design[start:stop], weight_samples, out=logits)
+        logits += intercept
+
+        # Only the order statistics around each percentile are needed; the
+        # sigmoid is monotone, so they are the probability order statistics too
+        statistics = stable_sigmoid(_order_statistics(logits, ranks))
+        low, high = statistics[:, 0::2], statistics[:, 1::2]
+        bounds[start:stop] = low + (high - low) * fraction
+    return bounds[:, 0], bounds[:, 1]
+
+
+def monte_carlo_interval(ages, codes, intercept, weights, standard_errors, level=0.95,
+                         n_samples=DEFAULT_N_SAMPLES, random_state=None,
+                         max_block_bytes=DEFAULT_MAX_BLOCK_BYTES):
+    """
+    Monte Carlo probability intervals for encoded patients
+
+    Parameters:
+    ages (np.array): Patient ages
+    codes (dict): Integer category codes per column (see CATEGORY_LEVELS)
+    intercept (float): Model intercept (held fixed)
+    weights (np.array): Coefficients in FEATURE_NAMES order (sampling means)
+    standard_errors (np.array): Log-odds standard errors in FEATURE_NAMES order
+    level (float): Central coverage of the interval (0.95 = 2.5th-97.5th percentile)
+    n_samples (int): Number of coefficient vectors K
+    random_state (int or np.random.Generator, optional): Seed for reproducible draws
+    max_block_bytes (int): Memory budget for one block of patients x samples
+
+    Returns:
+    ProbabilityInterval: Point probabilities with lower and upper bounds
+    """
+    _check_level(level)
+    if n_samples < 2:
+        raise ValueError("n_samples must be at least 2")
+
+    weight_samples = sample_weights(weights, standard_errors, n_samples, random_state)
+    unique_ages, unique_codes, inverse = unique_profiles(ages, codes)
+    design = build_design_matrix(unique_ages, unique_codes)
+
+    lower, upper = simulate_intervals(design, intercept, weight_samples, level, max_block_bytes)
+    probabilities = score_design_matrix(design, intercept, weights)
+    return ProbabilityInterval(probabilities[inverse], lower[inverse], upper[inverse],
+                               level, 'monte_carlo')
@@ -0,0 +1,200 @@
+"""
+SalivAI - Validation Metrics
+NumPy-only ROC analysis for validating the predictor against known outcomes
+
+Scores are sorted once; every count after that comes from cumulative sums or
+binary searches on the sorted arrays. This gives AUC, the full ROC curve,
+confusion counts and sensitivity/specificity/PPV/NPV at any number of
+thresholds, plus optimal cut-points, in O(n log n) overall. It replaces a
+Python loop of predict() calls per candidate threshold.
+
+A case is called positive when its score is >= the threshold, the same rule
+as LiteratureBasedMalignancyPredictor.predict. Cases with a missing outcome
+(NaN or None label) are left out, as ReportAccumulator and recalibration do.
+
+Usage:
+    from validation_metrics import ROCAnalysis
+
+    roc = ROCAnalysis(y_true, predictor.predict_proba(X))
+    print(roc.auc(), roc.youden_threshold())
+    sweep = roc.metrics_at(np.linspace(0.05, 0.95, 181))
+"""
+
+import numpy as np
+
+
+def _safe_ratio(numerator, denominator):
+    """numerator / denominator, with 0 where the denominator is 0"""
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    ratio = np.zeros(np.broadcast(numerator, denominator).shape)
+    np.divide(numerator, denominator, out=ratio, where=denominator > 0)
+    return ratio if ratio.ndim else float(ratio)
+
+
+def known_outcomes(y_true, scores):
+    """
+    Labels and scores of the cases whose outcome is known
+
+    NaN or None labels mark unknown outcomes and are dropped; any other
+    non-zero label counts as malignant.
+
+    Returns:
+    tuple: (bool labels, float64 scores) of the known cases
+    """
+    labels = np.asarray(y_true, dtype=np.float64).ravel()
+    scores = np.asarray(scores, dtype=np.float64).ravel()
+    if labels.shape != scores.shape:
+        raise ValueError(f"y_true has {labels.size} values but scores has {scores.size}")
+    known = ~np.isnan(labels)
+    if known.all():
+        return labels != 0, scores
+    return labels[known] != 0, scores[known]
+
+
+class ROCAnalysis:
+    """
+    Sorted-score view of a labelled cohort
+
+    Attributes:
+    thresholds (np.array): Distinct scores in decreasing order, preceded by +inf
+    tp, fp (np.array): True and false positives when calling scores >= each threshold
+    n_positive, n_negative (int): Number of malignant and benign cases
+    """
+
+    def __init__(self, y_true, scores):
+        """
+        Parameters:
+        y_true (array-like): Binary outcomes (1 = malignant; NaN = unknown, left out)
+        scores (array-like): Predicted probabilities (or any risk score)
+        """
+        labels, scores = known_outcomes(y_true, scores)
+
+        # The one sort; everything else is derived from it
+        order = np.argsort(scores, kind='stable')
+        sorted_scores = scores[order]
+        sorted_labels = labels[order]
+
+        # Ascending per-class scores for counting at arbitrary thresholds
+        self._positive_scores = sorted_scores[sorted_labels]
+        self._negative_scores = sorted_scores[~sorted_labels]
+        self.n_positive = len(self._positive_scores)
+        self.n_negative = len(self._negative_scores)
+
+        # Walk thresholds from the highest score down; the last row of each tie
+        # block is where the counts change
+        descending_scores = sorted_scores[::-1]
+        descending_labels = sorted_labels[::-1]
+        last_of_tie = np.flatnonzero(np.diff(descending_scores))
+        if len(descending_scores):
+            last_of_tie = np.append(last_of_tie, len(descending_scores) - 1)
+        tp = np.cumsum(descending_labels)[last_of_tie]
+        fp = last_of_tie + 1 - tp
+
+        # Leading +inf threshold: nothing called positive
+        self.thresholds = np.concatenate([[np.inf], descending_scores[last_of_tie]])
+        self.tp = np.concatenate([[0], tp]).astype(np.int64)
+        self.fp = np.concatenate([[0], fp]).astype(np.int64)
+
+    def __len__(self):
+        return self.n_positive + self.n_negative
+
+    def _require_both_classes(self):
+        if self.n_positive == 0 or self.n_negative == 0:
+            raise ValueError("Only one class present in y_true; ROC analysis is not defined")
+
+    @property
+    def tpr(self):
+        """Sensitivity at each ROC threshold"""
+        return _safe_ratio(self.tp, self.n_positive)
+
+    @property
+    def fpr(self):
+        """1 - specificity at each ROC threshold"""
+        return _safe_ratio(self.fp, self.n_negative)
+
+    def roc_curve(self):
+        """
+        Full ROC curve
+
+        Returns:
+        tuple: (fpr, tpr, thresholds), thresholds decreasing from +inf
+        """
+        self._require_both_classes()
+        return self.fpr, self.tpr, self.thresholds
+
+    def auc(self):
+        """Area under the ROC curve (trapezoidal, so ties count one half)"""
+        self._require_both_classes()
+        tpr, fpr = self.tpr, self.fpr
+        return float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1])) / 2)
+
+    def confusion_at(self, thresholds):
+        """
+        Confusion counts when calling scores >= threshold positive
+
+        Parameters:
+        thresholds (float or array-like): One or many thresholds
+
+        Returns:
+        dict: tp, fp, tn, fn (scalars or arrays matching `thresholds`)
+        """
+        thresholds = np.asarray(thresholds, dtype=np.float64)
+        fn = np.searchsorted(self._positive_scores, thresholds, side='left')
+        tn = np.searchsorted(self._negative_scores, thresholds, side='left')
+        return {
+            'tp': self.n_positive - fn,
+            'fp': self.n_negative - tn,
+            'tn': tn,
+            'fn': fn
+        }
+
+    def metrics_at(self, thresholds):
+        """
+        Classification metrics at one or many thresholds
+
+        Zero denominators give 0, as in generate_report.
+
+        Returns:
+        dict: sensitivity, specificity, ppv, npv and accuracy (plus the confusion counts)
+        """
+        counts = self.confusion_at(thresholds)
+        tp, fp, tn, fn = counts['tp'], counts['fp'], counts['tn'], counts['fn']
+        return {
+            'sensitivity': _safe_ratio(tp, tp + fn),
+            'specificity': _safe_ratio(tn, tn + fp),
+            'ppv': _safe_ratio(tp, tp + fp),
+            'npv': _safe_ratio(tn, tn + fn),
+            'accuracy': _safe_ratio(tp + tn, len(self)),
+            **counts
+        }
+
+    def youden_threshold(self):
+        """Threshold maximizing Youden's J (sensitivity + specificity - 1)"""
+        self._require_both_classes()
+        # Skip the +inf row: it is never a usable cut-point
+        j = (self.tpr - self.fpr)[1:]
+        return float(self.thresholds[1 + np.argmax(j)])
+
+    def threshold_for_sensitivity(self, target):
+        """Highest threshold whose sensitivity is at least `target`"""
+        self._require_both_classes()
+        if not 0 < target <= 1:
+            raise ValueError(f"target sensitivity must be in (0, 1], got {target}")
+        # tpr is non-decreasing as the threshold falls, so the first hit is the highest threshold
+        index = np.searchsorted(self.tp, np.ceil(target * self.n_positive - 1e-9), side='left')
+        return float(self.thresholds[max(index, 1)])
+
+    def optimal_risk_thresholds(self, target_sensitivity=0.95):
+        """
+        Data-driven cut-points in the format of risk_thresholds
+
+        'low' is the highest threshold that keeps sensitivity at
+        `target_sensitivity` (few malignancies labelled Low Risk); 'intermediate'
+        is the Youden-optimal threshold, never below 'low'.
+
+        Returns:
+        dict: {'low': float, 'intermediate': float}
+        """
+        low = self.threshold_for_sensitivity(target_sensitivity)
+        return {'low': low, 'intermediate': max(self.youden_threshold(), low)}